@@ -1,37 +1,47 @@
+import time
 from typing import List, Optional
-from os import getenv
-from dotenv import load_dotenv
 from app.models import QuestionType, DifficultyLevel, QuizQuestion
-from educhain.core.educhain import Educhain
-from educhain.core.config import LLMConfig
-from educhain.models.qna_models import (
-    MCQList,
-    ShortAnswerQuestionList,
-    TrueFalseQuestionList,
-    FillInBlankQuestionList
-)
+from app.clients.llm_executor import llm_executor, LLMPriority, LLMQueueFullError, LLMTimeoutError
+from app.clients.model_registry import model_registry
+from app.core.config import get_settings
+from app.core.logger import logger
+from app.core.metrics import ERRORS, LLM_PARSE_SECONDS
+from app.services.web_content_cache import format_context, web_content_cache
 
-# Load environment variables
-load_dotenv()
+settings = get_settings()
 
-# Configure Ollama client
-llm_config = LLMConfig(
-    model_name=getenv("OLLAMA_MODEL", "mistral"),
-    base_url=getenv("OLLAMA_HOST", "http://localhost:11434"),
-    temperature=0.7
-)
+def current_model_name() -> str:
+    """Return the name of the model new generations will use."""
+    return model_registry.current_model
 
-client = Educhain(llm_config)
+def validate_question(question: QuizQuestion) -> Optional[QuizQuestion]:
+    """Check one parsed question, fixing what can be fixed.
 
-def update_model(model_name: str) -> None:
-    """Update the LLM model configuration."""
-    global llm_config, client
-    llm_config = LLMConfig(
-        model_name=model_name,
-        base_url=getenv("OLLAMA_HOST", "http://localhost:11434"),
-        temperature=0.7
-    )
-    client = Educhain(llm_config)
+    Returns None when the question is unusable: empty text or answer,
+    duplicate or too few options, or an answer that is not one of the
+    options. A multiple-choice answer given as an option letter ("B") is
+    replaced by that option's text, and true/false answers are spelled
+    ``True``/``False``.
+    """
+    text = question.question.strip()
+    answer = question.correctAnswer.strip()
+    if not text or not answer:
+        return None
+    if question.type == QuestionType.MULTIPLE_CHOICE:
+        options = [option.strip() for option in question.options or []]
+        if len(options) < 2 or "" in options or len(set(options)) != len(options):
+            return None
+        letter = ord(answer.upper()) - ord("A") if len(answer) == 1 else -1
+        if answer not in options and 0 <= letter < len(options):
+            answer = options[letter]
+        if answer not in options:
+            return None
+        return question.model_copy(update={"question": text, "options": options, "correctAnswer": answer})
+    if question.type == QuestionType.TRUE_FALSE:
+        if answer.casefold() not in ("true", "false"):
+            return None
+        answer = answer.capitalize()
+    return question.model_copy(update={"question": text, "correctAnswer": answer})
 
 async def generate_questions(
     topic: str,
@@ -40,25 +50,68 @@ async def generate_questions(
     difficulty: DifficultyLevel,
     learning_objective: Optional[str],
     start_id: int,
-    use_web_search: bool = False
+    use_web_search: bool = False,
+    priority: LLMPriority = LLMPriority.INTERACTIVE,
+    group: Optional[str] = None
 ) -> List[QuizQuestion]:
-    """Generate questions using educhain with Ollama/Mistral."""
-    print(f"educhain_client: web_search={use_web_search}")
+    """Generate questions using educhain with Ollama/Mistral.
+
+    With ``use_web_search`` the reference material comes from the local web
+    content cache (searching only on a miss) and is handed to educhain in
+    the prompt. educhain's own per-call web search is used when there is
+    nothing cached and no search API is configured (``WEB_SEARCH_URL``) or
+    it cannot be reached, unless ``WEB_SEARCH_FALLBACK`` is off.
+    ``priority`` and ``group`` place the call in the LLM executor's queue.
+    """
+    logger.debug(
+        "Generating %d %s questions", num_questions, question_type.value,
+        extra={"web_search": use_web_search}
+    )
     try:
-        # Generate questions using educhain
-        response = client.qna_engine.generate_questions(
-            topic=topic,
-            num=num_questions,
-            question_type=question_type.value,
-            difficulty=difficulty.value,
-            learning_objective=learning_objective,
-            web_search=use_web_search,
-            max_web_results=3
+        custom_instructions = None
+        educhain_search = False
+        if use_web_search:
+            query = f"{topic} {learning_objective}" if learning_objective else topic
+            results = await web_content_cache.get(query)
+            custom_instructions = format_context(results) if results else None
+            if results is None and settings.WEB_SEARCH_FALLBACK:
+                educhain_search = True
+                if settings.WEB_SEARCH_URL:
+                    logger.warning("Search API unavailable for %s; using educhain web search", topic)
+            elif custom_instructions is None:
+                logger.warning("No web content for %s; generating without it", topic)
+
+        # Pin the client for this call so a model swap cannot change it midway
+        async with model_registry.use() as (_, client):
+            # Generate questions using educhain on the LLM worker pool so the
+            # event loop stays free while Ollama works
+            response = await llm_executor.run(
+                client.qna_engine.generate_questions,
+                topic=topic,
+                num=num_questions,
+                question_type=question_type.value,
+                difficulty=difficulty.value,
+                learning_objective=learning_objective,
+                custom_instructions=custom_instructions,
+                web_search=educhain_search,
+                max_web_results=settings.WEB_SEARCH_MAX_RESULTS,
+                priority=priority,
+                group=group
+            )
+
+        # Loaded by now: the registry imported educhain to build the client
+        from educhain.models.qna_models import (
+            MCQList,
+            ShortAnswerQuestionList,
+            TrueFalseQuestionList,
+            FillInBlankQuestionList
         )
 
         # Convert to our QuizQuestion model based on type
+        parse_started = time.perf_counter()
         quiz_questions = []
-        for i, q in enumerate(response.questions, start=start_id):
+        invalid = 0
+        for q in response.questions:
             # Handle different question types appropriately
             if isinstance(response, MCQList):
                 options = q.options
@@ -69,15 +122,25 @@ async def generate_questions(
             else:
                 raise ValueError(f"Unexpected question type response: {type(response)}")
 
-            quiz_question = QuizQuestion(
-                id=i,
+            quiz_question = validate_question(QuizQuestion(
+                id=start_id + len(quiz_questions),
                 question=q.question,
                 options=options,
                 correctAnswer=str(q.answer),
                 type=question_type
-            )
-            quiz_questions.append(quiz_question)
-            
+            ))
+            if quiz_question is None:
+                invalid += 1
+            else:
+                quiz_questions.append(quiz_question)
+
+        LLM_PARSE_SECONDS.observe(time.perf_counter() - parse_started)
+        if invalid:
+            ERRORS.labels("validation").inc(invalid)
+            logger.warning("Dropped %d invalid %s questions", invalid, question_type.value)
         return quiz_questions
+    except (LLMQueueFullError, LLMTimeoutError):
+        raise
     except Exception as e:
+        ERRORS.labels("llm").inc()
         raise Exception(f"Failed to generate questions: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,274 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, Hashable, Optional
+
+from app.core.config import get_settings
+from app.core.logger import logger
+from app.core.metrics import LLM_CALL_SECONDS, LLM_QUEUE_WAIT_SECONDS
+
+settings = get_settings()
+
+_LATENCY_SMOOTHING = 0.2  # Weight of the newest call in avg_call_seconds
+
+
+class LLMQueueFullError(Exception):
+    """Raised when the LLM wait queue is already at capacity."""
+
+
+class LLMTimeoutError(Exception):
+    """Raised when an LLM call does not finish within its timeout."""
+
+
+class LLMPriority(IntEnum):
+    """Scheduling class of an LLM call; lower runs first."""
+    INTERACTIVE = 0  # A user is waiting on the response
+    BATCH = 1  # Batch jobs: progress guaranteed, but behind interactive calls
+    BACKGROUND = 2  # Pre-generation: only when nothing else wants the model
+
+
+class _Waiter:
+    __slots__ = ("future", "loop", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+
+
+class LLMExecutor:
+    """Runs blocking LLM calls on a dedicated worker pool.
+
+    At most ``max_concurrency`` calls run at once and up to ``max_queue``
+    more may wait for a worker; anything beyond that is rejected instead of
+    piling up. The event loop only awaits the result, so other endpoints
+    stay responsive while Ollama is busy.
+
+    Waiting calls are served by priority. When interactive and batch calls
+    are both waiting, one batch call is let through after every
+    ``interactive_weight`` interactive ones, so batches keep moving without
+    stalling users. Within a priority, calls are taken round-robin by
+    ``group`` (a batch job, say) so one large job cannot starve another.
+    The queue limit counts only calls of the same or higher priority, so
+    queued batch work never gets interactive requests rejected.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        timeout: float,
+        interactive_weight: int = settings.LLM_INTERACTIVE_WEIGHT
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.interactive_weight = max(1, interactive_weight)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queues: Dict[LLMPriority, "OrderedDict[Hashable, Deque[_Waiter]]"] = {
+            priority: OrderedDict() for priority in LLMPriority
+        }
+        self._waiting_by_priority = {priority: 0 for priority in LLMPriority}
+        self._interactive_streak = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._dispatched = {priority: 0 for priority in LLMPriority}
+        self.avg_call_seconds: Optional[float] = None
+
+    @property
+    def _waiting(self) -> int:
+        return sum(self._waiting_by_priority.values())
+
+    def has_capacity(self) -> bool:
+        """True when a new call would start right away instead of queueing."""
+        with self._lock:
+            return self._running < self.max_concurrency and not self._waiting
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="llm-worker"
+                )
+            return self._pool
+
+    def _pick_priority(self) -> Optional[LLMPriority]:
+        interactive = self._waiting_by_priority[LLMPriority.INTERACTIVE]
+        batch = self._waiting_by_priority[LLMPriority.BATCH]
+        if interactive and (not batch or self._interactive_streak < self.interactive_weight):
+            self._interactive_streak += 1
+            return LLMPriority.INTERACTIVE
+        if batch:
+            self._interactive_streak = 0
+            return LLMPriority.BATCH
+        if self._waiting_by_priority[LLMPriority.BACKGROUND]:
+            return LLMPriority.BACKGROUND
+        return None
+
+    def _dequeue(self, priority: LLMPriority) -> _Waiter:
+        groups = self._queues[priority]
+        group, waiters = next(iter(groups.items()))
+        waiter = waiters.popleft()
+        if waiters:
+            groups.move_to_end(group)  # Next call of this priority comes from another group
+        else:
+            del groups[group]
+        self._waiting_by_priority[priority] -= 1
+        return waiter
+
+    def _release(self, completed: bool = True) -> None:
+        """Free a slot, handing it straight to the next waiter if any (any thread)."""
+        with self._lock:
+            self._running -= 1
+            if completed:
+                self._completed += 1
+            priority = self._pick_priority()
+            if priority is None:
+                return
+            waiter = self._dequeue(priority)
+            waiter.granted = True
+            self._running += 1
+            self._dispatched[priority] += 1
+        try:
+            waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+        except RuntimeError:  # The waiter's event loop is gone
+            self._release(completed=False)
+
+    async def _acquire(self, priority: LLMPriority, group: Hashable) -> None:
+        with self._lock:
+            ahead = sum(
+                count for p, count in self._waiting_by_priority.items() if p <= priority
+            )
+            if self._running < self.max_concurrency and not self._waiting:
+                self._running += 1
+                self._dispatched[priority] += 1
+                return
+            if ahead >= self.max_queue:
+                self._rejected += 1
+                raise LLMQueueFullError(
+                    f"LLM queue is full ({self._waiting} waiting, {self._running} running)"
+                )
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._queues[priority].setdefault(group, deque()).append(waiter)
+            self._waiting_by_priority[priority] += 1
+        try:
+            await waiter.future
+        except BaseException:
+            # Timed out or cancelled while queued: leave the queue, or give
+            # back the slot if it was handed over in the meantime
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    waiters = self._queues[priority].get(group)
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del self._queues[priority][group]
+                    self._waiting_by_priority[priority] -= 1
+            if granted:
+                self._release(completed=False)
+            raise
+
+    def _invoke(self, fn: Callable[..., Any], args: tuple, kwargs: dict, submitted: float) -> Any:
+        started = time.perf_counter()
+        LLM_QUEUE_WAIT_SECONDS.observe(started - submitted)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            LLM_CALL_SECONDS.observe(elapsed)
+            with self._lock:
+                if self.avg_call_seconds is None:
+                    self.avg_call_seconds = elapsed
+                else:
+                    self.avg_call_seconds += _LATENCY_SMOOTHING * (elapsed - self.avg_call_seconds)
+
+    async def _run(self, fn, args, kwargs, priority, group, submitted):
+        pool = self._get_pool()
+        await self._acquire(priority, group)
+        # Carry the caller's context (request id) into the worker thread
+        context = contextvars.copy_context()
+        try:
+            future = pool.submit(context.run, self._invoke, fn, args, kwargs, submitted)
+        except BaseException:
+            self._release(completed=False)
+            raise
+        # The slot is held until the call really finishes, even if the
+        # caller stops waiting for it
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        priority: LLMPriority = LLMPriority.INTERACTIVE,
+        group: Hashable = None,
+        **kwargs: Any
+    ) -> Any:
+        """Run ``fn(*args, **kwargs)`` on the worker pool and await its result.
+
+        ``timeout`` covers the time spent queued as well as running.
+        """
+        try:
+            return await asyncio.wait_for(
+                self._run(fn, args, kwargs, priority, group, time.perf_counter()),
+                timeout=timeout or self.timeout
+            )
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timeouts += 1
+            # A call already running cannot be interrupted; it keeps its
+            # worker until Ollama answers, but nobody waits for it anymore.
+            raise LLMTimeoutError(
+                f"LLM call timed out after {timeout or self.timeout:.0f}s"
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "interactive_weight": self.interactive_weight,
+                "running": self._running,
+                "waiting": self._waiting,
+                "waiting_by_priority": {
+                    priority.name.lower(): count
+                    for priority, count in self._waiting_by_priority.items()
+                },
+                "dispatched_by_priority": {
+                    priority.name.lower(): count
+                    for priority, count in self._dispatched.items()
+                },
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "avg_call_seconds": self.avg_call_seconds,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            logger.info("Shutting down LLM worker pool...")
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+llm_executor = LLMExecutor(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.LLM_MAX_QUEUE,
+    timeout=settings.LLM_TIMEOUT
+)
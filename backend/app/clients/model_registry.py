@@ -0,0 +1,228 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from os import getenv
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+from app.core.config import get_settings
+from app.core.logger import logger
+from app.core.metrics import MODEL_LOAD_SECONDS
+
+if TYPE_CHECKING:
+    from educhain.core.educhain import Educhain
+
+# Load environment variables
+load_dotenv()
+
+settings = get_settings()
+
+
+class ModelRegistry:
+    """Pool of warmed Educhain clients keyed by model name.
+
+    ``switch`` builds the client and primes the model in Ollama *before*
+    making it current, so the first real request does not pay the model
+    load. The swap itself is a single reference assignment: requests inside
+    ``use`` keep the client they got. Up to ``max_models`` clients are kept;
+    beyond that the least recently used ones are evicted and unloaded from
+    Ollama, but only once no request is using them. The current model is
+    never evicted.
+
+    Clients are built in a worker thread (building imports educhain and
+    langchain), and concurrent requests for the same model share one build.
+    All other state is only touched from the event loop.
+    """
+
+    def __init__(
+        self,
+        default_model: str,
+        base_url: str,
+        max_models: int,
+        keep_alive: str,
+        warmup_timeout: float,
+        temperature: float = 0.7
+    ):
+        self.base_url = base_url
+        self.max_models = max(1, max_models)
+        self.keep_alive = keep_alive
+        self.warmup_timeout = warmup_timeout
+        self.temperature = temperature
+        self._clients: "OrderedDict[str, Educhain]" = OrderedDict()
+        self._building: Dict[str, asyncio.Future] = {}
+        self._active: Dict[str, int] = {}
+        self._unloads: Set[asyncio.Task] = set()
+        self._current = default_model
+        self._swap_lock: Optional[asyncio.Lock] = None
+        self.swaps = 0
+        self.evictions = 0
+        self.last_swap_seconds: Optional[float] = None
+        self.cold_start_seconds: Dict[str, float] = {}
+
+    @property
+    def current_model(self) -> str:
+        return self._current
+
+    def _build(self, model_name: str) -> "Educhain":
+        # educhain drags in langchain; import it on first use, not at startup
+        from educhain.core.educhain import Educhain
+        from educhain.core.config import LLMConfig
+
+        llm_config = LLMConfig(
+            model_name=model_name,
+            base_url=self.base_url,
+            temperature=self.temperature
+        )
+        return Educhain(llm_config)
+
+    async def _client(self, model_name: str) -> "Educhain":
+        """The client for ``model_name``, building it off the loop if needed."""
+        client = self._clients.get(model_name)
+        if client is not None:
+            return client
+        building = self._building.get(model_name)
+        if building is None:
+            building = asyncio.ensure_future(asyncio.to_thread(self._build, model_name))
+            self._building[model_name] = building
+            building.add_done_callback(lambda _: self._building.pop(model_name, None))
+        # A caller giving up must not cancel the build others wait for
+        client = await asyncio.shield(building)
+        return self._clients.setdefault(model_name, client)
+
+    def _hold(self, model_name: str) -> None:
+        self._active[model_name] = self._active.get(model_name, 0) + 1
+
+    def _release(self, model_name: str) -> None:
+        self._active[model_name] -= 1
+        if not self._active[model_name]:
+            del self._active[model_name]
+
+    def _evict_idle(self) -> List[str]:
+        """Drop least recently used clients beyond ``max_models`` that nobody uses."""
+        evicted = []
+        for name in list(self._clients):
+            if len(self._clients) <= self.max_models:
+                break
+            if name != self._current and not self._active.get(name):
+                del self._clients[name]
+                evicted.append(name)
+        self.evictions += len(evicted)
+        return evicted
+
+    def _unload_later(self, names: List[str]) -> None:
+        for name in names:
+            task = asyncio.create_task(self._unload(name))
+            self._unloads.add(task)
+            task.add_done_callback(self._unloads.discard)
+
+    @asynccontextmanager
+    async def use(self) -> AsyncIterator[Tuple[str, "Educhain"]]:
+        """Yield the current model name and its client for one request.
+
+        Hold on to the client for the whole request so a concurrent swap
+        cannot change the model underneath it; the model is not unloaded
+        while any request is inside ``use``.
+        """
+        model_name = self._current
+        self._hold(model_name)
+        try:
+            client = await self._client(model_name)
+            self._clients.move_to_end(model_name)
+            self._unload_later(self._evict_idle())
+            yield model_name, client
+        finally:
+            self._release(model_name)
+            self._unload_later(self._evict_idle())
+
+    async def warm(self, model_name: str) -> float:
+        """Load ``model_name`` in Ollama with a one-token prompt.
+
+        Returns the elapsed time, which is the cold-start cost when the model
+        was not resident yet. ``keep_alive`` keeps it loaded afterwards.
+        """
+        started = time.perf_counter()
+        async with httpx.AsyncClient(timeout=self.warmup_timeout) as http:
+            response = await http.post(
+                f"{self.base_url}/api/generate",
+                json={
+                    "model": model_name,
+                    "prompt": "Hi",
+                    "stream": False,
+                    "keep_alive": self.keep_alive,
+                    "options": {"num_predict": 1}
+                }
+            )
+            response.raise_for_status()
+        elapsed = time.perf_counter() - started
+        MODEL_LOAD_SECONDS.labels("llm").observe(elapsed)
+        self.cold_start_seconds[model_name] = elapsed
+        return elapsed
+
+    async def _unload(self, model_name: str) -> None:
+        try:
+            async with httpx.AsyncClient(timeout=10) as http:
+                await http.post(
+                    f"{self.base_url}/api/generate",
+                    json={"model": model_name, "keep_alive": 0}
+                )
+        except httpx.HTTPError as e:
+            logger.warning("Failed to unload model %s: %s", model_name, e)
+
+    async def switch(self, model_name: str) -> dict:
+        """Warm ``model_name`` and make it the current model."""
+        if self._swap_lock is None:
+            self._swap_lock = asyncio.Lock()
+
+        async with self._swap_lock:
+            started = time.perf_counter()
+            # Held so requests finishing meanwhile cannot evict it before it is current
+            self._hold(model_name)
+            try:
+                client = await self._client(model_name)
+                warmup_seconds = await self.warm(model_name)
+            finally:
+                self._release(model_name)
+
+            self._clients[model_name] = client
+            self._clients.move_to_end(model_name)
+            self._current = model_name
+            evicted = self._evict_idle()
+
+            self.swaps += 1
+            self.last_swap_seconds = time.perf_counter() - started
+            logger.info(
+                "Switched to model %s in %.2fs (warm-up %.2fs)",
+                model_name, self.last_swap_seconds, warmup_seconds
+            )
+
+        for name in evicted:
+            await self._unload(name)
+        return {
+            "model": model_name,
+            "swap_seconds": self.last_swap_seconds,
+            "warmup_seconds": warmup_seconds
+        }
+
+    def stats(self) -> dict:
+        return {
+            "current": self._current,
+            "loaded": list(self._clients.keys()),
+            "in_use": dict(self._active),
+            "max_models": self.max_models,
+            "swaps": self.swaps,
+            "evictions": self.evictions,
+            "last_swap_seconds": self.last_swap_seconds,
+            "cold_start_seconds": dict(self.cold_start_seconds),
+        }
+
+
+model_registry = ModelRegistry(
+    default_model=getenv("OLLAMA_MODEL", "mistral"),
+    base_url=getenv("OLLAMA_HOST", "http://localhost:11434"),
+    max_models=settings.MODEL_POOL_SIZE,
+    keep_alive=settings.MODEL_KEEP_ALIVE,
+    warmup_timeout=settings.MODEL_WARMUP_TIMEOUT
+)
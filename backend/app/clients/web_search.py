@@ -0,0 +1,122 @@
+import asyncio
+from html.parser import HTMLParser
+from typing import List
+
+import httpx
+
+from app.core.config import get_settings
+from app.core.logger import logger
+
+settings = get_settings()
+
+# Page furniture that never holds the article text
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "header", "footer", "aside", "form"}
+
+
+class WebSearchError(Exception):
+    """Raised when the search service cannot be reached or answers badly."""
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skipping += 1
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def extract_text(html: str, max_chars: int) -> str:
+    """Readable text of an HTML page, whitespace collapsed, cut at ``max_chars``."""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return " ".join(" ".join(parser.parts).split())[:max_chars]
+
+
+class WebSearchClient:
+    """Searches the web through a SearxNG-compatible JSON API.
+
+    ``search`` asks ``{base_url}/search?format=json`` for the top
+    ``max_results`` hits and downloads each page (at most ``page_max_bytes``)
+    to keep a plain-text extract of ``page_max_chars``. Pages that fail to
+    load keep just the search snippet.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_results: int,
+        timeout: float,
+        page_max_bytes: int,
+        page_max_chars: int
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_results = max_results
+        self.timeout = timeout
+        self.page_max_bytes = page_max_bytes
+        self.page_max_chars = page_max_chars
+
+    async def search(self, query: str) -> List[dict]:
+        """Return ``{"url", "title", "snippet", "text"}`` for the top hits."""
+        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as http:
+            try:
+                response = await http.get(
+                    f"{self.base_url}/search", params={"q": query, "format": "json"}
+                )
+                response.raise_for_status()
+                hits = [
+                    hit for hit in response.json().get("results", []) if hit.get("url")
+                ][:self.max_results]
+            except (httpx.HTTPError, ValueError) as e:
+                raise WebSearchError(f"Web search failed: {str(e)}")
+            texts = await asyncio.gather(*(self._page_text(http, hit["url"]) for hit in hits))
+        return [
+            {
+                "url": hit["url"],
+                "title": hit.get("title", ""),
+                "snippet": hit.get("content", ""),
+                "text": text,
+            }
+            for hit, text in zip(hits, texts)
+        ]
+
+    async def _page_text(self, http: httpx.AsyncClient, url: str) -> str:
+        try:
+            async with http.stream("GET", url) as response:
+                response.raise_for_status()
+                content_type = response.headers.get("content-type", "")
+                if "html" not in content_type and "text/plain" not in content_type:
+                    return ""
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) >= self.page_max_bytes:
+                        break
+                page = body[:self.page_max_bytes].decode(response.encoding or "utf-8", errors="replace")
+        except httpx.HTTPError as e:
+            logger.warning("Could not fetch %s: %s", url, str(e))
+            return ""
+        if "html" not in content_type:
+            return " ".join(page.split())[:self.page_max_chars]
+        # Parsing a large page takes a few milliseconds; keep it off the loop
+        return await asyncio.to_thread(extract_text, page, self.page_max_chars)
+
+
+web_search = WebSearchClient(
+    base_url=settings.WEB_SEARCH_URL,
+    max_results=settings.WEB_SEARCH_MAX_RESULTS,
+    timeout=settings.WEB_SEARCH_TIMEOUT,
+    page_max_bytes=settings.WEB_PAGE_MAX_BYTES,
+    page_max_chars=settings.WEB_PAGE_MAX_CHARS
+)
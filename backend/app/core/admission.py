@@ -0,0 +1,159 @@
+"""Admission control for endpoints bound by a slow backend (Ollama, Whisper).
+
+Requests past what the backend can finish in time are turned away at once
+with ``Retry-After`` instead of queueing until the client gives up, and
+work for clients that have disconnected is cancelled.
+"""
+import asyncio
+import math
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from starlette.requests import Request
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request is shed; carries the HTTP status and Retry-After."""
+
+    def __init__(self, status_code: int, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+class ClientDisconnectedError(Exception):
+    """Raised when the client went away before its response was ready."""
+
+
+class AdmissionController:
+    """Bounds the requests one endpoint lets through to its backend.
+
+    ``service_time`` returns the backend's recent latency for one unit of
+    work (an LLM call, a Whisper batch), or None before anything has run,
+    and ``parallelism`` is how many such units it serves at once. From
+    these, a request arriving behind ``n`` others is expected to wait about
+    ``ceil((n + 1) / parallelism) * service_time``. The admission limit is
+    the largest ``n`` that keeps this within ``max_wait``, so it shrinks
+    as the backend slows down and grows back as it recovers; it never
+    drops below ``parallelism`` or exceeds ``max_in_flight``.
+
+    Requests beyond ``max_in_flight`` get 429; requests beyond the
+    latency-derived limit get 503. Both carry a ``Retry-After`` of roughly
+    how long it takes for a slot to free up.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        max_wait: float,
+        parallelism: int,
+        service_time: Callable[[], Optional[float]]
+    ):
+        self.name = name
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_wait = max_wait
+        self.parallelism = max(1, parallelism)
+        self.service_time = service_time
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected_over_capacity = 0
+        self.rejected_over_wait = 0
+        self.disconnected = 0
+
+    @property
+    def limit(self) -> int:
+        """Requests admitted at once given the backend's current latency."""
+        seconds = self.service_time()
+        if not seconds:
+            return self.max_in_flight
+        rounds = max(1, math.floor(self.max_wait / seconds))
+        return max(self.parallelism, min(self.max_in_flight, rounds * self.parallelism))
+
+    def estimated_wait(self) -> float:
+        """Seconds a request arriving now would expect to wait."""
+        seconds = self.service_time() or 0.0
+        return math.ceil((self.in_flight + 1) / self.parallelism) * seconds
+
+    def _retry_after(self, limit: int) -> int:
+        # Time for enough in-flight requests to finish that one more fits
+        excess = self.in_flight - limit + 1
+        seconds = math.ceil(excess / self.parallelism) * (self.service_time() or 0.0)
+        return max(1, math.ceil(seconds))
+
+    @contextmanager
+    def admit(self):
+        """Hold an admission slot for the body of the ``with`` block.
+
+        Raises AdmissionRejectedError when the endpoint is at its limit.
+        """
+        limit = self.limit
+        if self.in_flight >= self.max_in_flight:
+            self.rejected_over_capacity += 1
+            raise AdmissionRejectedError(
+                429, self._retry_after(self.max_in_flight),
+                f"Too many {self.name} requests in progress ({self.in_flight})"
+            )
+        if self.in_flight >= limit:
+            self.rejected_over_wait += 1
+            raise AdmissionRejectedError(
+                503, self._retry_after(limit),
+                f"{self.name} is overloaded: expected wait "
+                f"{self.estimated_wait():.0f}s exceeds {self.max_wait:.0f}s"
+            )
+        self.in_flight += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    async def run(
+        self,
+        request: Request,
+        fn: Callable[[], Awaitable[T]],
+        poll_interval: float = settings.ADMISSION_DISCONNECT_POLL
+    ) -> T:
+        """Admit the request, then await ``fn()`` while watching the client.
+
+        If the client disconnects first, the work is cancelled, which drops
+        its queued LLM calls or Whisper clips, and ClientDisconnectedError
+        is raised.
+        """
+        with self.admit():
+            task = asyncio.ensure_future(fn())
+            try:
+                while True:
+                    done, _ = await asyncio.wait({task}, timeout=poll_interval)
+                    if done:
+                        return task.result()
+                    if await request.is_disconnected():
+                        self.disconnected += 1
+                        task.cancel()
+                        await asyncio.gather(task, return_exceptions=True)
+                        raise ClientDisconnectedError(f"Client left during {self.name}")
+            finally:
+                # Cancelled ourselves (server shutdown): take the work down too
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "limit": self.limit,
+            "max_in_flight": self.max_in_flight,
+            "max_wait": self.max_wait,
+            "service_seconds": self.service_time(),
+            "estimated_wait": self.estimated_wait(),
+            "admitted": self.admitted,
+            "rejected_over_capacity": self.rejected_over_capacity,
+            "rejected_over_wait": self.rejected_over_wait,
+            "disconnected": self.disconnected,
+        }
@@ -4,9 +4,106 @@ class Settings(BaseSettings):
     WHISPER_MODEL: str = "medium"
     WHISPER_DEVICE: str = "cpu"  # Can be 'cpu', 'cuda', or 'mps'
     MAX_AUDIO_DURATION: int = 30  # seconds
+    WHISPER_QUANTIZE: bool = True  # int8 dynamic quantization of Linear layers on CPU
+    WHISPER_THREADS: int = 0  # torch intra-op threads for inference; 0 keeps torch's default
+    WHISPER_PRELOAD: bool = False  # Load the model during startup instead of on first request
+    WHISPER_WARMUP: bool = True  # Run one decode after loading so the first request is not cold
+    TRANSCRIBE_WORKERS: int = 1  # Whisper worker processes, started on first use; 0 decodes in the API process
+    WHISPER_LOAD_TIMEOUT: float = 600.0  # seconds preload waits for worker models
+    TRANSCRIBE_MAX_BATCH_SIZE: int = 8  # Clips decoded together in one Whisper pass
+    TRANSCRIBE_MAX_WAIT_MS: float = 20.0  # How long the first clip waits for batch-mates
+    TRANSCRIPTION_CACHE_ENABLED: bool = True
+    TRANSCRIPTION_CACHE_MAX_BYTES: int = 4 * 1024 * 1024  # In-memory LRU budget
+    TRANSCRIPTION_CACHE_DISK: bool = True  # Also keep transcripts in data/transcription_cache.db
+    TRANSCRIPTION_CACHE_DISK_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Streaming transcription (/api/speech/stream)
+    VAD_FRAME_MS: int = 30
+    VAD_THRESHOLD_DB: float = 10.0  # Frame energy above the noise floor counted as speech
+    VAD_SILENCE_MS: int = 600  # Quiet period that ends an utterance
+    VAD_MIN_SPEECH_MS: int = 200  # Shorter bursts are dropped as noise
+    STREAM_PARTIAL_INTERVAL: float = 1.0  # seconds of new speech between partial transcripts
+    STREAM_MAX_SEGMENT_SECONDS: float = 20.0  # Longer utterances are cut; Whisper sees 30s at most
+
+    # LLM execution
+    LLM_MAX_CONCURRENCY: int = 2  # Parallel calls the local Ollama can serve (OLLAMA_NUM_PARALLEL)
+    LLM_MAX_QUEUE: int = 16  # Calls allowed to wait for a worker before rejecting
+    LLM_TIMEOUT: float = 120.0  # seconds per generate call
+    LLM_INTERACTIVE_WEIGHT: int = 4  # Interactive calls served per batch call when both wait
+    LLM_RETRY_ATTEMPTS: int = 3  # Generate calls per question set before giving up
+    LLM_RETRY_BACKOFF: float = 0.5  # seconds before the first retry, doubled each time
+    LLM_RETRY_BACKOFF_MAX: float = 8.0  # seconds
+    LLM_HEDGE_AFTER: float = 0.0  # seconds before an interactive call gets a duplicate; 0 disables
+    MODEL_POOL_SIZE: int = 2  # Warmed Educhain clients kept by the model registry
+    MODEL_KEEP_ALIVE: str = "30m"  # How long Ollama keeps a warmed model loaded
+    MODEL_WARMUP_TIMEOUT: float = 300.0  # seconds allowed for a model to load
+    MODEL_WARM_ON_STARTUP: bool = True
+    QUIZ_STREAM_CHUNK_SIZE: int = 2  # Questions per concurrent call on /api/quiz/stream
+    QUIZ_BATCH_CONCURRENCY: int = 2  # Generate calls one batch job keeps in flight
+    QUIZ_BATCH_MAX_JOBS: int = 100  # Finished batch jobs remembered for polling
+    QUIZ_BATCH_QUEUE_WAIT_MAX: float = 300.0  # seconds a batch call waits out a full LLM queue before failing
+
+    # Admission control for /api/quiz and /api/speech/transcribe
+    QUIZ_MAX_IN_FLIGHT: int = 32  # Quiz requests admitted at once, however fast Ollama is
+    QUIZ_MAX_WAIT: float = 60.0  # seconds a new quiz may expect to queue before it is shed
+    TRANSCRIBE_MAX_IN_FLIGHT: int = 64
+    TRANSCRIBE_MAX_WAIT: float = 10.0
+    ADMISSION_DISCONNECT_POLL: float = 0.5  # seconds between client disconnect checks
+
+    # Web search enrichment (use_web_search)
+    WEB_SEARCH_URL: str = ""  # SearxNG-compatible JSON search API; empty leaves searching to educhain
+    WEB_SEARCH_MAX_RESULTS: int = 3  # Pages per search, ours or educhain's
+    WEB_SEARCH_FALLBACK: bool = True  # Let educhain search itself when the search API is unreachable and nothing is cached
+    WEB_SEARCH_TIMEOUT: float = 10.0  # seconds for the search and for each page
+    WEB_PAGE_MAX_BYTES: int = 1024 * 1024  # Download cap per result page
+    WEB_PAGE_MAX_CHARS: int = 1500  # Page extract passed to the model
+    WEB_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Compressed content in data/web_cache.db
+    WEB_CACHE_TTL: float = 7 * 24 * 3600  # seconds before results are refetched
+    WEB_CACHE_SERVE_STALE: bool = True  # Use expired results when search is unreachable
+    WEB_CACHE_MAX_STALE: float = 90 * 24 * 3600  # seconds expired results are kept for that
+
+    # Database
+    DATA_DIR: str = "./data"  # quiz.db and the cache databases
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_MMAP_SIZE: int = 256 * 1024 * 1024  # bytes of quiz.db memory-mapped
+    DB_CACHE_SIZE_KB: int = 64 * 1024  # SQLite page cache per connection
+    DB_BUSY_TIMEOUT_MS: int = 5000
+    QUIZ_DOCUMENT_CACHE_MAX_BYTES: int = 16 * 1024 * 1024  # Serialized quizzes kept in memory for GET /api/quiz/{id}
+
+    # Generation cache
+    GENERATION_CACHE_ENABLED: bool = True
+    GENERATION_CACHE_MAX_ENTRIES: int = 2000
+    GENERATION_CACHE_TTL: float = 7 * 24 * 3600  # seconds
+
+    # Near-duplicate detection
+    DEDUP_ENABLED: bool = True
+    DEDUP_MODE: str = "regenerate"  # 'drop', 'link' or 'regenerate' near-duplicates
+    DEDUP_REGENERATE_ATTEMPTS: int = 3  # Replacement calls before keeping remaining duplicates
+    DEDUP_THRESHOLD: float = 0.75  # Estimated Jaccard similarity counted as duplicate
+    DEDUP_NUM_PERM: int = 64  # MinHash permutations per signature
+    DEDUP_BANDS: int = 16  # LSH bands; NUM_PERM must be a multiple
+
+    # Question pool pre-generation
+    POOL_ENABLED: bool = True
+    POOL_TARGET_SIZE: int = 10  # Unused questions kept per (topic, type, difficulty)
+    POOL_BATCH_SIZE: int = 5  # Questions per pre-generation call
+    POOL_MAX_KEYS: int = 20  # Most requested combinations kept warm
+    POOL_LOOKBACK_DAYS: int = 14  # Window of quiz_sessions used to rank topics
+    POOL_IDLE_SECONDS: float = 30.0  # Quiet period before popular topics are pre-generated
+    POOL_CHECK_INTERVAL: float = 10.0  # seconds between worker checks
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_DIR: str = "logs"  # Holds app.log
+    LOG_JSON: bool = True  # JSON lines in logs/app.log; the console stays human readable
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024  # app.log is rotated past this size
+    LOG_BACKUP_COUNT: int = 5
+    LOG_QUEUE_SIZE: int = 10000  # Records buffered for the writer thread; more are dropped
+    LOG_RATE_LIMIT: float = 20.0  # INFO/DEBUG records per second per call site; 0 disables
 
     class Config:
         env_file = ".env"
 
 def get_settings() -> Settings:
-    return Settings() 
\ No newline at end of file
+    return Settings()
@@ -1,19 +1,229 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
-def setup_logger():
-    """Configure logging for the backend application."""
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_dir / "app.log"),
-            logging.StreamHandler()
-        ]
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Correlation id of the request being handled; copied into every record
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request id, in the caller's context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per call site for INFO and below.
+
+    A hot loop or a flood of requests cannot bury the log: each
+    ``logger.info`` line may emit ``rate`` records per second (with a burst
+    of the same size). Warnings and errors always pass. The next record
+    that gets through from a throttled call site says how many were
+    dropped.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0 or record.levelno > logging.INFO:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, dropped = self._buckets.get(key, (self.rate, now, 0))
+            tokens = min(self.rate, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, dropped + 1)
+                self.suppressed += 1
+                return False
+            self._buckets[key] = (tokens - 1, now, 0)
+        if dropped:
+            record.suppressed = dropped
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra`` fields become top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Never block the caller: when the writer falls behind, drop and count."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message now (args may change later) but keep the
+        # traceback separate so the JSON formatter can put it in its own key
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room: on a full queue put_nowait would raise in stop()
+        self.queue.put(self._sentinel)
+
+
+_listener = None
+_queue_handler = None
+rate_limit_filter = RateLimitFilter(settings.LOG_RATE_LIMIT)
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
+
+
+def build_pipeline(log_path: Path, stream=None, rate_limit: RateLimitFilter = None):
+    """Queue handler for callers plus the listener that writes ``log_path`` and ``stream``."""
+    file_handler = RotatingFileHandler(
+        log_path,
+        maxBytes=settings.LOG_MAX_BYTES,
+        backupCount=settings.LOG_BACKUP_COUNT,
+        encoding="utf-8"
+    )
+    console_handler = logging.StreamHandler(stream)
+    text_format = logging.Formatter(TEXT_FORMAT)
+    file_handler.setFormatter(JsonFormatter() if settings.LOG_JSON else text_format)
+    console_handler.setFormatter(text_format)
+
+    queue_handler = _DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(RequestIdFilter())
+    if rate_limit is not None:
+        queue_handler.addFilter(rate_limit)
+    listener = _Listener(
+        queue_handler.queue, file_handler, console_handler, respect_handler_level=True
     )
+    return queue_handler, listener
+
+
+def setup_logger():
+    """Configure logging for the backend application.
+
+    Callers only format the message and put the record on a queue; a
+    listener thread does the file and console writes. ``logs/app.log`` is
+    rotated by size; the directory comes from ``LOG_DIR``.
+    """
+    global _listener, _queue_handler
+    log_dir = Path(settings.LOG_DIR)
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    _queue_handler, _listener = build_pipeline(log_dir / "app.log", rate_limit=rate_limit_filter)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    # Process ids are never used in our formats; skip looking them up per record
+    logging.logProcesses = False
+    atexit.register(stop_logging)
     return logging.getLogger(__name__)
 
-logger = setup_logger() 
\ No newline at end of file
+
+def stop_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def logging_stats() -> dict:
+    return {
+        "queued": _queue_handler.queue.qsize() if _queue_handler else 0,
+        "dropped": _queue_handler.dropped if _queue_handler else 0,
+        "rate_limited": rate_limit_filter.suppressed,
+    }
+
+
+class RequestIdMiddleware:
+    """ASGI middleware giving each request a correlation id.
+
+    An incoming ``X-Request-ID`` is reused (so a caller's id follows the
+    request through our logs), otherwise one is generated. It is set for
+    everything the request runs, including ``asyncio.to_thread`` work and
+    LLM calls, and echoed in the response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == REQUEST_ID_HEADER.encode():
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + [
+                    (REQUEST_ID_HEADER.encode(), request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
+
+
+logger = setup_logger()
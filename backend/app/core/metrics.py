@@ -0,0 +1,318 @@
+"""Process-wide metrics rendered in the Prometheus text format.
+
+Hot paths only touch a lock and a few integers: ``Histogram.time()``,
+``Counter.inc()`` and ``Gauge.inc()/dec()``. Values that already live in a
+service's own counters (cache hits, queue depths) are not duplicated here;
+a collector callback reads them when ``/metrics`` is scraped.
+"""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; spans sub-millisecond DB work up to multi-minute model loads
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0
+)
+
+# (labels, value) pairs of one metric family
+Samples = Iterable[Tuple[Dict[str, str], float]]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> "_Metric":
+        """The child metric for one combination of label values."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> "_Metric":
+        return type(self)(self.name, self.documentation)
+
+    def _series(self) -> List[Tuple[Dict[str, str], "_Metric"]]:
+        if not self.labelnames:
+            return [({}, self)]
+        return [
+            (dict(zip(self.labelnames, key)), child)
+            for key, child in sorted(self._children.items())
+        ]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, child in self._series():
+            lines.extend(child._render_samples(labels))
+        return lines
+
+    def _render_samples(self, labels: Dict[str, str]) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def _render_samples(self, labels):
+        return [f"{self.name}_total{_format_labels(labels)} {_format_value(self.value)}"]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, either tracked or read on scrape."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Report ``function()`` at scrape time instead of a tracked value."""
+        self._function = function
+
+    @contextmanager
+    def track_inprogress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def _render_samples(self, labels):
+        value = self._function() if self._function is not None else self.value
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        """Observe the wall time of the ``with`` block, even if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def _render_samples(self, labels):
+        with self._lock:
+            counts, total, count = list(self._counts), self.sum, self.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            bucket_labels = {**labels, "le": _format_value(bound)}
+            lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Owns the metrics and collector callbacks rendered on ``/metrics``."""
+
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Samples]]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def _full_name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self._full_name(name), documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self._full_name(name), documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(
+            Histogram(self._full_name(name), documentation, labelnames, buckets)
+        )
+
+    def register_collector(
+        self, collector: Callable[[], Iterable[Tuple[str, str, str, Samples]]]
+    ) -> None:
+        """Add a callback yielding ``(name, type, help, samples)`` on every scrape."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                name = self._full_name(name)
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                suffix = "_total" if kind == "counter" else ""
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry(namespace="cusa")
+
+# Hot-path stages
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    "llm_call_seconds", "Time an LLM generate call spends running on a worker"
+)
+LLM_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "llm_queue_wait_seconds", "Time an LLM call waits for a free worker"
+)
+LLM_PARSE_SECONDS = REGISTRY.histogram(
+    "llm_parse_seconds", "Time converting a parsed LLM response into quiz questions"
+)
+DB_SECONDS = REGISTRY.histogram(
+    "db_seconds", "Time storing a quiz session, by operation", ["operation"]
+)
+AUDIO_DECODE_SECONDS = REGISTRY.histogram(
+    "audio_decode_seconds", "Time decoding an uploaded audio file to 16 kHz PCM"
+)
+WHISPER_INFERENCE_SECONDS = REGISTRY.histogram(
+    "whisper_inference_seconds", "Time for one batched Whisper decode"
+)
+MODEL_LOAD_SECONDS = REGISTRY.histogram(
+    "model_load_seconds", "Time loading and warming a model", ["model_kind"]
+)
+
+# HTTP
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_seconds", "HTTP request latency", ["method", "route"]
+)
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests", "HTTP requests served", ["method", "route", "status"]
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests being served")
+
+ERRORS = REGISTRY.counter("errors", "Failures by pipeline stage", ["stage"])
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and in-flight HTTP requests.
+
+    Requests are labelled by their route template (``/api/quiz/{quiz_id}``),
+    never the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            HTTP_REQUEST_SECONDS.labels(scope["method"], path).observe(elapsed)
+            HTTP_REQUESTS.labels(scope["method"], path, status[0]).inc()
+            if status[0] >= 500:
+                ERRORS.labels("http").inc()
@@ -1,4 +1,34 @@
-from .database import Base, get_db, QuizSession, StoredQuestion
+from .database import (
+    Base,
+    get_db,
+    get_async_db,
+    SessionLocal,
+    AsyncSessionLocal,
+    async_engine,
+    QuizSession,
+    StoredQuestion,
+    QuizDocument,
+    PooledQuestion,
+    QuestionSignature,
+    QuestionLSHBucket
+)
+from .search import SEARCH_TABLE, INDEX_SESSION_SQL
 from .init import init_database
 
-__all__ = ['Base', 'get_db', 'QuizSession', 'StoredQuestion', 'init_database'] 
\ No newline at end of file
+__all__ = [
+    'Base',
+    'get_db',
+    'get_async_db',
+    'SessionLocal',
+    'AsyncSessionLocal',
+    'async_engine',
+    'QuizSession',
+    'StoredQuestion',
+    'QuizDocument',
+    'PooledQuestion',
+    'QuestionSignature',
+    'QuestionLSHBucket',
+    'SEARCH_TABLE',
+    'INDEX_SESSION_SQL',
+    'init_database'
+] 
\ No newline at end of file
@@ -1,14 +1,18 @@
-from sqlalchemy import create_engine, Column, Integer, String, Enum as SQLEnum, ForeignKey, DateTime
+from sqlalchemy import create_engine, event, func, Column, Integer, BigInteger, String, LargeBinary, Enum as SQLEnum, ForeignKey, DateTime, Index
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 from pathlib import Path
 
 from app.models import QuestionType, DifficultyLevel
+from app.core.config import get_settings
+
+settings = get_settings()
 
 # Create database directory if it doesn't exist
-db_dir = Path("./data")
-db_dir.mkdir(exist_ok=True)
+db_dir = Path(settings.DATA_DIR)
+db_dir.mkdir(parents=True, exist_ok=True)
 
 # Create SQLAlchemy engine with the new path
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{db_dir}/quiz.db"
@@ -16,8 +20,40 @@ engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
 
-# Create session factory
+# Async engine used by the API; the sync engine stays for scripts and tests
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{db_dir}/quiz.db"
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_POOL_MAX_OVERFLOW
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection.
+
+    WAL lets readers of the history endpoints run alongside a writer, and
+    synchronous=NORMAL is durable under WAL while skipping an fsync per
+    commit.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={settings.DB_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{settings.DB_CACHE_SIZE_KB}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute(f"PRAGMA busy_timeout={settings.DB_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+event.listen(engine, "connect", _set_sqlite_pragmas)
+event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 # Create base class for declarative models
 Base = declarative_base()
@@ -36,12 +72,36 @@ class QuizSession(Base):
     # Relationship to questions
     questions = relationship("StoredQuestion", back_populates="quiz_session")
 
+# History pages walk (created_at, id) in index order. The first index also
+# carries every listed column so unfiltered pages never touch the table.
+Index(
+    "ix_quiz_sessions_history",
+    QuizSession.created_at,
+    QuizSession.id,
+    QuizSession.topic,
+    QuizSession.difficulty_level,
+    QuizSession.total_questions,
+    QuizSession.learning_objective
+)
+Index(
+    "ix_quiz_sessions_topic_history",
+    func.lower(QuizSession.topic),
+    QuizSession.created_at,
+    QuizSession.id
+)
+Index(
+    "ix_quiz_sessions_difficulty_history",
+    QuizSession.difficulty_level,
+    QuizSession.created_at,
+    QuizSession.id
+)
+
 class StoredQuestion(Base):
     """Represents a stored quiz question in the database."""
     __tablename__ = "questions"
 
     id = Column(Integer, primary_key=True, index=True)
-    quiz_session_id = Column(Integer, ForeignKey("quiz_sessions.id"))
+    quiz_session_id = Column(Integer, ForeignKey("quiz_sessions.id"), index=True)
     question_text = Column(String)
     question_type = Column(SQLEnum(QuestionType))
     correct_answer = Column(String)
@@ -50,8 +110,50 @@ class StoredQuestion(Base):
     # Relationship to quiz session
     quiz_session = relationship("QuizSession", back_populates="questions")
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+class QuizDocument(Base):
+    """A session's GET /api/quiz/{id} response, serialized once when it is stored.
+
+    Sessions never change after they are committed, so the body and its
+    ETag stay valid for good.
+    """
+    __tablename__ = "quiz_documents"
+
+    quiz_session_id = Column(Integer, ForeignKey("quiz_sessions.id"), primary_key=True, autoincrement=False)
+    etag = Column(String)
+    body = Column(LargeBinary)  # UTF-8 JSON
+
+class QuestionSignature(Base):
+    """MinHash signature of a stored question, used for near-duplicate checks."""
+    __tablename__ = "question_signatures"
+
+    question_id = Column(Integer, ForeignKey("questions.id"), primary_key=True)
+    signature = Column(LargeBinary)  # uint32 MinHash values, little-endian
+    duplicate_of = Column(Integer, nullable=True)  # Earlier near-identical question
+
+class QuestionLSHBucket(Base):
+    """LSH band bucket membership; one row per (band key, question)."""
+    __tablename__ = "question_lsh_buckets"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    band_key = Column(BigInteger, primary_key=True, autoincrement=False)
+    question_id = Column(Integer, primary_key=True, autoincrement=False)
+
+class PooledQuestion(Base):
+    """A pre-generated question waiting in the pool to be served."""
+    __tablename__ = "question_pool"
+
+    id = Column(Integer, primary_key=True, index=True)
+    topic_key = Column(String, index=True)  # Normalized topic
+    topic = Column(String)
+    question_type = Column(SQLEnum(QuestionType))
+    difficulty_level = Column(SQLEnum(DifficultyLevel))
+    model_name = Column(String)
+    question_text = Column(String)
+    correct_answer = Column(String)
+    options = Column(String, nullable=True)  # Store as JSON string
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+# Tables are created by init_database() during startup, not at import
 
 def get_db():
     """Dependency to get database session."""
@@ -59,4 +161,10 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+ 
\ No newline at end of file
@@ -1,24 +1,43 @@
-import os
-from pathlib import Path
-from sqlalchemy import inspect
-from .database import engine, Base
+import zlib
+from sqlalchemy import inspect, text
+from .database import engine, Base, db_dir
+from .search import SEARCH_TABLE, ensure_search_index
 from app.core.logger import logger
 
+
+def schema_version() -> int:
+    """Fingerprint of the tables, columns and indexes the models declare.
+
+    Stored in SQLite's ``user_version`` once the schema is in place, so
+    later startups can skip inspecting the database entirely.
+    """
+    parts = [SEARCH_TABLE]
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        parts.append(table.name + ":" + ",".join(c.name for c in table.columns))
+        parts.extend(sorted(index.name for index in table.indexes))
+    # user_version is a signed 32-bit integer; 0 means "never initialized"
+    return zlib.crc32("|".join(parts).encode("utf-8")) & 0x7FFFFFFF or 1
+
+
 def init_database():
     """Initialize the database, creating tables if they don't exist."""
     try:
         # Create database directory if it doesn't exist
-        db_dir = Path("./data")
-        db_dir.mkdir(exist_ok=True)
+        db_dir.mkdir(parents=True, exist_ok=True)
         
         # Check if database file exists
         db_file = db_dir / "quiz.db"
         db_exists = db_file.exists()
         
-        if not db_exists:
-            logger.info("Creating new database...")
-        else:
+        version = schema_version()
+        if db_exists:
+            with engine.connect() as conn:
+                if conn.execute(text("PRAGMA user_version")).scalar() == version:
+                    logger.info("Database schema is up to date")
+                    return True
             logger.info("Database already exists, checking schema...")
+        else:
+            logger.info("Creating new database...")
         
         # Get existing tables
         inspector = inspect(engine)
@@ -27,12 +46,28 @@ def init_database():
         # Create tables that don't exist
         for table in Base.metadata.tables.keys():
             if table not in existing_tables:
-                logger.info(f"Creating table: {table}")
+                logger.info("Creating table: %s", table)
                 Base.metadata.tables[table].create(bind=engine)
+
+        # Add indexes introduced after a table was first created
+        for table in Base.metadata.tables.values():
+            if table.name not in existing_tables:
+                continue
+            existing_indexes = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    logger.info("Creating index: %s", index.name)
+                    index.create(bind=engine)
         
+        if ensure_search_index(engine):
+            logger.info("Created and backfilled question search index")
+
+        with engine.begin() as conn:
+            conn.execute(text(f"PRAGMA user_version = {version}"))
+
         logger.info("Database initialization complete")
         return True
         
     except Exception as e:
-        logger.error(f"Failed to initialize database: {str(e)}")
+        logger.error("Failed to initialize database: %s", e)
         raise 
\ No newline at end of file
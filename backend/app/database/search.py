@@ -0,0 +1,50 @@
+from sqlalchemy import DDL, event, text
+from sqlalchemy.engine import Connection, Engine
+
+from .database import StoredQuestion
+
+SEARCH_TABLE = "question_search"
+
+# Contentless FTS5 index keyed by questions.id: the text lives only in the
+# questions/quiz_sessions tables and the index stores just the postings.
+CREATE_SEARCH_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "question_text, correct_answer, topic, "
+    "content='', tokenize='porter unicode61')"
+)
+
+INDEX_SESSION_SQL = text(
+    f"INSERT INTO {SEARCH_TABLE} (rowid, question_text, correct_answer, topic) "
+    "SELECT id, question_text, correct_answer, :topic "
+    "FROM questions WHERE quiz_session_id = :quiz_session_id"
+)
+
+BACKFILL_SQL = text(
+    f"INSERT INTO {SEARCH_TABLE} (rowid, question_text, correct_answer, topic) "
+    "SELECT q.id, q.question_text, q.correct_answer, s.topic "
+    "FROM questions q JOIN quiz_sessions s ON s.id = q.quiz_session_id"
+)
+
+# Whenever the questions table is created, its search index comes with it
+event.listen(StoredQuestion.__table__, "after_create", DDL(CREATE_SEARCH_TABLE))
+
+
+def ensure_search_index(bind: Engine) -> bool:
+    """Create the search index on existing databases and backfill it.
+
+    Returns True if the index was created by this call.
+    """
+    with bind.begin() as conn:
+        exists = _search_table_exists(conn)
+        if exists:
+            return False
+        conn.execute(text(CREATE_SEARCH_TABLE))
+        conn.execute(BACKFILL_SQL)
+        return True
+
+
+def _search_table_exists(conn: Connection) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": SEARCH_TABLE}
+    ).first() is not None
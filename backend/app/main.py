@@ -1,20 +1,56 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from contextlib import asynccontextmanager
-from sqlalchemy.orm import Session
+from typing import Optional
+import asyncio
+import json
+import math
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import (
     QuizConfig,
     QuizRequest,
     QuizResponse,
-    QuestionTypeConfig
+    QuestionTypeConfig,
+    DifficultyLevel,
+    QuizBatchRequest
 )
-from app.services.quiz_generator import generate_quiz
-from app.core.logger import logger
-from app.database import get_db, init_database
-from app.services.quiz_service import get_quiz_history, get_quiz_session
+from app.services.quiz_generator import generate_quiz, generate_quiz_stream, quiz_admission
+from app.clients.llm_executor import llm_executor, LLMQueueFullError, LLMTimeoutError
+from app.clients.model_registry import model_registry
+from app.services.question_pool import question_pool
+from app.services.quiz_batch import quiz_batches
+from app.core.admission import AdmissionRejectedError, ClientDisconnectedError
+from app.core.config import get_settings
+from app.core.logger import logger, stop_logging, RequestIdMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.database import get_async_db, init_database, AsyncSessionLocal, async_engine
+from app.services.quiz_service import get_quiz_history_async, get_quiz_document_async
+from app.services.quiz_document_cache import quiz_document_cache
 from app.routers import speech
-from app.routes import settings
+from app.routers.speech import get_speech_service, shutdown_speech_service
+from app.routes import settings, stats, questions, metrics
+
+
+async def _warm_default_model():
+    """Load the configured model in Ollama so the first quiz skips the cold start."""
+    try:
+        # Build the client (which imports educhain/langchain) now rather than
+        # inside the first quiz request; requests arriving meanwhile share it
+        async with model_registry.use() as (model_name, _):
+            elapsed = await model_registry.warm(model_name)
+        logger.info("Model %s warmed in %.2fs", model_name, elapsed)
+    except Exception as e:
+        logger.warning("Model warm-up failed: %s", e)
+
+
+async def _preload_speech_model():
+    """Load and warm Whisper in the background so startup is not blocked."""
+    try:
+        await asyncio.to_thread(get_speech_service().preload)
+    except Exception as e:
+        logger.warning("Whisper preload failed: %s", e)
 
 
 @asynccontextmanager
@@ -25,10 +61,28 @@ async def lifespan(app: FastAPI):
         # Initialize database during startup
         init_database()
     except Exception as e:
-        logger.error(f"Failed to initialize database: {str(e)}")
+        logger.error("Failed to initialize database: %s", e)
         raise
+    warmup = None
+    if get_settings().MODEL_WARM_ON_STARTUP:
+        warmup = asyncio.create_task(_warm_default_model())
+    speech_preload = None
+    if get_settings().WHISPER_PRELOAD:
+        speech_preload = asyncio.create_task(_preload_speech_model())
+    if get_settings().POOL_ENABLED:
+        question_pool.start()
     yield
     logger.info("Shutting down CUSA Quiz API...")
+    if warmup is not None:
+        warmup.cancel()
+    if speech_preload is not None:
+        speech_preload.cancel()
+    await question_pool.stop()
+    await quiz_batches.stop()
+    await shutdown_speech_service()
+    await async_engine.dispose()
+    llm_executor.shutdown()
+    stop_logging()
 
 
 app = FastAPI(
@@ -46,7 +100,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Request-ID", "Retry-After", "ETag"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
+
+
+@app.exception_handler(AdmissionRejectedError)
+async def admission_rejected(request: Request, exc: AdmissionRejectedError):
+    """Shed requests fail fast and say when to come back."""
+    logger.warning("Rejected %s: %s", request.url.path, exc.detail,
+                   extra={"status": exc.status_code, "retry_after": exc.retry_after})
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+@app.exception_handler(ClientDisconnectedError)
+async def client_disconnected(request: Request, exc: ClientDisconnectedError):
+    """Nobody reads this response; 499 keeps it apart from server errors."""
+    logger.info("Client disconnected from %s; work cancelled", request.url.path)
+    return Response(status_code=499)
 
 
 @app.get("/health")
@@ -55,55 +131,184 @@ async def health_check():
     return {"status": "healthy"}
 
 
+def _config_from_request(request: QuizRequest) -> QuizConfig:
+    """Build a single-type quiz config from an API request."""
+    return QuizConfig(
+        topic=request.topic,
+        questionTypes=[
+            QuestionTypeConfig(
+                type=request.question_type,
+                count=request.num_questions
+            )
+        ],
+        difficultyLevel=request.difficulty,
+        totalQuestions=request.num_questions,
+        use_web_search=request.use_web_search,
+        use_cache=request.use_cache
+    )
+
+
 @app.post("/api/quiz", response_model=QuizResponse)
-async def create_quiz(request: QuizRequest, db: Session = Depends(get_db)):
-    """Generate quiz questions and store in database."""
+async def create_quiz(
+    request: QuizRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Generate quiz questions and store in database.
+
+    Sheds the request with 429/503 and ``Retry-After`` when Ollama is too
+    far behind, and stops generating if the client disconnects.
+    """
     try:
-        logger.info(f"Generating quiz for topic: {request.topic}")
-        logger.info(f"Web search enabled: {request.use_web_search}")
-        
-        config = QuizConfig(
-            topic=request.topic,
-            questionTypes=[
-                QuestionTypeConfig(
-                    type=request.question_type,
-                    count=request.num_questions
-                )
-            ],
-            difficultyLevel=request.difficulty,
-            totalQuestions=request.num_questions,
-            use_web_search=request.use_web_search
+        # Lazy %-style args and structured fields: nothing is formatted
+        # when the level is off, and the JSON log stays queryable
+        logger.info(
+            "Generating quiz for topic: %s", request.topic,
+            extra={"question_type": request.question_type.value, "web_search": request.use_web_search}
         )
-        
-        questions = await generate_quiz(config, db)
-        logger.info(f"Successfully generated {len(questions)} questions")
+        config = _config_from_request(request)
+
+        questions = await quiz_admission.run(http_request, lambda: generate_quiz(config, db))
+        logger.info("Generated %d questions", len(questions), extra={"questions": len(questions)})
         return QuizResponse(questions=questions)
+    except (AdmissionRejectedError, ClientDisconnectedError):
+        raise
+    except LLMQueueFullError as e:
+        logger.warning("Rejected quiz generation: %s", e)
+        raise HTTPException(
+            status_code=503, detail=str(e),
+            headers={"Retry-After": str(max(1, math.ceil(quiz_admission.estimated_wait())))}
+        )
+    except LLMTimeoutError as e:
+        logger.error("Quiz generation timed out: %s", e)
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
-        logger.error(f"Failed to generate quiz: {str(e)}")
+        logger.error("Failed to generate quiz: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/quiz/stream")
+async def stream_quiz(request: QuizRequest, http_request: Request):
+    """Generate a quiz and stream each question as soon as it is ready.
+
+    Responds with NDJSON by default, or server-sent events when the client
+    sends ``Accept: text/event-stream``.
+    """
+    logger.info("Streaming quiz for topic: %s", request.topic)
+    config = _config_from_request(request)
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+
+    async def body():
+        # The stream outlives the request scope, so it owns its session
+        async with AsyncSessionLocal() as db:
+            async for event in generate_quiz_stream(config, db):
+                if use_sse:
+                    yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+                else:
+                    yield json.dumps(event) + "\n"
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/api/quiz/batch", status_code=202)
+async def create_quiz_batch(request: QuizBatchRequest):
+    """Generate many quizzes as one background job.
+
+    Returns a job id at once; poll ``GET /api/quiz/batch/{job_id}`` for
+    progress and the stored quiz ids. Batch generation runs behind
+    interactive requests for the model.
+    """
+    job = quiz_batches.submit(request.quizzes)
+    return job.to_dict()
+
+
+@app.get("/api/quiz/batch/{job_id}")
+async def read_quiz_batch(job_id: str):
+    """Progress of a batch job."""
+    job = quiz_batches.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return job.to_dict()
+
+
 @app.get("/api/quiz/history")
-def read_quiz_history(
+async def read_quiz_history(
+    response: Response,
     skip: int = 0, 
-    limit: int = 10, 
-    db: Session = Depends(get_db)
+    limit: int = Query(default=10, gt=0, le=100), 
+    cursor: Optional[str] = None,
+    topic: Optional[str] = None,
+    difficulty: Optional[DifficultyLevel] = None,
+    include_counts: bool = False,
+    include_questions: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get quiz history with pagination."""
-    return get_quiz_history(db, skip=skip, limit=limit)
+    """Get quiz history, newest first.
+
+    The next page's cursor is returned in the ``X-Next-Cursor`` header.
+    """
+    try:
+        items, next_cursor = await get_quiz_history_async(
+            db,
+            limit=limit,
+            cursor=cursor,
+            skip=skip,
+            topic=topic,
+            difficulty=difficulty,
+            include_counts=include_counts,
+            include_questions=include_questions
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+
+# Stored sessions never change: clients and proxies may keep them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
 
 
 @app.get("/api/quiz/{quiz_id}")
-def read_quiz(quiz_id: int, db: Session = Depends(get_db)):
-    """Get a specific quiz session."""
-    quiz = get_quiz_session(db, quiz_id)
-    if quiz is None:
-        raise HTTPException(status_code=404, detail="Quiz not found")
-    return quiz
+async def read_quiz(quiz_id: int, request: Request):
+    """Get a specific quiz session.
+
+    Served from the JSON serialized when the session was stored, through an
+    in-memory LRU, with a strong ETag; ``If-None-Match`` gets 304.
+    """
+    document = quiz_document_cache.get(quiz_id)
+    if document is None:
+        # Only misses need the database
+        async with AsyncSessionLocal() as db:
+            document = await get_quiz_document_async(db, quiz_id)
+        if document is None:
+            raise HTTPException(status_code=404, detail="Quiz not found")
+        quiz_document_cache.put(quiz_id, document)
+
+    body, etag = document
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 app.include_router(speech.router)
 app.include_router(settings.router)  # Add this line
+app.include_router(stats.router)
+app.include_router(questions.router)
+app.include_router(metrics.router)
 
 
 if __name__ == "__main__":
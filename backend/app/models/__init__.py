@@ -5,7 +5,8 @@ from .models import (
     QuizQuestion,
     QuizConfig,
     QuizRequest,
-    QuizResponse
+    QuizResponse,
+    QuizBatchRequest
 )
 
 __all__ = [
@@ -15,5 +16,6 @@ __all__ = [
     'QuizQuestion',
     'QuizConfig',
     'QuizRequest',
-    'QuizResponse'
+    'QuizResponse',
+    'QuizBatchRequest'
 ] 
\ No newline at end of file
@@ -34,10 +34,11 @@ class QuizQuestion(BaseModel):
 class QuizConfig(BaseModel):
     model_config = ConfigDict(extra='forbid')
     topic: str
-    questionTypes: List[QuestionTypeConfig]
+    questionTypes: List[QuestionTypeConfig] = Field(min_length=1)
     difficultyLevel: DifficultyLevel
     learningObjective: Optional[str] = None
     use_web_search: bool = False
+    use_cache: bool = True
     totalQuestions: int = Field(gt=0, le=20)
     questions: Optional[List[QuizQuestion]] = None
 
@@ -49,8 +50,15 @@ class QuizRequest(BaseModel):
     num_questions: int = Field(default=5, gt=0, le=10)
     difficulty: DifficultyLevel = DifficultyLevel.MEDIUM
     use_web_search: bool = False
+    use_cache: bool = True  # Set False to force a fresh generation
 
 
 class QuizResponse(BaseModel):
     """Response model containing generated quiz questions."""
-    questions: List[QuizQuestion] 
\ No newline at end of file
+    questions: List[QuizQuestion] 
+
+
+class QuizBatchRequest(BaseModel):
+    """Request model for generating several quizzes as one background job."""
+    model_config = ConfigDict(extra='forbid')
+    quizzes: List[QuizConfig] = Field(min_length=1, max_length=50)
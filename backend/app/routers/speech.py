@@ -1,10 +1,36 @@
-from fastapi import APIRouter, UploadFile, File
+import json
+from fastapi import APIRouter, UploadFile, File, WebSocket, WebSocketDisconnect, Query, Request
 from app.services.speech_service import SpeechService
+from app.services.stream_transcriber import (
+    AUDIO_FORMATS,
+    FfmpegDecoder,
+    PcmDecoder,
+    StreamingTranscriber
+)
+from app.core.admission import AdmissionController
+from app.core.config import get_settings
 from app.core.logger import logger
 
+settings = get_settings()
+
 router = APIRouter()
 _speech_service = None
 
+def _batch_seconds():
+    """Recent Whisper batch latency, once the service has decoded something."""
+    if _speech_service is None:
+        return None
+    return _speech_service.scheduler.avg_batch_seconds
+
+# Sheds uploads Whisper could not start on within TRANSCRIBE_MAX_WAIT
+transcribe_admission = AdmissionController(
+    "transcription",
+    max_in_flight=settings.TRANSCRIBE_MAX_IN_FLIGHT,
+    max_wait=settings.TRANSCRIBE_MAX_WAIT,
+    parallelism=max(1, settings.TRANSCRIBE_WORKERS) * settings.TRANSCRIBE_MAX_BATCH_SIZE,
+    service_time=_batch_seconds
+)
+
 def get_speech_service():
     """Get or create speech service instance."""
     global _speech_service
@@ -13,11 +39,90 @@ def get_speech_service():
         _speech_service = SpeechService()
     return _speech_service
 
+def get_speech_stats():
+    """Speech service counters, or None if it was never used."""
+    return _speech_service.stats() if _speech_service is not None else None
+
+async def shutdown_speech_service():
+    """Stop transcription, failing queued clips and stopping worker processes."""
+    if _speech_service is not None:
+        await _speech_service.close()
+
 @router.post("/api/speech/transcribe")
-async def transcribe_speech(audio: UploadFile = File(...)):
+async def transcribe_speech(request: Request, audio: UploadFile = File(...)):
     """Transcribe speech from audio file."""
-    logger.info(f"Received audio file: {audio.filename}, content_type: {audio.content_type}")
+    logger.info(
+        "Received audio file: %s", audio.filename,
+        extra={"content_type": audio.content_type}
+    )
     service = get_speech_service()
-    text = await service.transcribe_audio(audio)
-    logger.info(f"Transcription result: {text}")
-    return {"text": text} 
\ No newline at end of file
+    text = await transcribe_admission.run(request, lambda: service.transcribe_audio(audio))
+    # Transcripts are user content: only at DEBUG
+    logger.debug("Transcription result: %s", text)
+    return {"text": text}
+
+def _is_stop(text) -> bool:
+    """Accept either a bare ``stop`` or ``{"type": "stop"}``."""
+    if not text:
+        return False
+    try:
+        message = json.loads(text)
+    except ValueError:
+        return text.strip().lower() == "stop"
+    return isinstance(message, dict) and message.get("type") == "stop"
+
+@router.websocket("/api/speech/stream")
+async def stream_speech(
+    websocket: WebSocket,
+    audio_format: str = Query(default="pcm16", alias="format"),
+    sample_rate: int = Query(default=16000, gt=0)
+):
+    """Transcribe audio while it is being recorded.
+
+    The client sends binary audio frames (``pcm16`` or ``f32`` mono PCM at
+    ``sample_rate``, or ``webm`` MediaRecorder chunks) and a ``stop`` text
+    message when recording ends. The server answers with JSON ``partial``
+    and ``final`` transcripts per utterance and a closing ``done`` message.
+    """
+    await websocket.accept()
+    if audio_format not in AUDIO_FORMATS:
+        await websocket.send_json({"type": "error", "detail": f"Unsupported format: {audio_format}"})
+        await websocket.close(code=1003)
+        return
+
+    service = get_speech_service()
+    stream = StreamingTranscriber(service.transcribe_samples, websocket.send_json)
+    stream.start()
+    ffmpeg = None
+    if audio_format == "webm":
+        ffmpeg = FfmpegDecoder(stream.push)
+        await ffmpeg.start()
+    else:
+        pcm = PcmDecoder(audio_format, sample_rate)
+    logger.info("Speech stream opened (format=%s, sample_rate=%s)", audio_format, sample_rate)
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes"):
+                if ffmpeg is not None:
+                    await ffmpeg.write(message["bytes"])
+                else:
+                    await stream.push(pcm.decode(message["bytes"]))
+            elif _is_stop(message.get("text")):
+                break
+
+        if ffmpeg is not None:
+            await ffmpeg.finish()
+        await stream.finish()
+        logger.info("Speech stream finished after %d utterances", stream.segments)
+        await websocket.send_json({"type": "done", "segments": stream.segments})
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info("Speech stream closed by client")
+    finally:
+        stream.cancel()
+        if ffmpeg is not None:
+            ffmpeg.kill()
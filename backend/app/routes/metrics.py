@@ -0,0 +1,103 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.logger import logging_stats
+from app.core.metrics import REGISTRY
+from app.clients.llm_executor import llm_executor
+from app.services.generation_cache import generation_cache
+from app.services.question_pool import question_pool
+from app.services.quiz_generator import quiz_single_flight, quiz_admission
+from app.services.resilient_generation import resilient_generation
+from app.services.transcription_cache import transcription_cache
+from app.services.web_content_cache import web_content_cache
+from app.services.quiz_document_cache import quiz_document_cache
+from app.routers.speech import get_speech_stats, transcribe_admission
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _service_metrics():
+    """Counters the services already keep, read at scrape time."""
+    llm = llm_executor.stats()
+    yield "llm_queue_depth", "gauge", "LLM calls waiting for a worker", [({}, llm["waiting"])]
+    yield "llm_running", "gauge", "LLM calls running", [({}, llm["running"])]
+    yield "llm_rejected", "counter", "LLM calls rejected because the queue was full", [
+        ({}, llm["rejected"])
+    ]
+    yield "llm_timeouts", "counter", "LLM calls that timed out", [({}, llm["timeouts"])]
+    yield "llm_retries", "counter", "Generate calls retried after a failure or short answer", [
+        ({}, resilient_generation.retries)
+    ]
+    yield "llm_hedges", "counter", "Duplicate generate calls started for slow requests", [
+        ({"result": "won"}, resilient_generation.hedge_wins),
+        ({"result": "lost"}, resilient_generation.hedges - resilient_generation.hedge_wins),
+    ]
+
+    yield "cache_lookups", "counter", "Cache lookups by cache and result", [
+        ({"cache": "generation", "result": "hit"}, generation_cache.hits),
+        ({"cache": "generation", "result": "miss"}, generation_cache.misses),
+        ({"cache": "transcription", "result": "hit"},
+         transcription_cache.memory_hits + transcription_cache.disk_hits),
+        ({"cache": "transcription", "result": "miss"}, transcription_cache.misses),
+        ({"cache": "web", "result": "hit"}, web_content_cache.hits),
+        ({"cache": "web", "result": "miss"}, web_content_cache.misses + web_content_cache.refreshes),
+        ({"cache": "quiz_document", "result": "hit"}, quiz_document_cache.hits),
+        ({"cache": "quiz_document", "result": "miss"}, quiz_document_cache.misses),
+    ]
+    yield "web_stale_served", "counter", "Expired web results used because search was unreachable", [
+        ({}, web_content_cache.stale_served)
+    ]
+    yield "question_pool_served", "counter", "Questions served from the pre-generated pool", [
+        ({}, question_pool.served)
+    ]
+    yield "quiz_coalesced", "counter", "Quiz requests that shared another request's generation", [
+        ({}, quiz_single_flight.coalesced)
+    ]
+
+    admission = {"quiz": quiz_admission.stats(), "transcribe": transcribe_admission.stats()}
+    yield "admission_in_flight", "gauge", "Requests admitted and not yet answered", [
+        ({"endpoint": name}, s["in_flight"]) for name, s in admission.items()
+    ]
+    yield "admission_limit", "gauge", "Requests admitted at once at the current backend latency", [
+        ({"endpoint": name}, s["limit"]) for name, s in admission.items()
+    ]
+    yield "admission_rejected", "counter", "Requests shed before reaching the backend", [
+        sample
+        for name, s in admission.items()
+        for sample in (
+            ({"endpoint": name, "reason": "capacity"}, s["rejected_over_capacity"]),
+            ({"endpoint": name, "reason": "wait"}, s["rejected_over_wait"]),
+        )
+    ]
+    yield "admission_disconnected", "counter", "Requests cancelled because the client left", [
+        ({"endpoint": name}, s["disconnected"]) for name, s in admission.items()
+    ]
+
+    logs = logging_stats()
+    yield "log_records_dropped", "counter", "Log records dropped", [
+        ({"reason": "queue_full"}, logs["dropped"]),
+        ({"reason": "rate_limited"}, logs["rate_limited"]),
+    ]
+
+    speech = get_speech_stats()
+    if speech is not None:
+        batching = speech["batching"]
+        yield "transcription_queue_depth", "gauge", "Clips waiting for a Whisper batch", [
+            ({}, batching["queued"])
+        ]
+        yield "transcription_batches_decoding", "gauge", "Whisper batches decoding", [
+            ({}, batching["decoding"])
+        ]
+        yield "transcription_failures", "counter", "Whisper batches that failed", [
+            ({}, batching["failures"])
+        ]
+
+
+REGISTRY.register_collector(_service_metrics)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
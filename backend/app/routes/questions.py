@@ -0,0 +1,28 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import QuestionType, DifficultyLevel
+from app.database import get_async_db
+from app.services.search_service import search_questions
+
+router = APIRouter()
+
+@router.get("/api/questions/search")
+async def search_question_bank(
+    q: str = Query(min_length=1),
+    question_type: Optional[QuestionType] = None,
+    difficulty: Optional[DifficultyLevel] = None,
+    limit: int = Query(default=20, gt=0, le=100),
+    offset: int = Query(default=0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over every stored question, best match first."""
+    items, next_offset = await search_questions(
+        db,
+        q,
+        question_type=question_type,
+        difficulty=difficulty,
+        limit=limit,
+        offset=offset
+    )
+    return {"items": items, "next_offset": next_offset}
@@ -1,6 +1,7 @@
+import httpx
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from app.clients.educhain_client import update_model
+from app.clients.model_registry import model_registry
 
 router = APIRouter()
 
@@ -10,7 +11,18 @@ class ModelUpdate(BaseModel):
 @router.post("/api/settings/model")
 async def update_llm_model(model_update: ModelUpdate):
     try:
-        update_model(model_update.model_name)
-        return {"status": "success", "message": f"Model updated to {model_update.model_name}"}
+        swap = await model_registry.switch(model_update.model_name)
+        return {
+            "status": "success",
+            "message": f"Model updated to {model_update.model_name}",
+            "swap_seconds": swap["swap_seconds"],
+            "warmup_seconds": swap["warmup_seconds"]
+        }
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Failed to load model: {str(e)}")
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/api/settings/model")
+async def read_llm_model():
+    return model_registry.stats()
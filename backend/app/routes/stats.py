@@ -0,0 +1,41 @@
+import asyncio
+
+from fastapi import APIRouter
+from app.clients.llm_executor import llm_executor
+from app.clients.model_registry import model_registry
+from app.services.generation_cache import generation_cache
+from app.services.question_pool import question_pool
+from app.services.quiz_generator import quiz_single_flight, quiz_admission
+from app.services.quiz_batch import quiz_batches
+from app.services.dedup import question_dedup
+from app.services.resilient_generation import resilient_generation
+from app.services.transcription_cache import transcription_cache
+from app.services.web_content_cache import web_content_cache
+from app.services.quiz_document_cache import quiz_document_cache
+from app.routers.speech import get_speech_stats, transcribe_admission
+from app.core.logger import logging_stats
+
+router = APIRouter()
+
+@router.get("/api/stats")
+async def read_stats():
+    """Runtime counters for the generation pipeline."""
+    return {
+        "llm": llm_executor.stats(),
+        "models": model_registry.stats(),
+        "generation_cache": await asyncio.to_thread(generation_cache.stats),
+        "question_pool": await question_pool.stats(),
+        "quiz_coalescing": quiz_single_flight.stats(),
+        "quiz_batches": quiz_batches.stats(),
+        "generation_retries": resilient_generation.stats(),
+        "admission": {
+            "quiz": quiz_admission.stats(),
+            "transcribe": transcribe_admission.stats(),
+        },
+        "dedup": question_dedup.stats(),
+        "speech": get_speech_stats(),
+        "transcription_cache": await asyncio.to_thread(transcription_cache.stats),
+        "web_content_cache": await asyncio.to_thread(web_content_cache.stats),
+        "quiz_document_cache": quiz_document_cache.stats(),
+        "logging": logging_stats()
+    }
@@ -0,0 +1,205 @@
+import io
+import math
+import subprocess
+from itertools import chain as _chain
+from typing import BinaryIO, Optional
+
+import numpy as np
+import soundfile as sf
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+SAMPLE_RATE = 16000
+BLOCK_FRAMES = 64 * 1024  # input frames decoded per block
+
+
+class AudioDecodeError(Exception):
+    """The upload is not audio we can decode."""
+    pass
+
+
+class AudioTooLongError(AudioDecodeError):
+    """The upload is longer than MAX_AUDIO_DURATION."""
+
+    def __init__(self, duration: Optional[float], limit: float):
+        self.duration = duration
+        self.limit = limit
+        super().__init__(f"Audio duration exceeds maximum of {limit:g} seconds")
+
+
+def sniff_format(file: BinaryIO) -> str:
+    """Container format from the first bytes of the file."""
+    file.seek(0)
+    head = file.read(12)
+    file.seek(0)
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    raise AudioDecodeError("Unsupported audio format; expected webm, ogg, wav or flac")
+
+
+class StreamingResampler:
+    """Linear-interpolation resampler that writes into a preallocated buffer.
+
+    Blocks are resampled as they are decoded; the last input sample of each
+    block is carried over so block edges interpolate seamlessly.
+    """
+
+    def __init__(self, rate_in: int, out: np.ndarray, rate_out: int = SAMPLE_RATE):
+        self.step = rate_in / rate_out
+        self.out = out
+        self.written = 0
+        self._consumed = 0  # input samples seen so far
+        self._next = 0.0  # input position of the next output sample
+        self._carry = None
+
+    def write(self, block: np.ndarray):
+        if self.step == 1.0:
+            n = min(len(block), len(self.out) - self.written)
+            self.out[self.written:self.written + n] = block[:n]
+            self.written += n
+            return
+        if self._carry is None:
+            samples, first = block, self._consumed
+        else:
+            samples, first = np.concatenate(([self._carry], block)), self._consumed - 1
+        last = self._consumed + len(block) - 1
+        count = min(
+            max(0, math.floor((last - self._next) / self.step) + 1),
+            len(self.out) - self.written
+        )
+        if count:
+            positions = self._next + self.step * np.arange(count)
+            self.out[self.written:self.written + count] = np.interp(
+                positions - first, np.arange(len(samples)), samples
+            )
+            self.written += count
+            self._next += self.step * count
+        self._consumed += len(block)
+        self._carry = block[-1] if len(block) else self._carry
+
+    def resample(self, block: np.ndarray) -> np.ndarray:
+        """Resample one block of an open-ended stream into a new array."""
+        self.out = np.empty(math.floor(len(block) / self.step) + 2, dtype=np.float32)
+        self.written = 0
+        self.write(block)
+        return self.out[:self.written]
+
+
+def _output_frames(duration: float) -> int:
+    return int(math.ceil(duration * SAMPLE_RATE))
+
+
+def _decode_soundfile(file: BinaryIO, max_duration: float) -> np.ndarray:
+    """wav/flac/ogg: duration is checked from the header before decoding."""
+    try:
+        stream = sf.SoundFile(file)
+    except RuntimeError as e:
+        raise AudioDecodeError(f"Could not read audio: {str(e)}")
+    with stream:
+        duration = stream.frames / stream.samplerate
+        if duration > max_duration:
+            raise AudioTooLongError(duration, max_duration)
+        out = np.empty(_output_frames(duration), dtype=np.float32)
+        resampler = StreamingResampler(stream.samplerate, out)
+        block = np.empty((BLOCK_FRAMES, stream.channels), dtype=np.float32)
+        mono = np.empty(BLOCK_FRAMES, dtype=np.float32)
+        while True:
+            n = len(stream.read(BLOCK_FRAMES, dtype="float32", always_2d=True, out=block))
+            if not n:
+                break
+            if stream.channels == 1:
+                resampler.write(block[:n, 0])
+            else:
+                np.mean(block[:n], axis=1, out=mono[:n])
+                resampler.write(mono[:n])
+    return out[:resampler.written]
+
+
+def _pyav():
+    """PyAV, imported on first webm upload; None if it is not installed."""
+    try:
+        import av
+    except ImportError:  # PyAV is optional; webm falls back to an ffmpeg pipe
+        return None
+    return av
+
+
+def _decode_pyav(av, file: BinaryIO, max_duration: float) -> np.ndarray:
+    """webm/opus via PyAV, resampled to mono 16 kHz by libswresample."""
+    try:
+        container = av.open(file, mode="r")
+    except av.FFmpegError as e:
+        raise AudioDecodeError(f"Could not read audio: {str(e)}")
+    with container:
+        # MediaRecorder output usually has no duration in its header, so
+        # the limit is also enforced while decoding
+        if container.duration is not None:
+            duration = container.duration / av.time_base
+            if duration > max_duration:
+                raise AudioTooLongError(duration, max_duration)
+        else:
+            duration = max_duration
+        out = np.empty(_output_frames(duration), dtype=np.float32)
+        written = 0
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=SAMPLE_RATE)
+        try:
+            # A trailing None flushes samples buffered in the resampler
+            for frame in _chain(container.decode(audio=0), [None]):
+                for resampled in resampler.resample(frame):
+                    samples = resampled.to_ndarray().reshape(-1)
+                    if written + len(samples) > len(out):
+                        raise AudioTooLongError(None, max_duration)
+                    out[written:written + len(samples)] = samples
+                    written += len(samples)
+        except av.FFmpegError as e:
+            raise AudioDecodeError(f"Could not decode audio: {str(e)}")
+    return out[:written]
+
+
+def _decode_ffmpeg(file: BinaryIO, max_duration: float) -> np.ndarray:
+    """webm fallback when PyAV is not installed: one ffmpeg pipe, no pydub."""
+    file.seek(0)
+    command = [
+        "ffmpeg", "-loglevel", "error", "-i", "pipe:0",
+        # Stop just past the limit so overlong uploads are detected cheaply
+        "-t", str(max_duration + 0.1),
+        "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"
+    ]
+    try:
+        file.fileno()
+        stdin, data = file, None  # A real file: ffmpeg reads the descriptor directly
+    except (AttributeError, io.UnsupportedOperation):
+        stdin, data = None, file.read()
+    try:
+        result = subprocess.run(command, stdin=stdin, input=data, capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise AudioDecodeError(f"Could not decode audio: {str(e)}")
+    pcm = np.frombuffer(result.stdout, dtype="<i2")
+    if len(pcm) > max_duration * SAMPLE_RATE:
+        raise AudioTooLongError(None, max_duration)
+    out = np.empty(len(pcm), dtype=np.float32)
+    np.multiply(pcm, 1 / 32768.0, out=out)
+    return out
+
+
+def decode_audio(file: BinaryIO, max_duration: float = settings.MAX_AUDIO_DURATION) -> np.ndarray:
+    """Decode an uploaded file to mono 16 kHz float32 samples.
+
+    ``file`` is read in place (an ``UploadFile.file`` spooled buffer works
+    as is), so the upload is never copied into one big bytes object.
+    """
+    audio_format = sniff_format(file)
+    if audio_format in ("wav", "flac", "ogg"):
+        return _decode_soundfile(file, max_duration)
+    av = _pyav()
+    if av is not None:
+        return _decode_pyav(av, file, max_duration)
+    return _decode_ffmpeg(file, max_duration)
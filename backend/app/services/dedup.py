@@ -0,0 +1,323 @@
+import re
+import time
+import zlib
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import QuizQuestion
+from app.database import AsyncSessionLocal, StoredQuestion, QuestionSignature, QuestionLSHBucket
+from app.core.config import get_settings
+from app.core.logger import logger
+
+settings = get_settings()
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_PRIME = np.uint64(4294967311)  # Smallest prime above 2**32
+_MASK32 = np.uint64(0xFFFFFFFF)
+_FNV_PRIME = np.uint64(1099511628211)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_SHINGLE_SIZE = 5  # characters
+_MAX_SQL_PARAMS = 900
+
+DEDUP_MODES = ("drop", "link", "regenerate")
+
+
+def shingle_hashes(text: str, size: int = _SHINGLE_SIZE) -> np.ndarray:
+    """32-bit hashes of the character shingles of normalized text."""
+    normalized = " ".join(_WORD.findall(text.casefold()))
+    if len(normalized) <= size:
+        grams = [normalized]
+    else:
+        grams = [normalized[i:i + size] for i in range(len(normalized) - size + 1)]
+    return np.fromiter(
+        (zlib.crc32(gram.encode("utf-8")) for gram in set(grams)),
+        dtype=np.uint64
+    )
+
+
+class MinHasher:
+    """Vectorized MinHash signatures with LSH banding.
+
+    The permutation coefficients come from a fixed seed so signatures stay
+    comparable with those already stored in the bank.
+    """
+
+    def __init__(self, num_perm: int, bands: int, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._a = rng.integers(1, 2 ** 31, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 31, num_perm, dtype=np.uint64)
+        self._band_salt = (np.arange(1, bands + 1, dtype=np.uint64) * _GOLDEN)
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """MinHash signatures for a batch of texts, shape (len(texts), num_perm)."""
+        if not texts:
+            return np.empty((0, self.num_perm), dtype=np.uint32)
+        hashes = [shingle_hashes(text) for text in texts]
+        offsets = np.cumsum([0] + [len(h) for h in hashes[:-1]])
+        # One (shingles x permutations) matrix for the whole batch, then a
+        # segmented min per text
+        permuted = (np.outer(np.concatenate(hashes), self._a) + self._b) % _PRIME
+        permuted &= _MASK32
+        return np.minimum.reduceat(permuted, offsets, axis=0).astype(np.uint32)
+
+    def band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """Signed 64-bit bucket key per (text, band), shape (n, bands)."""
+        banded = signatures.astype(np.uint64).reshape(len(signatures), self.bands, self.rows)
+        keys = np.zeros(banded.shape[:2], dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for row in range(self.rows):
+                keys = (keys * _FNV_PRIME) ^ banded[:, :, row]
+            keys ^= self._band_salt
+        return keys.view(np.int64)
+
+    @staticmethod
+    def similarity(signature: np.ndarray, others: np.ndarray) -> np.ndarray:
+        """Estimated Jaccard similarity of one signature against many."""
+        return (others == signature).mean(axis=1)
+
+
+def _chunks(values: List, size: int = _MAX_SQL_PARAMS):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class QuestionDeduplicator:
+    """Near-duplicate detection for generated questions.
+
+    Fresh LLM output is checked against itself and against every question
+    already in the bank before it is stored. Depending on ``mode``
+    duplicates are dropped, kept but linked to the earlier question, or
+    replaced by regenerated questions. Lookups go through LSH buckets, so
+    the cost depends on the number of candidates, not the bank size.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        mode: str = settings.DEDUP_MODE,
+        threshold: float = settings.DEDUP_THRESHOLD,
+        num_perm: int = settings.DEDUP_NUM_PERM,
+        bands: int = settings.DEDUP_BANDS,
+        regenerate_attempts: int = settings.DEDUP_REGENERATE_ATTEMPTS
+    ):
+        if mode not in DEDUP_MODES:
+            raise ValueError(f"Unknown dedup mode: {mode}")
+        self.session_factory = session_factory
+        self.mode = mode
+        self.threshold = threshold
+        self.regenerate_attempts = max(1, regenerate_attempts)
+        self.hasher = MinHasher(num_perm, bands)
+        self.checked = 0
+        self.duplicates = 0
+        self.dropped = 0
+        self.regenerated = 0
+        self.kept_duplicates = 0
+        self.linked = 0
+        self.indexed = 0
+        self.bytes_saved = 0
+        self.signature_seconds = 0.0
+
+    def _signatures(self, texts: Sequence[str]) -> np.ndarray:
+        started = time.perf_counter()
+        signatures = self.hasher.signatures(texts)
+        self.signature_seconds += time.perf_counter() - started
+        self.checked += len(texts)
+        return signatures
+
+    def _batch_matches(self, signatures: np.ndarray) -> List[Optional[int]]:
+        """Index of an earlier near-identical entry in the same batch."""
+        matches: List[Optional[int]] = [None] * len(signatures)
+        if len(signatures) < 2:
+            return matches
+        pairwise = (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)
+        for j in range(1, len(signatures)):
+            earlier = np.nonzero(pairwise[j, :j] >= self.threshold)[0]
+            if len(earlier):
+                matches[j] = int(earlier[0])
+        return matches
+
+    async def _bank_matches(
+        self,
+        db: AsyncSession,
+        signatures: np.ndarray,
+        exclude_session: Optional[int] = None
+    ) -> List[Optional[int]]:
+        """Id of a near-identical question already in the bank, per signature."""
+        matches: List[Optional[int]] = [None] * len(signatures)
+        if not len(signatures):
+            return matches
+        band_keys = self.hasher.band_keys(signatures)
+
+        buckets: Dict[int, List[int]] = {}
+        for chunk in _chunks(np.unique(band_keys).tolist()):
+            result = await db.execute(
+                select(QuestionLSHBucket.band_key, QuestionLSHBucket.question_id)
+                .filter(QuestionLSHBucket.band_key.in_(chunk))
+            )
+            for band_key, question_id in result:
+                buckets.setdefault(band_key, []).append(question_id)
+        if not buckets:
+            return matches
+
+        candidate_ids = sorted({qid for ids in buckets.values() for qid in ids})
+        stored: Dict[int, np.ndarray] = {}
+        for chunk in _chunks(candidate_ids):
+            query = select(QuestionSignature.question_id, QuestionSignature.signature)\
+                .filter(QuestionSignature.question_id.in_(chunk))
+            if exclude_session is not None:
+                query = query.join(StoredQuestion, StoredQuestion.id == QuestionSignature.question_id)\
+                    .filter(StoredQuestion.quiz_session_id != exclude_session)
+            for question_id, blob in await db.execute(query):
+                stored[question_id] = np.frombuffer(blob, dtype="<u4")
+
+        for i, keys in enumerate(band_keys.tolist()):
+            ids = sorted({qid for key in keys for qid in buckets.get(key, ()) if qid in stored})
+            if not ids:
+                continue
+            scores = self.hasher.similarity(signatures[i], np.stack([stored[qid] for qid in ids]))
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                matches[i] = ids[best]
+        return matches
+
+    async def _duplicates(self, questions: List[QuizQuestion]) -> List[bool]:
+        signatures = self._signatures([q.question for q in questions])
+        async with self.session_factory() as db:
+            in_bank = await self._bank_matches(db, signatures)
+        in_batch = self._batch_matches(signatures)
+        flags = [bank is not None or batch is not None for bank, batch in zip(in_bank, in_batch)]
+        self.duplicates += sum(flags)
+        return flags
+
+    async def filter_new(
+        self,
+        questions: List[QuizQuestion],
+        regenerate: Optional[Callable[[int], Awaitable[List[QuizQuestion]]]] = None
+    ) -> List[QuizQuestion]:
+        """Apply the dedup policy to freshly generated questions.
+
+        In ``link`` mode questions pass through unchanged; links are written
+        when the session is recorded. ``drop`` mode returns only the new
+        questions. ``regenerate`` mode always returns as many questions as it
+        was given: replacements are requested for the missing ones, up to
+        ``regenerate_attempts`` times, and if those keep coming back as
+        duplicates the first dropped questions fill the remaining places.
+        Kept questions are renumbered from the first id of the batch.
+        """
+        if self.mode == "link" or not questions:
+            return questions
+        start_id = questions[0].id
+
+        flags = await self._duplicates(questions)
+        kept = [q for q, duplicate in zip(questions, flags) if not duplicate]
+        dropped = [q for q, duplicate in zip(questions, flags) if duplicate]
+
+        if dropped and self.mode == "regenerate" and regenerate is not None:
+            for _ in range(self.regenerate_attempts):
+                missing = len(questions) - len(kept)
+                if not missing:
+                    break
+                replacements = await regenerate(missing)
+                if not replacements:
+                    continue
+                # Check replacements against the bank and the questions kept so far
+                candidates = kept + replacements
+                flags = await self._duplicates(candidates)
+                fresh = [
+                    q for q, duplicate in zip(candidates[len(kept):], flags[len(kept):])
+                    if not duplicate
+                ][:missing]
+                self.regenerated += len(fresh)
+                kept += fresh
+
+            missing = len(questions) - len(kept)
+            if missing:
+                # Keep the count: a near-duplicate beats a short quiz
+                self.kept_duplicates += missing
+                logger.info("Kept %d near-duplicates after %d replacement attempts",
+                            missing, self.regenerate_attempts)
+                kept += dropped[:missing]
+                dropped = dropped[missing:]
+
+        if dropped:
+            logger.info("Dropped %d near-duplicate questions", len(dropped))
+        self.dropped += len(dropped)
+        self.bytes_saved += sum(
+            len(q.question.encode("utf-8")) + len(q.correctAnswer.encode("utf-8"))
+            for q in dropped
+        )
+        return [q.model_copy(update={"id": i}) for i, q in enumerate(kept, start=start_id)]
+
+    async def record(self, db: AsyncSession, quiz_session_id: int, commit: bool = True) -> None:
+        """Store signatures for a session's questions and index new ones.
+
+        Questions that near-duplicate the bank (cache hits, coalesced copies
+        or duplicates kept in ``link`` mode) are linked to the earlier
+        question instead of being added to the LSH index. Pass
+        ``commit=False`` to record several sessions in one transaction.
+        """
+        rows = (await db.execute(
+            select(StoredQuestion.id, StoredQuestion.question_text)
+            .filter(StoredQuestion.quiz_session_id == quiz_session_id)
+            .order_by(StoredQuestion.id)
+        )).all()
+        if not rows:
+            return
+
+        question_ids = [row[0] for row in rows]
+        signatures = self._signatures([row[1] for row in rows])
+        in_bank = await self._bank_matches(db, signatures, exclude_session=quiz_session_id)
+        in_batch = self._batch_matches(signatures)
+
+        signature_rows, bucket_rows = [], []
+        band_keys = self.hasher.band_keys(signatures)
+        for i, question_id in enumerate(question_ids):
+            duplicate_of = in_bank[i]
+            if duplicate_of is None and in_batch[i] is not None:
+                duplicate_of = question_ids[in_batch[i]]
+            signature_rows.append({
+                "question_id": question_id,
+                "signature": signatures[i].astype("<u4").tobytes(),
+                "duplicate_of": duplicate_of
+            })
+            if duplicate_of is None:
+                bucket_rows.extend(
+                    {"band_key": key, "question_id": question_id}
+                    for key in set(band_keys[i].tolist())
+                )
+                self.indexed += 1
+            else:
+                self.linked += 1
+
+        await db.execute(insert(QuestionSignature), signature_rows)
+        if bucket_rows:
+            await db.execute(insert(QuestionLSHBucket), bucket_rows)
+        if commit:
+            await db.commit()
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "checked": self.checked,
+            "duplicates": self.duplicates,
+            "dropped": self.dropped,
+            "regenerated": self.regenerated,
+            "kept_duplicates": self.kept_duplicates,
+            "linked": self.linked,
+            "indexed": self.indexed,
+            "bytes_saved": self.bytes_saved,
+            "signatures_per_second": (
+                self.checked / self.signature_seconds if self.signature_seconds else 0.0
+            ),
+        }
+
+
+question_dedup = QuestionDeduplicator()
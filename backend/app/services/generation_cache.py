@@ -0,0 +1,180 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from app.core.config import get_settings
+from app.core.logger import logger
+from app.models import QuestionType, DifficultyLevel, QuizQuestion
+
+settings = get_settings()
+
+
+def normalize_topic(topic: str) -> str:
+    """Fold case and collapse whitespace so equivalent topics share a key."""
+    return " ".join(topic.split()).casefold()
+
+
+def make_cache_key(
+    topic: str,
+    question_type: QuestionType,
+    num_questions: int,
+    difficulty: DifficultyLevel,
+    learning_objective: Optional[str],
+    use_web_search: bool,
+    model_name: str,
+    offset: int = 0
+) -> str:
+    """Build the cache key for one generate_questions call.
+
+    ``offset`` is the position of the set within its question type, so the
+    chunks of a streamed quiz each get their own entry.
+    """
+    parts = [
+        normalize_topic(topic),
+        question_type.value,
+        num_questions,
+        difficulty.value,
+        normalize_topic(learning_objective) if learning_objective else None,
+        use_web_search,
+        model_name,
+    ]
+    if offset:
+        parts.append(offset)
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    """SQLite-backed LRU cache of generated question sets.
+
+    Entries expire after ``ttl`` seconds and the least recently used ones are
+    evicted once more than ``max_entries`` are stored. The database lives next
+    to ``quiz.db`` so cached generations survive restarts.
+    """
+
+    def __init__(self, path: Path, max_entries: int, ttl: float):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS generation_cache ("
+                " key TEXT PRIMARY KEY,"
+                " model_name TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_generation_cache_accessed_at"
+                " ON generation_cache (accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str, start_id: int = 1) -> Optional[List[QuizQuestion]]:
+        """Return the cached questions for ``key`` numbered from ``start_id``."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT payload, created_at FROM generation_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM generation_cache WHERE key = ?", (key,))
+                conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE generation_cache SET accessed_at = ? WHERE key = ?",
+                (now, key)
+            )
+            conn.commit()
+            self.hits += 1
+
+        return [
+            QuizQuestion(**{**data, "id": i})
+            for i, data in enumerate(json.loads(row[0]), start=start_id)
+        ]
+
+    def put(self, key: str, model_name: str, questions: List[QuizQuestion]) -> None:
+        """Store a generated question set, evicting the oldest entries if full."""
+        if not questions:
+            return
+        payload = json.dumps([q.model_dump(mode="json") for q in questions])
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO generation_cache"
+                " (key, model_name, payload, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, model_name, payload, now, now)
+            )
+            conn.execute(
+                "DELETE FROM generation_cache WHERE created_at < ?",
+                (now - self.ttl,)
+            )
+            (count,) = conn.execute("SELECT COUNT(*) FROM generation_cache").fetchone()
+            if count > self.max_entries:
+                cursor = conn.execute(
+                    "DELETE FROM generation_cache WHERE key IN ("
+                    " SELECT key FROM generation_cache"
+                    " ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+                self.evictions += cursor.rowcount
+            conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM generation_cache")
+            conn.commit()
+        logger.info("Generation cache cleared")
+
+    def stats(self) -> dict:
+        with self._lock:
+            (entries,) = self._connect().execute(
+                "SELECT COUNT(*) FROM generation_cache"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+generation_cache = GenerationCache(
+    path=Path(settings.DATA_DIR) / "generation_cache.db",
+    max_entries=settings.GENERATION_CACHE_MAX_ENTRIES,
+    ttl=settings.GENERATION_CACHE_TTL
+)
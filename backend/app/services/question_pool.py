@@ -0,0 +1,290 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import QuestionType, DifficultyLevel, QuizQuestion
+from app.database import AsyncSessionLocal, QuizSession, StoredQuestion, PooledQuestion
+from app.clients.educhain_client import generate_questions, current_model_name
+from app.clients.llm_executor import llm_executor, LLMPriority
+from app.services.generation_cache import normalize_topic
+from app.core.config import get_settings
+from app.core.logger import logger
+
+settings = get_settings()
+
+PoolKey = Tuple[str, QuestionType, DifficultyLevel]
+
+
+class QuestionPool:
+    """Pool of pre-generated, unused questions per (topic, type, difficulty).
+
+    Requests draw from the pool instantly. A background worker refills keys
+    that were just drawn from as soon as the LLM has spare capacity, and keeps
+    the most requested combinations in ``quiz_sessions`` topped up once the
+    server has been idle for ``idle_seconds``.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        target_size: int = settings.POOL_TARGET_SIZE,
+        batch_size: int = settings.POOL_BATCH_SIZE,
+        max_keys: int = settings.POOL_MAX_KEYS,
+        lookback_days: int = settings.POOL_LOOKBACK_DAYS,
+        idle_seconds: float = settings.POOL_IDLE_SECONDS,
+        check_interval: float = settings.POOL_CHECK_INTERVAL
+    ):
+        self.session_factory = session_factory
+        self.target_size = target_size
+        self.batch_size = batch_size
+        self.max_keys = max_keys
+        self.lookback_days = lookback_days
+        self.idle_seconds = idle_seconds
+        self.check_interval = check_interval
+        self.served = 0
+        self.generated = 0
+        self.failures = 0
+        self._last_activity = 0.0
+        self._top_ups: "OrderedDict[PoolKey, str]" = OrderedDict()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def note_activity(self) -> None:
+        """Record interactive traffic; popular-topic fills wait for quiet."""
+        self._last_activity = time.monotonic()
+
+    def is_idle(self) -> bool:
+        llm = llm_executor.stats()
+        return (
+            llm["running"] == 0 and llm["waiting"] == 0
+            and time.monotonic() - self._last_activity >= self.idle_seconds
+        )
+
+    def has_spare_capacity(self) -> bool:
+        llm = llm_executor.stats()
+        return llm["waiting"] == 0 and llm["running"] < llm["max_concurrency"]
+
+    async def draw(
+        self,
+        topic: str,
+        question_type: QuestionType,
+        difficulty: DifficultyLevel,
+        count: int,
+        start_id: int
+    ) -> List[QuizQuestion]:
+        """Take up to ``count`` unused questions out of the pool.
+
+        Uses its own short session, since question types of one quiz draw
+        concurrently and an AsyncSession cannot be shared between tasks.
+        Rows are claimed with a single ``DELETE ... RETURNING``, so concurrent
+        draws for the same key never serve the same question twice.
+        """
+        topic_key = normalize_topic(topic)
+        oldest = (
+            select(PooledQuestion.id)
+            .filter(
+                PooledQuestion.topic_key == topic_key,
+                PooledQuestion.question_type == question_type,
+                PooledQuestion.difficulty_level == difficulty,
+                PooledQuestion.model_name == current_model_name()
+            )
+            .order_by(PooledQuestion.id)
+            .limit(count)
+        )
+        async with self.session_factory() as db:
+            result = await db.execute(
+                delete(PooledQuestion)
+                .where(PooledQuestion.id.in_(oldest.scalar_subquery()))
+                .returning(
+                    PooledQuestion.id,
+                    PooledQuestion.question_text,
+                    PooledQuestion.options,
+                    PooledQuestion.correct_answer,
+                    PooledQuestion.question_type
+                )
+                .execution_options(synchronize_session=False)
+            )
+            # RETURNING order is unspecified; serve oldest first
+            rows = sorted(result.all(), key=lambda row: row.id)
+            await db.commit()
+
+        questions = [
+            QuizQuestion(
+                id=i,
+                question=row.question_text,
+                options=json.loads(row.options) if row.options else None,
+                correctAnswer=row.correct_answer,
+                type=row.question_type
+            )
+            for i, row in enumerate(rows, start=start_id)
+        ]
+        self.served += len(questions)
+        self.request_top_up(topic, question_type, difficulty)
+        return questions
+
+    def request_top_up(
+        self,
+        topic: str,
+        question_type: QuestionType,
+        difficulty: DifficultyLevel
+    ) -> None:
+        """Ask the worker to refill a key in the background."""
+        key = (normalize_topic(topic), question_type, difficulty)
+        self._top_ups[key] = topic
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def pool_size(self, db: AsyncSession, key: PoolKey, model_name: str) -> int:
+        topic_key, question_type, difficulty = key
+        return await db.scalar(
+            select(func.count(PooledQuestion.id))
+            .filter(
+                PooledQuestion.topic_key == topic_key,
+                PooledQuestion.question_type == question_type,
+                PooledQuestion.difficulty_level == difficulty,
+                PooledQuestion.model_name == model_name
+            )
+        )
+
+    async def popular_keys(self, db: AsyncSession) -> List[Tuple[PoolKey, str]]:
+        """Most requested (topic, type, difficulty) combinations recently."""
+        since = datetime.utcnow() - timedelta(days=self.lookback_days)
+        result = await db.execute(
+            select(
+                QuizSession.topic,
+                StoredQuestion.question_type,
+                QuizSession.difficulty_level,
+                func.count(func.distinct(QuizSession.id)).label("requests")
+            )
+            .join(StoredQuestion, StoredQuestion.quiz_session_id == QuizSession.id)
+            .filter(QuizSession.created_at >= since)
+            .group_by(
+                QuizSession.topic,
+                StoredQuestion.question_type,
+                QuizSession.difficulty_level
+            )
+        )
+        rows = result.all()
+
+        # Merge topics that only differ in case or whitespace
+        ranked = {}
+        for topic, question_type, difficulty, requests in rows:
+            key = (normalize_topic(topic), question_type, difficulty)
+            _, total = ranked.get(key, (topic, 0))
+            ranked[key] = (topic, total + requests)
+        ordered = sorted(ranked.items(), key=lambda item: item[1][1], reverse=True)
+        return [(key, topic) for key, (topic, _) in ordered[:self.max_keys]]
+
+    async def _next_key(self, db: AsyncSession, model_name: str) -> Optional[Tuple[PoolKey, str, int]]:
+        """Pick the next key to fill and how many questions it is missing."""
+        while self._top_ups and self.has_spare_capacity():
+            key, topic = self._top_ups.popitem(last=False)
+            missing = self.target_size - await self.pool_size(db, key, model_name)
+            if missing > 0:
+                return key, topic, missing
+
+        if not self.is_idle():
+            return None
+        for key, topic in await self.popular_keys(db):
+            missing = self.target_size - await self.pool_size(db, key, model_name)
+            if missing > 0:
+                return key, topic, missing
+        return None
+
+    async def fill_once(self) -> bool:
+        """Generate one batch for the neediest key. Returns False if none."""
+        model_name = current_model_name()
+        async with self.session_factory() as db:
+            picked = await self._next_key(db, model_name)
+        if picked is None:
+            return False
+        (topic_key, question_type, difficulty), topic, missing = picked
+
+        questions = await generate_questions(
+            topic=topic,
+            question_type=question_type,
+            num_questions=min(self.batch_size, missing),
+            difficulty=difficulty,
+            learning_objective=None,
+            start_id=1,
+            priority=LLMPriority.BACKGROUND
+        )
+        if questions:
+            async with self.session_factory() as db:
+                await db.execute(insert(PooledQuestion), [
+                    {
+                        "topic_key": topic_key,
+                        "topic": topic,
+                        "question_type": question_type,
+                        "difficulty_level": difficulty,
+                        "model_name": model_name,
+                        "question_text": question.question,
+                        "correct_answer": question.correctAnswer,
+                        "options": json.dumps(question.options) if question.options else None,
+                        "created_at": datetime.utcnow()
+                    }
+                    for question in questions
+                ])
+                await db.commit()
+            self.generated += len(questions)
+
+        if 0 < len(questions) < missing:
+            # Keep filling this key on the next pass
+            self._top_ups[(topic_key, question_type, difficulty)] = topic
+        return bool(questions)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                filled = await self.fill_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                logger.warning("Question pool pre-generation failed: %s", e)
+                filled = False
+
+            if filled:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logger.info("Question pool worker started")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Question pool worker stopped")
+
+    async def stats(self) -> dict:
+        async with self.session_factory() as db:
+            pooled = await db.scalar(select(func.count(PooledQuestion.id)))
+        return {
+            "pooled_questions": pooled,
+            "target_size": self.target_size,
+            "pending_top_ups": len(self._top_ups),
+            "served": self.served,
+            "generated": self.generated,
+            "failures": self.failures,
+        }
+
+
+question_pool = QuestionPool()
@@ -0,0 +1,279 @@
+import asyncio
+import contextvars
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import QuizConfig, QuizQuestion, QuestionTypeConfig
+from app.clients.llm_executor import LLMPriority, LLMQueueFullError
+from app.database import AsyncSessionLocal
+from app.services.dedup import question_dedup
+from app.services.generation_cache import normalize_topic
+from app.services.quiz_generator import generate_question_set
+from app.services.quiz_service import store_quiz_sessions_async
+from app.core.config import get_settings
+from app.core.logger import logger, request_id_var
+
+settings = get_settings()
+
+_QUEUE_FULL_RETRY_SECONDS = 1.0
+
+
+class _Unit:
+    """One generate call shared by every quiz in the batch that needs it."""
+
+    def __init__(self, config: QuizConfig, qt: QuestionTypeConfig):
+        self.config = config
+        self.qt = qt
+        self.questions: Optional[List[QuizQuestion]] = None
+        self.error: Optional[str] = None
+
+
+def _unit_key(config: QuizConfig, qt: QuestionTypeConfig) -> str:
+    """Identifies generations that can be shared, whatever their question count."""
+    return json.dumps([
+        normalize_topic(config.topic),
+        qt.type.value,
+        config.difficultyLevel.value,
+        normalize_topic(config.learningObjective) if config.learningObjective else None,
+        config.use_web_search,
+        config.use_cache,
+    ])
+
+
+def plan_batch(configs: List[QuizConfig]) -> Tuple[List[_Unit], List[List[Tuple[int, int]]]]:
+    """Work out the distinct generate calls a batch needs.
+
+    Question types asked for by several quizzes (same topic, type,
+    difficulty and options) become one call for the largest count; each
+    quiz then takes its share of that call's questions, so such quizzes
+    deliberately repeat the same questions rather than paying for another
+    call. Returns the units and, per quiz, ``(unit index, count)`` for each
+    of its question types.
+    """
+    units: List[_Unit] = []
+    by_key: Dict[str, int] = {}
+    assignments = []
+    for config in configs:
+        parts = []
+        for qt in config.questionTypes:
+            key = _unit_key(config, qt)
+            index = by_key.get(key)
+            if index is None:
+                index = by_key[key] = len(units)
+                units.append(_Unit(config, qt))
+            elif units[index].qt.count < qt.count:
+                units[index].qt = QuestionTypeConfig(type=qt.type, count=qt.count)
+            parts.append((index, qt.count))
+        assignments.append(parts)
+    return units, assignments
+
+
+class BatchJob:
+    def __init__(self, configs: List[QuizConfig]):
+        self.id = uuid.uuid4().hex[:12]
+        self.configs = configs
+        self.units, self.assignments = plan_batch(configs)
+        self.status = "queued"
+        self.completed_calls = 0
+        self.failed_calls = 0
+        self.quiz_ids: List[Optional[int]] = [None] * len(configs)
+        self.errors: Dict[int, str] = {}
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def assemble(self, index: int) -> List[QuizQuestion]:
+        """The questions of quiz ``index``, numbered from 1 in question-type order."""
+        questions = []
+        for unit_index, count in self.assignments[index]:
+            questions.extend(self.units[unit_index].questions[:count])
+        return [q.model_copy(update={"id": i}) for i, q in enumerate(questions, start=1)]
+
+    def to_dict(self) -> dict:
+        quizzes = []
+        for index, config in enumerate(self.configs):
+            if self.quiz_ids[index] is not None:
+                state = "stored"
+            elif index in self.errors:
+                state = "failed"
+            else:
+                state = "pending"
+            quizzes.append({
+                "index": index,
+                "topic": config.topic,
+                "status": state,
+                "quiz_id": self.quiz_ids[index],
+                "error": self.errors.get(index),
+            })
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total_quizzes": len(self.configs),
+            "total_calls": len(self.units),
+            "completed_calls": self.completed_calls,
+            "failed_calls": self.failed_calls,
+            "progress": (
+                (self.completed_calls + self.failed_calls) / len(self.units)
+                if self.units else 1.0
+            ),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "quizzes": quizzes,
+        }
+
+
+class QuizBatchRunner:
+    """Runs batch quiz jobs in the background and keeps their progress.
+
+    Each job's generate calls go to the LLM executor at ``BATCH`` priority
+    with the job id as their fairness group, at most ``concurrency`` at a
+    time, so interactive quizzes still get the model first and concurrent
+    jobs share it evenly. Once every call has finished, all quizzes that
+    could be built are stored in a single transaction.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        concurrency: int = settings.QUIZ_BATCH_CONCURRENCY,
+        max_jobs: int = settings.QUIZ_BATCH_MAX_JOBS,
+        queue_wait_max: float = settings.QUIZ_BATCH_QUEUE_WAIT_MAX
+    ):
+        self.session_factory = session_factory
+        self.concurrency = max(1, concurrency)
+        self.max_jobs = max_jobs
+        self.queue_wait_max = queue_wait_max
+        self._jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+        self.submitted = 0
+        self.calls_planned = 0
+        self.calls_saved = 0
+
+    def submit(self, configs: List[QuizConfig]) -> BatchJob:
+        job = BatchJob(configs)
+        self.submitted += 1
+        self.calls_planned += len(job.units)
+        self.calls_saved += sum(len(c.questionTypes) for c in configs) - len(job.units)
+        self._jobs[job.id] = job
+        self._evict()
+        # The job outlives the submitting request: run it in its own context
+        # so its log records carry the job id, not that request's id
+        context = contextvars.Context()
+        context.run(request_id_var.set, f"batch-{job.id}")
+        job.task = asyncio.create_task(self._run(job), context=context)
+        logger.info(
+            "Batch %s: %d quizzes planned as %d generate calls",
+            job.id, len(configs), len(job.units)
+        )
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        return self._jobs.get(job_id)
+
+    def _evict(self) -> None:
+        # Forget the oldest finished jobs; running ones are always kept
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id].done:
+                del self._jobs[job_id]
+
+    async def _generate(self, job: BatchJob, unit: _Unit, slots: asyncio.Semaphore) -> None:
+        async with slots:
+            waited = 0.0
+            while True:
+                try:
+                    unit.questions = await generate_question_set(
+                        unit.config, unit.qt, start_id=1,
+                        priority=LLMPriority.BATCH, group=job.id
+                    )
+                    job.completed_calls += 1
+                    return
+                except LLMQueueFullError as e:
+                    # Interactive traffic is filling the queue; batches can wait, for a while
+                    if waited + _QUEUE_FULL_RETRY_SECONDS > self.queue_wait_max:
+                        error = e
+                        break
+                    await asyncio.sleep(_QUEUE_FULL_RETRY_SECONDS)
+                    waited += _QUEUE_FULL_RETRY_SECONDS
+                except Exception as e:
+                    error = e
+                    break
+            unit.error = str(error)
+            job.failed_calls += 1
+            logger.error(
+                "Batch %s: generating %s for %s failed: %s",
+                job.id, unit.qt.type.value, unit.config.topic, error
+            )
+
+    async def _run(self, job: BatchJob) -> None:
+        job.status = "running"
+        slots = asyncio.Semaphore(self.concurrency)
+        try:
+            await asyncio.gather(*(self._generate(job, unit, slots) for unit in job.units))
+
+            ready = []
+            for index, parts in enumerate(job.assignments):
+                failed = [job.units[u].error for u, _ in parts if job.units[u].error]
+                if failed:
+                    job.errors[index] = failed[0]
+                else:
+                    ready.append(index)
+            if ready:
+                await self._store(job, ready)
+            job.status = "completed" if ready else "failed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            logger.error("Batch %s failed: %s", job.id, e)
+            for index in range(len(job.configs)):
+                if job.quiz_ids[index] is None:
+                    job.errors.setdefault(index, str(e))
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            logger.info(
+                "Batch %s %s: %d/%d quizzes stored", job.id, job.status,
+                sum(1 for q in job.quiz_ids if q is not None), len(job.configs)
+            )
+
+    async def _store(self, job: BatchJob, ready: List[int]) -> None:
+        """Store every ready quiz (and its dedup signatures) in one transaction."""
+        async with self.session_factory() as db:
+            quizzes = await store_quiz_sessions_async(
+                db, [(job.configs[i], job.assemble(i)) for i in ready], commit=False
+            )
+            if settings.DEDUP_ENABLED:
+                for quiz in quizzes:
+                    await question_dedup.record(db, quiz.id, commit=False)
+            await db.commit()
+        for index, quiz in zip(ready, quizzes):
+            job.quiz_ids[index] = quiz.id
+
+    async def stop(self) -> None:
+        """Cancel running jobs (on shutdown)."""
+        tasks = [job.task for job in self._jobs.values() if job.task and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "jobs": len(self._jobs),
+            "running": sum(1 for job in self._jobs.values() if job.status == "running"),
+            "submitted": self.submitted,
+            "calls_planned": self.calls_planned,
+            "calls_saved": self.calls_saved,
+        }
+
+
+quiz_batches = QuizBatchRunner()
@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+_ENTRY_OVERHEAD = 128  # bytes charged per entry on top of body and ETag
+
+# (JSON body, ETag) of one quiz session
+Document = Tuple[bytes, str]
+
+
+class QuizDocumentCache:
+    """In-process LRU of serialized quiz sessions in front of SQLite.
+
+    Stored sessions never change, so entries need no invalidation; the
+    least recently read ones are dropped once ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[int, Document]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _entry_size(document: Document) -> int:
+        body, etag = document
+        return len(body) + len(etag) + _ENTRY_OVERHEAD
+
+    def get(self, quiz_id: int) -> Optional[Document]:
+        with self._lock:
+            document = self._entries.get(quiz_id)
+            if document is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(quiz_id)
+            self.hits += 1
+            return document
+
+    def put(self, quiz_id: int, document: Document) -> None:
+        with self._lock:
+            if quiz_id in self._entries:
+                self._bytes -= self._entry_size(self._entries.pop(quiz_id))
+            self._entries[quiz_id] = document
+            self._bytes += self._entry_size(document)
+            while self._bytes > self.max_bytes and self._entries:
+                _, old = self._entries.popitem(last=False)
+                self._bytes -= self._entry_size(old)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+quiz_document_cache = QuizDocumentCache(max_bytes=settings.QUIZ_DOCUMENT_CACHE_MAX_BYTES)
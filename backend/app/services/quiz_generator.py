@@ -1,43 +1,228 @@
-from typing import List
+from typing import AsyncIterator, List, Optional
 import asyncio
-from sqlalchemy.orm import Session
-from app.models import QuizConfig, QuizQuestion
-from app.clients.educhain_client import generate_questions
-from app.services.quiz_service import store_quiz_session
+import json
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import QuizConfig, QuizQuestion, QuestionTypeConfig
+from app.clients.educhain_client import generate_questions, current_model_name
+from app.clients.llm_executor import llm_executor, LLMPriority, LLMQueueFullError, LLMTimeoutError
+from app.services.generation_cache import generation_cache, make_cache_key, normalize_topic
+from app.services.question_pool import question_pool
+from app.services.single_flight import SingleFlight
+from app.services.dedup import question_dedup
+from app.services.quiz_service import store_quiz_session_async
+from app.services.resilient_generation import resilient_generation
+from app.core.admission import AdmissionController
+from app.core.config import get_settings
+from app.core.logger import logger
 
+settings = get_settings()
 
-async def generate_quiz(config: QuizConfig, db: Session) -> List[QuizQuestion]:
-    """Generate quiz questions using educhain and store in database."""
+# Coalesces identical concurrent quiz requests into one generation
+quiz_single_flight = SingleFlight()
+
+# Sheds quiz requests that Ollama could not start on within QUIZ_MAX_WAIT
+quiz_admission = AdmissionController(
+    "quiz generation",
+    max_in_flight=settings.QUIZ_MAX_IN_FLIGHT,
+    max_wait=settings.QUIZ_MAX_WAIT,
+    parallelism=settings.LLM_MAX_CONCURRENCY,
+    service_time=lambda: llm_executor.avg_call_seconds
+)
+
+
+async def generate_question_set(
+    config: QuizConfig,
+    qt: QuestionTypeConfig,
+    start_id: int,
+    priority: LLMPriority = LLMPriority.INTERACTIVE,
+    group: Optional[str] = None,
+    offset: int = 0
+) -> List[QuizQuestion]:
+    """Generate one question type, or the chunk of it starting at ``offset``.
+
+    Unused questions are drawn from the pre-generated pool first; the rest
+    comes from the generation cache or, failing that, the LLM. Failed or
+    short LLM calls are retried for the missing questions only, and
+    interactive calls may be hedged.
+    """
+    pooled = []
+    poolable = (
+        settings.POOL_ENABLED and config.use_cache
+        and not config.learningObjective and not config.use_web_search
+    )
+    if poolable:
+        question_pool.note_activity()
+        pooled = await question_pool.draw(
+            topic=config.topic,
+            question_type=qt.type,
+            difficulty=config.difficultyLevel,
+            count=qt.count,
+            start_id=start_id
+        )
+        if len(pooled) == qt.count:
+            return pooled
+    start_id += len(pooled)
+    num_questions = qt.count - len(pooled)
+
+    cache_key = None
+    if settings.GENERATION_CACHE_ENABLED and config.use_cache:
+        model_name = current_model_name()
+        cache_key = make_cache_key(
+            topic=config.topic,
+            question_type=qt.type,
+            num_questions=num_questions,
+            difficulty=config.difficultyLevel,
+            learning_objective=config.learningObjective,
+            use_web_search=config.use_web_search,
+            model_name=model_name,
+            offset=offset
+        )
+        cached = await asyncio.to_thread(generation_cache.get, cache_key, start_id)
+        if cached is not None:
+            return pooled + cached
+
+    async def call(count: int) -> List[QuizQuestion]:
+        return await generate_questions(
+            topic=config.topic,
+            question_type=qt.type,
+            num_questions=count,
+            difficulty=config.difficultyLevel,
+            learning_objective=config.learningObjective,
+            start_id=start_id,
+            use_web_search=config.use_web_search,
+            priority=priority,
+            group=group
+        )
+
+    async def generate(count: int) -> List[QuizQuestion]:
+        return await resilient_generation.generate(
+            call, count, start_id, hedge=priority == LLMPriority.INTERACTIVE
+        )
+
+    questions = await generate(num_questions)
+    if settings.DEDUP_ENABLED:
+        questions = await question_dedup.filter_new(questions, regenerate=generate)
+
+    if cache_key is not None:
+        await asyncio.to_thread(generation_cache.put, cache_key, model_name, questions)
+    return pooled + questions
+
+
+def _coalescing_key(config: QuizConfig) -> str:
+    """Key identifying requests that can share one generation."""
+    return json.dumps([
+        normalize_topic(config.topic),
+        [(qt.type.value, qt.count) for qt in config.questionTypes],
+        config.difficultyLevel.value,
+        normalize_topic(config.learningObjective) if config.learningObjective else None,
+        config.use_web_search,
+        config.use_cache,
+        current_model_name(),
+    ])
+
+
+async def _generate_all_types(config: QuizConfig) -> List[QuizQuestion]:
+    """Generate every question type of a quiz in parallel.
+
+    A failed type does not cancel the others: they run to completion and
+    land in the generation cache, so retrying the quiz only regenerates
+    the types that failed. Ids are assigned once all types are back, so a
+    type that came back short leaves no gap.
+    """
+    tasks = []
+    question_id = 1
+
+    for qt in config.questionTypes:
+        task = generate_question_set(config, qt, start_id=question_id)
+        tasks.append(task)
+        question_id += qt.count
+
+    # Wait for all question generation tasks to complete
+    question_sets = await asyncio.gather(*tasks, return_exceptions=True)
+    failed = [
+        (qt, result) for qt, result in zip(config.questionTypes, question_sets)
+        if isinstance(result, BaseException)
+    ]
+    if failed:
+        for _, error in failed:
+            if isinstance(error, (LLMQueueFullError, LLMTimeoutError)):
+                raise error
+        raise Exception("; ".join(f"{qt.type.value}: {str(error)}" for qt, error in failed))
+
+    # Flatten the list of questions
+    questions = [q for qset in question_sets for q in qset]
+    return [q.model_copy(update={"id": i}) for i, q in enumerate(questions, start=1)]
+
+
+async def generate_quiz(config: QuizConfig, db: AsyncSession) -> List[QuizQuestion]:
+    """Generate quiz questions using educhain and store in database.
+
+    Identical requests arriving while one is already generating share its
+    result; each still gets its own stored quiz session.
+    """
     try:
-        print(f"quiz_generator: config={config}")  # Log entire config
-        print(f"quiz_generator: web_search={config.use_web_search}")
-        
-        # Generate questions for each type in parallel
-        tasks = []
-        question_id = 1
-        
-        for qt in config.questionTypes:
-            task = generate_questions(
-                topic=config.topic,
-                question_type=qt.type,
-                num_questions=qt.count,
-                difficulty=config.difficultyLevel,
-                learning_objective=config.learningObjective,
-                start_id=question_id,
-                use_web_search=config.use_web_search
-            )
-            tasks.append(task)
-            question_id += qt.count
-        
-        # Wait for all question generation tasks to complete
-        question_sets = await asyncio.gather(*tasks)
-        
-        # Flatten the list of questions
-        questions = [q for qset in question_sets for q in qset]
-        
+        logger.debug("Generating quiz: %s", config)
+
+        questions = await quiz_single_flight.do(
+            _coalescing_key(config),
+            lambda: _generate_all_types(config)
+        )
+
         # Store the quiz session and questions in the database
-        store_quiz_session(db, config, questions)
-        
-        return questions
+        quiz = await store_quiz_session_async(db, config, questions)
+        if settings.DEDUP_ENABLED:
+            await question_dedup.record(db, quiz.id)
+
+        return list(questions)
+    except (LLMQueueFullError, LLMTimeoutError):
+        raise
     except Exception as e:
-        raise Exception(f"Failed to generate quiz: {str(e)}") 
\ No newline at end of file
+        raise Exception(f"Failed to generate quiz: {str(e)}")
+
+def _chunk_counts(count: int, chunk_size: int) -> List[int]:
+    """Split a question count into generation chunks of at most chunk_size."""
+    return [min(chunk_size, count - i) for i in range(0, count, chunk_size)]
+
+
+async def generate_quiz_stream(config: QuizConfig, db: AsyncSession) -> AsyncIterator[dict]:
+    """Generate a quiz in small concurrent chunks, yielding questions as they land.
+
+    Each question type is split into chunks of QUIZ_STREAM_CHUNK_SIZE that are
+    generated concurrently. Question ids count up in arrival order, so they
+    stay contiguous even when a chunk comes back short. Yields ``question``
+    events, then a ``done`` event once the session is stored, or an
+    ``error`` event if a chunk fails.
+    """
+    tasks = []
+    question_id = 1
+    for qt in config.questionTypes:
+        offset = 0
+        for count in _chunk_counts(qt.count, settings.QUIZ_STREAM_CHUNK_SIZE):
+            chunk = QuestionTypeConfig(type=qt.type, count=count)
+            tasks.append(asyncio.ensure_future(
+                generate_question_set(config, chunk, start_id=question_id, offset=offset)
+            ))
+            question_id += count
+            offset += count
+
+    questions = []
+    try:
+        for next_chunk in asyncio.as_completed(tasks):
+            for question in await next_chunk:
+                question = question.model_copy(update={"id": len(questions) + 1})
+                questions.append(question)
+                yield {"event": "question", "question": question.model_dump(mode="json")}
+    except Exception as e:
+        logger.error("Streaming quiz generation failed: %s", e)
+        yield {"event": "error", "detail": str(e)}
+        return
+    finally:
+        # Client went away or a chunk failed: stop the remaining work
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    quiz = await store_quiz_session_async(db, config, questions)
+    if settings.DEDUP_ENABLED:
+        await question_dedup.record(db, quiz.id)
+    yield {"event": "done", "quiz_id": quiz.id, "total": len(questions)}
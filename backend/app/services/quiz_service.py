@@ -1,10 +1,83 @@
+import base64
+import hashlib
 import json
-from typing import List
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 from datetime import datetime
 
-from app.models import QuizConfig, QuizQuestion
-from app.database import QuizSession, StoredQuestion
+from app.models import QuizConfig, QuizQuestion, DifficultyLevel
+from app.database import QuizSession, StoredQuestion, QuizDocument, INDEX_SESSION_SQL
+from app.core.metrics import DB_SECONDS
+
+def _new_quiz_session(config: QuizConfig, questions: List[QuizQuestion]) -> QuizSession:
+    # Count what is stored: dedup in drop mode can return fewer than asked
+    return QuizSession(
+        topic=config.topic,
+        difficulty_level=config.difficultyLevel,
+        learning_objective=config.learningObjective,
+        total_questions=len(questions),
+        created_at=datetime.utcnow()
+    )
+
+def _question_rows(quiz_session_id: int, questions: List[QuizQuestion]) -> List[dict]:
+    """Column values for a single bulk insert of a session's questions."""
+    return [
+        {
+            "quiz_session_id": quiz_session_id,
+            "question_text": question.question,
+            "question_type": question.type,
+            "correct_answer": question.correctAnswer,
+            "options": json.dumps(question.options) if question.options else None
+        }
+        for question in questions
+    ]
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _document_row(db_quiz: QuizSession, questions: List[dict]) -> dict:
+    """Serialize a session exactly as GET /api/quiz/{id} returns it.
+
+    Same fields FastAPI produced from the ORM object, with ``options``
+    still a JSON string; ``questions`` are ``_question_dict`` shaped.
+    """
+    body = orjson.dumps({
+        "id": db_quiz.id,
+        "topic": db_quiz.topic,
+        "difficulty_level": db_quiz.difficulty_level,
+        "learning_objective": db_quiz.learning_objective,
+        "total_questions": db_quiz.total_questions,
+        "created_at": db_quiz.created_at.isoformat(),
+        "questions": questions,
+    })
+    return {"quiz_session_id": db_quiz.id, "etag": _etag(body), "body": body}
+
+def _new_document_rows(
+    db_quizzes: List[QuizSession],
+    rows: List[dict],
+    question_ids: List[Tuple[int, int]]
+) -> List[dict]:
+    """Documents for just-inserted sessions from their insert rows and
+    the ``(quiz_session_id, id)`` pairs of their questions in id order."""
+    ids: Dict[int, List[int]] = {db_quiz.id: [] for db_quiz in db_quizzes}
+    for quiz_session_id, question_id in question_ids:
+        ids[quiz_session_id].append(question_id)
+    by_session: Dict[int, List[dict]] = {db_quiz.id: [] for db_quiz in db_quizzes}
+    for row in rows:
+        session_questions = by_session[row["quiz_session_id"]]
+        session_questions.append({"id": ids[row["quiz_session_id"]][len(session_questions)], **row})
+    return [_document_row(db_quiz, by_session[db_quiz.id]) for db_quiz in db_quizzes]
+
+def _question_ids_query(quiz_ids: List[int]):
+    return (
+        select(StoredQuestion.quiz_session_id, StoredQuestion.id)
+        .filter(StoredQuestion.quiz_session_id.in_(quiz_ids))
+        .order_by(StoredQuestion.id)
+    )
 
 def store_quiz_session(
     db: Session,
@@ -12,32 +85,85 @@ def store_quiz_session(
     questions: List[QuizQuestion]
 ) -> QuizSession:
     """Store a complete quiz session with its questions."""
-    
+
     # Create quiz session
-    db_quiz = QuizSession(
-        topic=config.topic,
-        difficulty_level=config.difficultyLevel,
-        learning_objective=config.learningObjective,
-        total_questions=config.totalQuestions,
-        created_at=datetime.utcnow()
-    )
+    db_quiz = _new_quiz_session(config, questions)
     db.add(db_quiz)
     db.flush()  # Flush to get the quiz session ID
-    
-    # Create questions
-    for question in questions:
-        db_question = StoredQuestion(
-            quiz_session_id=db_quiz.id,
-            question_text=question.question,
-            question_type=question.type,
-            correct_answer=question.correctAnswer,
-            options=json.dumps(question.options) if question.options else None
-        )
-        db.add(db_question)
-    
+
+    # Create questions in one executemany
+    rows = _question_rows(db_quiz.id, questions)
+    question_ids = []
+    if rows:
+        db.execute(insert(StoredQuestion), rows)
+        db.execute(INDEX_SESSION_SQL, {"quiz_session_id": db_quiz.id, "topic": db_quiz.topic})
+        question_ids = db.execute(_question_ids_query([db_quiz.id])).all()
+    db.execute(insert(QuizDocument), _new_document_rows([db_quiz], rows, question_ids))
+
     db.commit()
     return db_quiz
 
+async def store_quiz_session_async(
+    db: AsyncSession,
+    config: QuizConfig,
+    questions: List[QuizQuestion]
+) -> QuizSession:
+    """Async variant of store_quiz_session for the API."""
+    db_quiz = _new_quiz_session(config, questions)
+    db.add(db_quiz)
+    with DB_SECONDS.labels("flush").time():
+        await db.flush()  # Flush to get the quiz session ID
+
+    rows = _question_rows(db_quiz.id, questions)
+    with DB_SECONDS.labels("insert").time():
+        question_ids = []
+        if rows:
+            await db.execute(insert(StoredQuestion), rows)
+            await db.execute(INDEX_SESSION_SQL, {"quiz_session_id": db_quiz.id, "topic": db_quiz.topic})
+            question_ids = (await db.execute(_question_ids_query([db_quiz.id]))).all()
+        await db.execute(insert(QuizDocument), _new_document_rows([db_quiz], rows, question_ids))
+
+    with DB_SECONDS.labels("commit").time():
+        await db.commit()
+    return db_quiz
+
+async def store_quiz_sessions_async(
+    db: AsyncSession,
+    quizzes: List[Tuple[QuizConfig, List[QuizQuestion]]],
+    commit: bool = True
+) -> List[QuizSession]:
+    """Store several quiz sessions in one transaction: all of them or none.
+
+    With ``commit=False`` the caller adds more work and commits itself.
+    """
+    db_quizzes = [_new_quiz_session(config, questions) for config, questions in quizzes]
+    db.add_all(db_quizzes)
+    with DB_SECONDS.labels("flush").time():
+        await db.flush()  # One flush assigns every session ID
+
+    rows = [
+        row
+        for db_quiz, (_, questions) in zip(db_quizzes, quizzes)
+        for row in _question_rows(db_quiz.id, questions)
+    ]
+    with DB_SECONDS.labels("insert").time():
+        question_ids = []
+        if rows:
+            await db.execute(insert(StoredQuestion), rows)
+            await db.execute(INDEX_SESSION_SQL, [
+                {"quiz_session_id": db_quiz.id, "topic": db_quiz.topic}
+                for db_quiz, (_, questions) in zip(db_quizzes, quizzes) if questions
+            ])
+            question_ids = (await db.execute(
+                _question_ids_query([db_quiz.id for db_quiz in db_quizzes])
+            )).all()
+        await db.execute(insert(QuizDocument), _new_document_rows(db_quizzes, rows, question_ids))
+
+    if commit:
+        with DB_SECONDS.labels("commit").time():
+            await db.commit()
+    return db_quizzes
+
 def get_quiz_history(
     db: Session,
     skip: int = 0,
@@ -50,9 +176,134 @@ def get_quiz_history(
         .limit(limit)\
         .all()
 
+def encode_history_cursor(created_at: datetime, quiz_id: int) -> str:
+    """Opaque cursor pointing just past the given history row."""
+    raw = json.dumps([created_at.isoformat(), quiz_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_history_cursor. Raises ValueError if malformed."""
+    try:
+        created_at, quiz_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(quiz_id)
+    except Exception as e:
+        raise ValueError(f"Invalid history cursor: {cursor}") from e
+
+def _question_dict(question: StoredQuestion) -> dict:
+    return {
+        "id": question.id,
+        "quiz_session_id": question.quiz_session_id,
+        "question_text": question.question_text,
+        "question_type": question.question_type,
+        "correct_answer": question.correct_answer,
+        "options": question.options
+    }
+
+async def get_quiz_history_async(
+    db: AsyncSession,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    topic: Optional[str] = None,
+    difficulty: Optional[DifficultyLevel] = None,
+    include_counts: bool = False,
+    include_questions: bool = False
+) -> Tuple[List[dict], Optional[str]]:
+    """Retrieve one page of quiz history, newest first.
+
+    Pages are keyed on (created_at, id): pass the returned cursor to get the
+    next page, which costs the same no matter how deep it is. ``skip`` is
+    the older offset-based paging and is ignored when a cursor is given.
+    Question counts and payloads for the whole page are loaded with one
+    extra query each.
+    """
+    query = select(
+            QuizSession.id,
+            QuizSession.topic,
+            QuizSession.difficulty_level,
+            QuizSession.learning_objective,
+            QuizSession.total_questions,
+            QuizSession.created_at
+        )\
+        .order_by(QuizSession.created_at.desc(), QuizSession.id.desc())\
+        .limit(limit + 1)
+    if topic:
+        query = query.filter(func.lower(QuizSession.topic) == topic.strip().lower())
+    if difficulty:
+        query = query.filter(QuizSession.difficulty_level == difficulty)
+    if cursor:
+        created_at, quiz_id = decode_history_cursor(cursor)
+        query = query.filter(
+            tuple_(QuizSession.created_at, QuizSession.id) < tuple_(created_at, quiz_id)
+        )
+    elif skip:
+        query = query.offset(skip)
+
+    rows = (await db.execute(query)).mappings().all()
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_history_cursor(last["created_at"], last["id"])
+
+    ids = [item["id"] for item in items]
+    if ids and include_counts:
+        counts = dict((await db.execute(
+            select(StoredQuestion.quiz_session_id, func.count(StoredQuestion.id))
+            .filter(StoredQuestion.quiz_session_id.in_(ids))
+            .group_by(StoredQuestion.quiz_session_id)
+        )).all())
+        for item in items:
+            item["question_count"] = counts.get(item["id"], 0)
+    if ids and include_questions:
+        by_session = {quiz_id: [] for quiz_id in ids}
+        questions = (await db.execute(
+            select(StoredQuestion)
+            .filter(StoredQuestion.quiz_session_id.in_(ids))
+            .order_by(StoredQuestion.quiz_session_id, StoredQuestion.id)
+        )).scalars()
+        for question in questions:
+            by_session[question.quiz_session_id].append(_question_dict(question))
+        for item in items:
+            item["questions"] = by_session[item["id"]]
+
+    return items, next_cursor
+
 def get_quiz_session(db: Session, quiz_id: int) -> QuizSession:
     """Retrieve a specific quiz session with its questions."""
     return db.query(QuizSession)\
         .filter(QuizSession.id == quiz_id)\
         .options(joinedload(QuizSession.questions))\
-        .first() 
\ No newline at end of file
+        .first()
+
+async def get_quiz_session_async(db: AsyncSession, quiz_id: int) -> Optional[QuizSession]:
+    """Async variant of get_quiz_session."""
+    result = await db.execute(
+        select(QuizSession)
+        .filter(QuizSession.id == quiz_id)
+        .options(joinedload(QuizSession.questions))
+    )
+    return result.unique().scalars().first()
+
+async def get_quiz_document_async(db: AsyncSession, quiz_id: int) -> Optional[Tuple[bytes, str]]:
+    """JSON body and ETag of GET /api/quiz/{id}, or None if there is no such session.
+
+    Sessions stored before documents existed get theirs built and saved
+    on first read.
+    """
+    row = (await db.execute(
+        select(QuizDocument.body, QuizDocument.etag)
+        .filter(QuizDocument.quiz_session_id == quiz_id)
+    )).first()
+    if row is not None:
+        return row.body, row.etag
+
+    quiz = await get_quiz_session_async(db, quiz_id)
+    if quiz is None:
+        return None
+    questions = sorted(quiz.questions, key=lambda question: question.id)
+    document = _document_row(quiz, [_question_dict(question) for question in questions])
+    # A concurrent first read may have saved it already; both are identical
+    await db.execute(insert(QuizDocument).prefix_with("OR IGNORE"), document)
+    await db.commit()
+    return document["body"], document["etag"]
@@ -0,0 +1,142 @@
+import asyncio
+import random
+from typing import Awaitable, Callable, List
+
+from app.models import QuizQuestion
+from app.clients.llm_executor import llm_executor, LLMQueueFullError, LLMTimeoutError
+from app.core.config import get_settings
+from app.core.logger import logger
+
+settings = get_settings()
+
+# Generates ``count`` questions; may return fewer when some fail validation
+GenerateCall = Callable[[int], Awaitable[List[QuizQuestion]]]
+
+
+class GenerationShortfallError(Exception):
+    """Raised when retries could not produce the requested number of questions."""
+
+
+class ResilientGenerator:
+    """Retries and hedges the generate call behind one question set.
+
+    A call that fails, or returns fewer questions than asked because some
+    did not parse or validate, is retried for only the missing questions,
+    after an exponential backoff with jitter, up to ``attempts`` calls.
+    Overload (``LLMQueueFullError``) and timeouts are not retried: another
+    call would only add to the queue that caused them.
+
+    With ``hedge_after`` set, a hedged call that has not finished after that
+    many seconds gets a duplicate, provided the executor has an idle worker
+    for it; whichever returns first is used and the other is cancelled.
+    """
+
+    def __init__(
+        self,
+        attempts: int,
+        backoff: float,
+        backoff_max: float,
+        hedge_after: float,
+        has_capacity: Callable[[], bool]
+    ):
+        self.attempts = max(1, attempts)
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.has_capacity = has_capacity
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failures = 0
+
+    def _delay(self, retry: int) -> float:
+        return min(self.backoff_max, self.backoff * 2 ** (retry - 1)) * random.uniform(0.5, 1.0)
+
+    async def generate(
+        self,
+        call: GenerateCall,
+        count: int,
+        start_id: int,
+        hedge: bool = False
+    ) -> List[QuizQuestion]:
+        """Return exactly ``count`` questions numbered from ``start_id``."""
+        questions: List[QuizQuestion] = []
+        error = None
+        for attempt in range(1, self.attempts + 1):
+            if attempt > 1:
+                self.retries += 1
+                await asyncio.sleep(self._delay(attempt - 1))
+            missing = count - len(questions)
+            try:
+                questions += (await self._call(call, missing, hedge))[:missing]
+            except (LLMQueueFullError, LLMTimeoutError):
+                raise
+            except Exception as e:
+                error = e
+                logger.warning(
+                    "Generate call %d/%d failed: %s", attempt, self.attempts, str(e)
+                )
+                continue
+            if len(questions) >= count:
+                break
+            logger.warning(
+                "Generate call %d/%d returned %d of %d questions",
+                attempt, self.attempts, len(questions), count
+            )
+        else:
+            self.failures += 1
+            reason = f": {str(error)}" if error is not None else ""
+            raise GenerationShortfallError(
+                f"Generated {len(questions)} of {count} questions "
+                f"after {self.attempts} attempts{reason}"
+            )
+        return [q.model_copy(update={"id": i}) for i, q in enumerate(questions, start=start_id)]
+
+    async def _call(self, call: GenerateCall, count: int, hedge: bool) -> List[QuizQuestion]:
+        if not hedge or self.hedge_after <= 0:
+            return await call(count)
+        primary = asyncio.ensure_future(call(count))
+        pending = {primary}
+        # asyncio.wait never cancels its tasks: whatever is still running when
+        # this returns, raises or is cancelled must be stopped here, or it
+        # keeps an executor slot busy
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_after)
+            if done or not self.has_capacity():
+                return await primary
+            self.hedges += 1
+            backup = asyncio.ensure_future(call(count))
+            pending = {primary, backup}
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer a success; fall back to the other call if one failed
+                winner = next((task for task in done if not task.exception()), None)
+                if winner is not None:
+                    if winner is backup:
+                        self.hedge_wins += 1
+                    return winner.result()
+                if not pending:
+                    return primary.result()  # Both failed: raise the primary's error
+        finally:
+            for task in pending:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "attempts": self.attempts,
+            "hedge_after": self.hedge_after,
+            "retries": self.retries,
+            "failures": self.failures,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+        }
+
+
+resilient_generation = ResilientGenerator(
+    attempts=settings.LLM_RETRY_ATTEMPTS,
+    backoff=settings.LLM_RETRY_BACKOFF,
+    backoff_max=settings.LLM_RETRY_BACKOFF_MAX,
+    hedge_after=settings.LLM_HEDGE_AFTER,
+    has_capacity=llm_executor.has_capacity
+)
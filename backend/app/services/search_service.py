@@ -0,0 +1,82 @@
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import QuestionType, DifficultyLevel
+from app.database import SEARCH_TABLE
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Every word must match; the last one is treated as a prefix so results
+    update while the user is still typing. Quoting each token keeps FTS5
+    operators and punctuation in user input from being interpreted.
+    """
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+async def search_questions(
+    db: AsyncSession,
+    query: str,
+    question_type: Optional[QuestionType] = None,
+    difficulty: Optional[DifficultyLevel] = None,
+    limit: int = 20,
+    offset: int = 0
+) -> Tuple[List[dict], Optional[int]]:
+    """Ranked full-text search over stored questions.
+
+    Matches question text, answer and quiz topic, best match first. Returns
+    one page of results and the offset of the next page, if any.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return [], None
+
+    filters = ""
+    params = {"match": match, "limit": limit + 1, "offset": offset}
+    if question_type is not None:
+        filters += " AND q.question_type = :question_type"
+        params["question_type"] = question_type.name
+    if difficulty is not None:
+        filters += " AND s.difficulty_level = :difficulty"
+        params["difficulty"] = difficulty.name
+
+    # Topic hits weigh more than answer hits; bm25() is lower-is-better
+    result = await db.execute(text(
+        "SELECT q.id, q.quiz_session_id, q.question_text, q.question_type,"
+        " q.correct_answer, q.options, s.topic, s.difficulty_level,"
+        f" bm25({SEARCH_TABLE}, 1.0, 0.5, 2.0) AS rank"
+        f" FROM {SEARCH_TABLE}"
+        f" JOIN questions q ON q.id = {SEARCH_TABLE}.rowid"
+        " JOIN quiz_sessions s ON s.id = q.quiz_session_id"
+        f" WHERE {SEARCH_TABLE} MATCH :match{filters}"
+        " ORDER BY rank LIMIT :limit OFFSET :offset"
+    ), params)
+    rows = result.mappings().all()
+
+    items = [
+        {
+            "id": row["id"],
+            "quiz_session_id": row["quiz_session_id"],
+            "question_text": row["question_text"],
+            "question_type": QuestionType[row["question_type"]],
+            "correct_answer": row["correct_answer"],
+            "options": row["options"],
+            "topic": row["topic"],
+            "difficulty_level": DifficultyLevel[row["difficulty_level"]],
+            "rank": row["rank"],
+        }
+        for row in rows[:limit]
+    ]
+    next_offset = offset + limit if len(rows) > limit else None
+    return items, next_offset
@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution.
+
+    The first caller for a key starts the work; callers arriving while it is
+    in flight await the same result instead of starting their own. The shared
+    work runs as its own task, so one caller going away does not cancel it
+    for the others; it is only cancelled once every caller has gone.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._fan_in: Dict[Hashable, int] = {}
+        self._waiting: Dict[Hashable, int] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.max_fan_in = 0
+        self.abandoned = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return ``await fn()``, sharing it with identical in-flight calls."""
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            self._fan_in[key] = 1
+            self._waiting[key] = 0
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+            self._fan_in[key] += 1
+        self._waiting[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiting.get(key) == 1:
+                self.abandoned += 1
+                task.cancel()  # Nobody is left to use the result
+            raise
+        finally:
+            if self._in_flight.get(key) is task:
+                self._waiting[key] -= 1
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if not task.cancelled():
+            task.exception()  # Mark retrieved even if every caller went away
+        self._in_flight.pop(key, None)
+        self._waiting.pop(key, None)
+        self.max_fan_in = max(self.max_fan_in, self._fan_in.pop(key, 0))
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "max_fan_in": self.max_fan_in,
+            "abandoned": self.abandoned,
+        }
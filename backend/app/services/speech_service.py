@@ -1,87 +1,257 @@
-import whisper
 import numpy as np
-import torch
 from fastapi import UploadFile, HTTPException
-import io
+import asyncio
+import os
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, List, Optional, Sequence
 from app.core.logger import logger
-import soundfile as sf
-from pydub import AudioSegment
 from app.core.config import get_settings
+from app.core.metrics import AUDIO_DECODE_SECONDS, ERRORS, MODEL_LOAD_SECONDS
+from app.services.audio_decode import AudioDecodeError, AudioTooLongError, decode_audio
+from app.services.transcription_cache import make_transcription_key, transcription_cache
+from app.services.transcription_scheduler import TranscriptionScheduler
+from app.services.transcription_workers import TranscriptionWorkerPool
+
+if TYPE_CHECKING:
+    import torch  # Imported on first use; annotations only
 
 settings = get_settings()
 
+SAMPLE_RATE = 16000
+LANGUAGE = "en"
+TEMPERATURE = 0.0  # Greedy decoding
+
+
+def quantize_for_cpu(model: "torch.nn.Module") -> "torch.nn.Module":
+    """Dynamically quantize a Whisper model's Linear layers to int8.
+
+    Whisper wraps its projections in a ``Linear`` subclass that only casts
+    weights to the input dtype; torch's dynamic quantization matches exact
+    module types, so those layers are turned back into plain ``nn.Linear``
+    first. Weights are stored as int8 and activations quantized on the fly.
+    """
+    import torch
+
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+
+
+def load_whisper_model(name: str, device: str, quantize: bool):
+    """Load a Whisper model on ``device``, quantized when running on CPU."""
+    # torch and whisper take seconds to import; only pay for it when a
+    # model is actually needed, never at API startup
+    import whisper
+
+    model = whisper.load_model(name, device=device)
+    if quantize and device == "cpu":
+        model = quantize_for_cpu(model)
+    model.eval()
+    return model
+
+
 class SpeechService:
-    def __init__(self):
+    def __init__(self, workers: int = settings.TRANSCRIBE_WORKERS):
         self.model = None
         self.device = None
-    
+        self.quantized = False
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self._load_lock = threading.Lock()
+        self._inference_lock = threading.Lock()
+        self._decode_options = None  # built with the model, needs whisper
+        # With worker processes the model lives there and this process only
+        # decodes uploads and schedules batches
+        self.workers = None
+        if workers > 0:
+            # Split the cores between workers unless WHISPER_THREADS says otherwise
+            threads = settings.WHISPER_THREADS or max(1, (os.cpu_count() or 1) // workers)
+            self.workers = TranscriptionWorkerPool(workers, engine_args=(threads,))
+            self.scheduler = TranscriptionScheduler(self.workers.run_batch, concurrency=workers)
+        else:
+            self.scheduler = TranscriptionScheduler(self.transcribe_batch)
+        # Everything besides the audio that changes what a decode returns
+        self._cache_params = {
+            "language": LANGUAGE,
+            "temperature": TEMPERATURE,
+            "quantized": settings.WHISPER_QUANTIZE,
+        }
+
     def _ensure_model_loaded(self):
         """Lazy load the model only when needed"""
-        if self.model is None:
+        if self.model is not None:
+            return
+        # Startup preload and the first request may race; only one loads
+        with self._load_lock:
+            if self.model is not None:
+                return
             try:
-                logger.info("Loading Whisper model...")
-                self.device = "cuda" if torch.cuda.is_available() else "cpu"
-                logger.info(f"Using device: {self.device}")
-                
-                # Use the medium model for better accuracy
-                logger.info(f"Loading {settings.WHISPER_MODEL} model...")
-                self.model = whisper.load_model(settings.WHISPER_MODEL)
-                self.model = self.model.to(self.device)
-                logger.info("Whisper model loaded successfully")
+                self.model = self._load_model()
             except Exception as e:
-                logger.error(f"Failed to load Whisper model: {str(e)}")
+                logger.error("Failed to load Whisper model: %s", e)
                 raise HTTPException(
                     status_code=500,
                     detail=f"Failed to initialize Whisper model: {str(e)}"
                 )
+
+    def _load_model(self):
+        """Load, quantize and warm the configured model."""
+        import torch
+        import whisper
+
+        logger.info("Loading Whisper model...")
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        logger.info("Using device: %s", self.device)
+        if self.device == "cpu" and settings.WHISPER_THREADS > 0:
+            torch.set_num_threads(settings.WHISPER_THREADS)
+
+        logger.info("Loading %s model...", settings.WHISPER_MODEL)
+        started = time.perf_counter()
+        model = load_whisper_model(
+            settings.WHISPER_MODEL, self.device, settings.WHISPER_QUANTIZE
+        )
+        self._decode_options = whisper.DecodingOptions(
+            language=LANGUAGE, fp16=False, temperature=TEMPERATURE,
+            without_timestamps=True
+        )
+        self.quantized = settings.WHISPER_QUANTIZE and self.device == "cpu"
+        self.load_seconds = time.perf_counter() - started
+        if settings.WHISPER_WARMUP:
+            self._warm_up(model)
+        MODEL_LOAD_SECONDS.labels("whisper").observe(time.perf_counter() - started)
+        logger.info(
+            "Whisper model loaded in %.2fs (quantized=%s, threads=%d)",
+            self.load_seconds, self.quantized, torch.get_num_threads()
+        )
+        return model
+
+    def _warm_up(self, model):
+        """Decode one second of silence to fault in weights and kernels."""
+        import whisper
+
+        started = time.perf_counter()
+        mel = whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(np.zeros(SAMPLE_RATE, dtype=np.float32)),
+            n_mels=model.dims.n_mels
+        ).to(self.device)
+        whisper.decode(model, mel, self._decode_options)
+        self.warmup_seconds = time.perf_counter() - started
+        logger.info("Whisper warm-up decode took %.2fs", self.warmup_seconds)
+
+    def transcribe_pcm(self, audio: np.ndarray) -> str:
+        """Transcribe mono 16 kHz float32 samples (blocking)."""
+        self._ensure_model_loaded()
+        # Whisper installs its kv-cache hooks on the shared model for each
+        # decode, so concurrent decodes on one model would corrupt each other
+        with self._inference_lock:
+            result = self.model.transcribe(
+                audio,
+                language=LANGUAGE,  # Force English
+                fp16=False,     # Avoid FP16 warning
+                temperature=TEMPERATURE
+            )
+        return result["text"].strip()
+
+    def transcribe_batch(self, audios: Sequence[np.ndarray]) -> List[str]:
+        """Transcribe several clips with one batched encoder/decoder pass.
+
+        Clips that fit Whisper's 30 second window are padded into a single
+        log-mel batch; longer ones fall back to windowed ``transcribe``.
+        """
+        self._ensure_model_loaded()
+        import torch
+        import whisper
+
+        texts: List[Optional[str]] = [None] * len(audios)
+        short = [i for i, audio in enumerate(audios) if len(audio) <= whisper.audio.N_SAMPLES]
+        with self._inference_lock:
+            if short:
+                mel = torch.stack([
+                    whisper.log_mel_spectrogram(
+                        whisper.pad_or_trim(audios[i]), n_mels=self.model.dims.n_mels
+                    )
+                    for i in short
+                ]).to(self.device)
+                results = whisper.decode(self.model, mel, self._decode_options)
+                for i, result in zip(short, results):
+                    texts[i] = result.text.strip()
+        for i, text in enumerate(texts):
+            if text is None:
+                texts[i] = self.transcribe_pcm(audios[i])
+        return texts
+
+    async def transcribe_samples(self, audio: np.ndarray) -> str:
+        """Transcribe decoded samples via the micro-batching scheduler."""
+        return await self.scheduler.submit(audio)
+
+    def preload(self):
+        """Load (and warm) the model ahead of the first request."""
+        if self.workers is not None:
+            self.workers.wait_ready(timeout=settings.WHISPER_LOAD_TIMEOUT)
+        else:
+            self._ensure_model_loaded()
+
+    async def close(self):
+        """Stop scheduling and shut down worker processes."""
+        await self.scheduler.stop()
+        if self.workers is not None:
+            await asyncio.to_thread(self.workers.stop)
+
+    def stats(self) -> dict:
+        return {
+            "model": settings.WHISPER_MODEL,
+            "loaded": self.model is not None,
+            "device": self.device,
+            "quantized": self.quantized,
+            "threads": sys.modules["torch"].get_num_threads() if "torch" in sys.modules else None,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "batching": self.scheduler.stats(),
+            "workers": self.workers.stats() if self.workers is not None else None,
+        }
     
     async def transcribe_audio(self, audio_file: UploadFile) -> str:
         try:
-            self._ensure_model_loaded()
-            
-            logger.info("Reading audio file...")
-            audio_bytes = await audio_file.read()
-            logger.info(f"Read {len(audio_bytes)} bytes of audio data")
-            
-            # Convert webm to wav using pydub
-            logger.info("Converting audio format...")
-            audio = AudioSegment.from_file(io.BytesIO(audio_bytes), format="webm")
-            
-            # Convert to mono and set sample rate
-            audio = audio.set_channels(1)
-            audio = audio.set_frame_rate(16000)
-            
-            # Get raw audio data as numpy array
-            samples = np.array(audio.get_array_of_samples())
-            
-            # Convert to float32 and normalize
-            audio_data = samples.astype(np.float32) / 32768.0
-            
-            logger.info(f"Audio processed: shape={audio_data.shape}, dtype={audio_data.dtype}")
+            # Decode straight from the spooled upload; no full-size copies
+            try:
+                with AUDIO_DECODE_SECONDS.time():
+                    audio_data = await asyncio.to_thread(decode_audio, audio_file.file)
+            except AudioTooLongError as e:
+                logger.warning("Audio duration (%ss) exceeds limit", e.duration)
+                raise HTTPException(status_code=400, detail=str(e))
+            except AudioDecodeError as e:
+                raise HTTPException(status_code=400, detail=str(e))
             
-            # Check duration
-            duration = len(audio_data) / 16000
-            if duration > settings.MAX_AUDIO_DURATION:
-                logger.warning(f"Audio duration ({duration}s) exceeds limit")
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Audio duration exceeds maximum of {settings.MAX_AUDIO_DURATION} seconds"
+            logger.debug("Decoded %d samples", len(audio_data))
+
+            cache_key = None
+            if settings.TRANSCRIPTION_CACHE_ENABLED:
+                cache_key = make_transcription_key(
+                    audio_data, settings.WHISPER_MODEL, self._cache_params
                 )
-            
-            logger.info("Starting transcription...")
-            # Add additional parameters for better accuracy
-            result = self.model.transcribe(
-                audio_data,
-                language='en',  # Force English
-                fp16=False,     # Avoid FP16 warning
-                temperature=0.0  # Use greedy decoding
-            )
-            transcribed_text = result["text"].strip()
-            logger.info(f"Transcription complete. Text: '{transcribed_text}'")
+                cached = await asyncio.to_thread(transcription_cache.get, cache_key)
+                if cached is not None:
+                    logger.info("Transcription served from cache")
+                    return cached
+
+            # The model is loaded (or waited for) in the scheduler's worker thread
+            transcribed_text = await self.transcribe_samples(audio_data)
+            if cache_key is not None:
+                await asyncio.to_thread(transcription_cache.put, cache_key, transcribed_text)
+            logger.info("Transcription complete", extra={
+                "audio_seconds": round(len(audio_data) / SAMPLE_RATE, 2),
+                "chars": len(transcribed_text),
+            })
             return transcribed_text
             
         except Exception as e:
-            logger.error(f"Transcription error: {str(e)}")
+            logger.error("Transcription error: %s", e)
+            ERRORS.labels("transcription").inc()
             if isinstance(e, HTTPException):
                 raise e
             raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,182 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.logger import logger
+from app.services.audio_decode import StreamingResampler
+from app.services.vad import SAMPLE_RATE, SpeechSegment, VoiceActivityDetector
+
+settings = get_settings()
+
+AUDIO_FORMATS = ("pcm16", "f32", "webm")
+
+
+class PcmDecoder:
+    """Turns raw little-endian PCM chunks into mono 16 kHz float32 samples."""
+
+    def __init__(self, audio_format: str = "pcm16", sample_rate: int = SAMPLE_RATE):
+        self.dtype = np.dtype("<i2") if audio_format == "pcm16" else np.dtype("<f4")
+        self.scale = 32768.0 if audio_format == "pcm16" else 1.0
+        self.sample_rate = sample_rate
+        self._pending = b""
+        # One resampler for the whole stream, so chunk edges interpolate seamlessly
+        self._resampler = None
+        if sample_rate != SAMPLE_RATE:
+            self._resampler = StreamingResampler(sample_rate, np.empty(0, dtype=np.float32))
+
+    def decode(self, data: bytes) -> np.ndarray:
+        data = self._pending + data
+        usable = len(data) - len(data) % self.dtype.itemsize
+        self._pending = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype=self.dtype).astype(np.float32)
+        if self.scale != 1.0:
+            samples /= self.scale
+        if self._resampler is not None:
+            samples = self._resampler.resample(samples)
+        return samples
+
+
+class FfmpegDecoder:
+    """Decodes a streamed webm/opus recording (MediaRecorder chunks) with ffmpeg.
+
+    MediaRecorder chunks are not independently decodable, so one ffmpeg
+    process reads the whole stream from stdin and emits PCM as it goes.
+    """
+
+    def __init__(self, on_samples: Callable[[np.ndarray], Awaitable[None]]):
+        self.on_samples = on_samples
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-loglevel", "error", "-i", "pipe:0",
+            "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        pcm = PcmDecoder("pcm16")
+        while True:
+            chunk = await self._process.stdout.read(SAMPLE_RATE)  # ~0.5s of audio
+            if not chunk:
+                return
+            await self.on_samples(pcm.decode(chunk))
+
+    async def write(self, data: bytes):
+        self._process.stdin.write(data)
+        await self._process.stdin.drain()
+
+    async def finish(self):
+        """Close stdin and wait until every decoded sample was delivered."""
+        if self._process is None:
+            return
+        self._process.stdin.close()
+        await self._reader
+        await self._process.wait()
+
+    def kill(self):
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._process is not None and self._process.returncode is None:
+            self._process.kill()
+
+
+class StreamingTranscriber:
+    """Incremental transcription of one live audio stream.
+
+    Samples go through voice activity detection; each finished utterance is
+    transcribed and sent as a ``final`` event, while the utterance still in
+    progress is re-transcribed every ``partial_interval`` seconds of new
+    audio and sent as a ``partial`` event. Decodes run one at a time in a
+    worker task so receiving audio never waits on Whisper, and partials are
+    skipped rather than queued when the worker is behind.
+    """
+
+    def __init__(
+        self,
+        transcribe: Callable[[np.ndarray], Awaitable[str]],
+        send: Callable[[dict], Awaitable[None]],
+        vad: Optional[VoiceActivityDetector] = None,
+        partial_interval: float = settings.STREAM_PARTIAL_INTERVAL
+    ):
+        self.transcribe = transcribe
+        self.send = send
+        self.vad = vad or VoiceActivityDetector()
+        self.partial_samples = int(partial_interval * SAMPLE_RATE)
+        self._last_partial = 0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._busy = False
+        self._worker: Optional[asyncio.Task] = None
+        self.segments = 0
+
+    def start(self):
+        self._worker = asyncio.create_task(self._run())
+
+    async def push(self, samples: np.ndarray):
+        for segment in self.vad.push(samples):
+            self._last_partial = 0
+            self._queue.put_nowait(("final", segment))
+
+        if not self.vad.in_speech:
+            return
+        current = self.vad.current_audio()
+        if (
+            len(current) - self._last_partial >= self.partial_samples
+            and not self._busy
+            and self._queue.empty()
+        ):
+            self._last_partial = len(current)
+            self._queue.put_nowait(("partial", current))
+
+    async def finish(self):
+        """Transcribe what is left of the stream and wait for every result."""
+        segment = self.vad.flush()
+        if segment is not None:
+            self._queue.put_nowait(("final", segment))
+        self._queue.put_nowait(None)
+        if self._worker is not None:
+            await self._worker
+
+    def cancel(self):
+        if self._worker is not None:
+            self._worker.cancel()
+
+    async def _run(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            kind, payload = item
+            self._busy = True
+            try:
+                if kind == "final":
+                    await self._final(payload)
+                else:
+                    text = await self.transcribe(payload)
+                    if text:
+                        await self.send({"type": "partial", "segment": self.segments, "text": text})
+            except Exception as e:
+                logger.error("Streaming transcription error: %s", e)
+                await self.send({"type": "error", "detail": str(e)})
+            finally:
+                self._busy = False
+
+    async def _final(self, segment: SpeechSegment):
+        started = time.perf_counter()
+        text = await self.transcribe(segment.audio)
+        self.segments += 1
+        await self.send({
+            "type": "final",
+            "segment": segment.index,
+            "text": text,
+            "start": round(segment.start, 2),
+            "end": round(segment.end, 2),
+            "decode_seconds": round(time.perf_counter() - started, 3)
+        })
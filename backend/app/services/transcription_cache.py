@@ -0,0 +1,215 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.logger import logger
+
+settings = get_settings()
+
+_ENTRY_OVERHEAD = 128  # bytes charged per memory entry on top of key and text
+
+
+def make_transcription_key(audio: np.ndarray, model_name: str, decode_params: dict) -> str:
+    """Content address of one transcription: the PCM samples plus how they are decoded.
+
+    Hashing the decoded samples rather than the upload means the same
+    recording hits the cache whatever container it was re-sent in.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(json.dumps([model_name, decode_params], sort_keys=True).encode("utf-8"))
+    samples = np.ascontiguousarray(audio, dtype=np.float32)
+    digest.update(samples.data)  # Hashes the buffer in place, no copy
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """Two-tier cache of transcripts keyed by ``make_transcription_key``.
+
+    An in-memory LRU bounded by ``max_bytes`` answers repeats without any
+    I/O; when ``disk_path`` is set, entries are also kept in a SQLite file
+    bounded by ``disk_max_bytes`` so they survive restarts. Disk hits are
+    promoted back into memory. Lookups that reach the disk tier block, so
+    async callers run ``get`` and ``put`` in a worker thread.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_path: Optional[Path] = None,
+        disk_max_bytes: int = 0
+    ):
+        self.max_bytes = max_bytes
+        self.disk_path = Path(disk_path) if disk_path is not None else None
+        self.disk_max_bytes = disk_max_bytes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @staticmethod
+    def _entry_size(key: str, text: str) -> int:
+        return len(key) + len(text.encode("utf-8")) + _ENTRY_OVERHEAD
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.disk_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.disk_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcription_cache ("
+                " key TEXT PRIMARY KEY,"
+                " text TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_transcription_cache_accessed_at"
+                " ON transcription_cache (accessed_at)"
+            )
+            conn.commit()
+            self._disk_bytes = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM transcription_cache"
+            ).fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, text: str) -> None:
+        if key in self._entries:
+            self._memory_bytes -= self._entry_size(key, self._entries.pop(key))
+        self._entries[key] = text
+        self._memory_bytes += self._entry_size(key, text)
+        while self._memory_bytes > self.max_bytes and self._entries:
+            old_key, old_text = self._entries.popitem(last=False)
+            self._memory_bytes -= self._entry_size(old_key, old_text)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return text
+            if self.disk_path is not None:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT text FROM transcription_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE transcription_cache SET accessed_at = ? WHERE key = ?",
+                        (time.time(), key)
+                    )
+                    conn.commit()
+                    self._remember(key, row[0])
+                    self.disk_hits += 1
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        with self._lock:
+            self._remember(key, text)
+            if self.disk_path is None:
+                return
+            conn = self._connect()
+            size = self._entry_size(key, text)
+            replaced = conn.execute(
+                "SELECT size FROM transcription_cache WHERE key = ?", (key,)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO transcription_cache (key, text, size, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, text, size, time.time())
+            )
+            self._disk_bytes += size - (replaced[0] if replaced else 0)
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk(conn)
+            conn.commit()
+
+    def _evict_disk(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used rows until the byte budget is met.
+
+        Walks the ``accessed_at`` index from the oldest row and stops as soon
+        as enough is freed, instead of sizing up the whole table.
+        """
+        victims = []
+        excess = self._disk_bytes - self.disk_max_bytes
+        cursor = conn.execute(
+            "SELECT key, size FROM transcription_cache ORDER BY accessed_at, rowid"
+        )
+        for key, size in cursor:
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+            self._disk_bytes -= size
+        cursor.close()
+        conn.executemany("DELETE FROM transcription_cache WHERE key = ?", victims)
+        self.disk_evictions += len(victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+            if self.disk_path is not None:
+                conn = self._connect()
+                conn.execute("DELETE FROM transcription_cache")
+                conn.commit()
+                self._disk_bytes = 0
+        logger.info("Transcription cache cleared")
+
+    def stats(self) -> dict:
+        with self._lock:
+            disk_entries, disk_bytes = 0, 0
+            if self.disk_path is not None:
+                disk_entries, disk_bytes = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcription_cache"
+                ).fetchone()
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "max_bytes": self.max_bytes,
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+                "disk_max_bytes": self.disk_max_bytes if self.disk_path is not None else 0,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+transcription_cache = TranscriptionCache(
+    max_bytes=settings.TRANSCRIPTION_CACHE_MAX_BYTES,
+    disk_path=(
+        Path(settings.DATA_DIR) / "transcription_cache.db"
+        if settings.TRANSCRIPTION_CACHE_DISK else None
+    ),
+    disk_max_bytes=settings.TRANSCRIPTION_CACHE_DISK_MAX_BYTES
+)
@@ -0,0 +1,185 @@
+import asyncio
+import contextvars
+import time
+from typing import Callable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.logger import logger
+from app.core.metrics import WHISPER_INFERENCE_SECONDS
+
+settings = get_settings()
+
+SAMPLE_RATE = 16000
+
+_LATENCY_SMOOTHING = 0.2  # Weight of the newest batch in avg_batch_seconds
+
+
+class TranscriptionScheduler:
+    """Micro-batching front end for a transcription backend.
+
+    Requests that arrive within ``max_wait`` of each other (or while the
+    previous batch is still decoding) are handed to ``run_batch`` together,
+    up to ``max_batch_size`` at a time, and each caller gets its own result
+    back. ``run_batch`` is a blocking callable taking a list of mono 16 kHz
+    float32 arrays and returning one transcript per array; it runs in a
+    worker thread so the event loop stays free. Up to ``concurrency``
+    batches are in flight at once, one per backend worker.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[Sequence[np.ndarray]], List[str]],
+        max_batch_size: int = settings.TRANSCRIBE_MAX_BATCH_SIZE,
+        max_wait: float = settings.TRANSCRIBE_MAX_WAIT_MS / 1000,
+        concurrency: int = 1
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.concurrency = max(1, concurrency)
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batches: Set[asyncio.Task] = set()
+        self._active = 0
+        self._active_since = 0.0
+        self.requests = 0
+        self.batches = 0
+        self.transcribed = 0
+        self.max_batch_seen = 0
+        self.failures = 0
+        self.busy_seconds = 0.0  # wall time with at least one batch decoding
+        self.decode_seconds = 0.0  # summed over batches
+        self.audio_seconds = 0.0
+        self.avg_batch_seconds: Optional[float] = None
+
+    def _ensure_started(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.concurrency)
+            # Fresh context: the worker outlives the request that started it
+            # and must not log under that request's id
+            self._worker = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    async def submit(self, audio: np.ndarray) -> str:
+        """Queue one clip for the next batch and wait for its transcript."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((audio, future))
+        self.requests += 1
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Whatever queued up while the last batch ran still joins
+                while len(batch) < self.max_batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                continue
+        return batch
+
+    async def _run(self):
+        while True:
+            # Only collect the next batch once a backend slot is free, so
+            # clips keep accumulating while every slot is busy
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: list):
+        # Callers that gave up (client disconnect) don't need decoding
+        batch = [(audio, future) for audio, future in batch if not future.done()]
+        if not batch:
+            self._slots.release()
+            return
+        audios = [audio for audio, _ in batch]
+        if self._active == 0:
+            self._active_since = time.perf_counter()
+        self._active += 1
+        started = time.perf_counter()
+        try:
+            texts = await asyncio.to_thread(self.run_batch, audios)
+        except asyncio.CancelledError:
+            self._fail(batch, RuntimeError("Transcription scheduler stopped"))
+            raise
+        except Exception as e:
+            self.failures += 1
+            logger.error("Transcription batch of %d failed: %s", len(batch), e)
+            self._fail(batch, e)
+            return
+        finally:
+            self._active -= 1
+            if self._active == 0:
+                self.busy_seconds += time.perf_counter() - self._active_since
+            self._slots.release()
+        elapsed = time.perf_counter() - started
+        WHISPER_INFERENCE_SECONDS.observe(elapsed)
+        self.decode_seconds += elapsed
+        if self.avg_batch_seconds is None:
+            self.avg_batch_seconds = elapsed
+        else:
+            self.avg_batch_seconds += _LATENCY_SMOOTHING * (elapsed - self.avg_batch_seconds)
+        self.audio_seconds += sum(len(audio) for audio in audios) / SAMPLE_RATE
+        self.batches += 1
+        self.transcribed += len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        for (_, future), text in zip(batch, texts):
+            if not future.done():
+                future.set_result(text)
+
+    @staticmethod
+    def _fail(batch: list, error: Exception):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def stop(self):
+        """Stop the worker; clips still queued or decoding are failed."""
+        if self._worker is None:
+            return
+        tasks = [self._worker, *self._batches]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker = None
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._fail(pending, RuntimeError("Transcription scheduler stopped"))
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "concurrency": self.concurrency,
+            "decoding": self._active,
+            "requests": self.requests,
+            "transcribed": self.transcribed,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "batches": self.batches,
+            "failures": self.failures,
+            "avg_batch_size": self.transcribed / self.batches if self.batches else 0.0,
+            "max_batch_seen": self.max_batch_seen,
+            "avg_batch_seconds": self.avg_batch_seconds,
+            "transcriptions_per_second": (
+                self.transcribed / self.busy_seconds if self.busy_seconds else 0.0
+            ),
+            "real_time_factor": (
+                self.decode_seconds / self.audio_seconds if self.audio_seconds else 0.0
+            ),
+        }
@@ -0,0 +1,274 @@
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.logger import logger
+from app.core.metrics import MODEL_LOAD_SECONDS
+
+settings = get_settings()
+
+_POLL_INTERVAL = 0.5  # seconds between liveness checks while waiting on a worker
+_STOP_TIMEOUT = 10.0
+
+
+class WorkerCrashedError(Exception):
+    """A transcription worker process died while handling a batch."""
+    pass
+
+
+def whisper_engine(threads: int) -> Callable[[Sequence[np.ndarray]], List[str]]:
+    """Default worker engine: an in-process SpeechService with its own model."""
+    import torch
+    from app.services.speech_service import SpeechService
+
+    if threads > 0:
+        torch.set_num_threads(threads)
+    service = SpeechService(workers=0)
+    service.preload()
+    return service.transcribe_batch
+
+
+def _worker_main(conn, engine_factory, engine_args):
+    """Worker process loop: load once, then decode batches from shared memory."""
+    started = time.perf_counter()
+    try:
+        transcribe_batch = engine_factory(*engine_args)
+    except Exception as e:
+        conn.send(("error", None, f"Failed to load transcription engine: {str(e)}"))
+        return
+    conn.send(("ready", None, time.perf_counter() - started))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        task_id, shm_name, lengths = message
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            samples = np.ndarray((sum(lengths),), dtype=np.float32, buffer=shm.buf)
+            offsets = np.cumsum([0] + list(lengths))
+            # Views into the parent's buffer: the audio is never pickled or copied
+            audios = [samples[offsets[i]:offsets[i + 1]] for i in range(len(lengths))]
+            reply = ("ok", task_id, transcribe_batch(audios))
+        except Exception as e:
+            reply = ("error", task_id, str(e))
+        finally:
+            audios = samples = None
+            shm.close()
+        conn.send(reply)
+
+
+class _Worker:
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[mp.Process] = None
+        self.conn = None
+        self.ready = False
+        self.load_seconds: Optional[float] = None
+
+
+class TranscriptionWorkerPool:
+    """Whisper in separate processes, each holding its own loaded model.
+
+    ``run_batch`` is a blocking backend for ``TranscriptionScheduler``: it
+    borrows an idle worker, copies the batch's PCM into one shared memory
+    block and sends only the block name and clip lengths over a pipe. A
+    worker that dies mid-batch fails that batch and is restarted, so one
+    bad decode cannot take the API down with it.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        engine_factory: Callable = whisper_engine,
+        engine_args: tuple = ()
+    ):
+        self.num_workers = num_workers
+        self.engine_factory = engine_factory
+        self.engine_args = engine_args
+        self._ctx = mp.get_context("spawn")  # No forked torch/event loop state
+        self._workers = [_Worker(i) for i in range(num_workers)]
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._started = False
+        self.waiting = 0
+        self.busy = 0
+        self.completed = 0
+        self.failures = 0
+        self.restarts = 0
+
+    def start(self) -> None:
+        """Spawn the workers; their models load in the background."""
+        with self._lock:
+            if self._started:
+                return
+            for worker in self._workers:
+                self._spawn(worker)
+                self._idle.put(worker)
+            self._started = True
+        logger.info("Started %d transcription workers", self.num_workers)
+
+    def _spawn(self, worker: _Worker) -> None:
+        parent_conn, child_conn = self._ctx.Pipe()
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.engine_factory, self.engine_args),
+            name=f"transcription-worker-{worker.index}",
+            daemon=True
+        )
+        worker.process.start()
+        child_conn.close()
+        worker.conn = parent_conn
+        worker.ready = False
+
+    def _restart(self, worker: _Worker) -> None:
+        if worker.process is not None and worker.process.is_alive():
+            worker.process.kill()
+        if worker.process is not None:
+            worker.process.join(timeout=_STOP_TIMEOUT)
+        if worker.conn is not None:
+            worker.conn.close()
+        self.restarts += 1
+        logger.warning("Restarting transcription worker %d", worker.index)
+        self._spawn(worker)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until every worker has loaded its model (for preload)."""
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        borrowed = []
+        try:
+            for _ in range(self.num_workers):
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                worker = self._idle.get(timeout=remaining)
+                borrowed.append(worker)
+                if not worker.ready:
+                    self._receive(worker, None, deadline)
+        except (queue.Empty, TimeoutError):
+            return False
+        except WorkerCrashedError as e:
+            logger.error(str(e))
+            self._restart(worker)
+            return False
+        finally:
+            for worker in borrowed:
+                self._idle.put(worker)
+        return True
+
+    def _receive(self, worker: _Worker, task_id: Optional[int], deadline: Optional[float] = None):
+        """Wait for the reply to ``task_id`` (or just readiness), watching for crashes."""
+        while True:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Transcription worker {worker.index} is not ready")
+            try:
+                has_message = worker.conn.poll(_POLL_INTERVAL)
+                message = worker.conn.recv() if has_message else None
+            except (EOFError, OSError):
+                raise WorkerCrashedError(f"Transcription worker {worker.index} exited")
+            if message is None:
+                if not worker.process.is_alive():
+                    raise WorkerCrashedError(
+                        f"Transcription worker {worker.index} exited "
+                        f"with code {worker.process.exitcode}"
+                    )
+                continue
+            kind, reply_id, payload = message
+            if kind == "ready":
+                worker.ready = True
+                worker.load_seconds = payload
+                MODEL_LOAD_SECONDS.labels("whisper").observe(payload)
+                if task_id is None:
+                    return None
+            elif kind == "error" and reply_id is None:
+                raise WorkerCrashedError(payload)
+            elif reply_id == task_id:
+                if kind == "error":
+                    raise RuntimeError(payload)
+                return payload
+
+    def run_batch(self, audios: Sequence[np.ndarray]) -> List[str]:
+        """Transcribe a batch on the next idle worker (blocking)."""
+        self.start()
+        with self._lock:
+            self.waiting += 1
+        worker = self._idle.get()
+        with self._lock:
+            self.waiting -= 1
+            self.busy += 1
+
+        lengths = [len(audio) for audio in audios]
+        shm = shared_memory.SharedMemory(create=True, size=max(1, sum(lengths) * 4))
+        try:
+            samples = np.ndarray((sum(lengths),), dtype=np.float32, buffer=shm.buf)
+            offset = 0
+            for audio in audios:
+                samples[offset:offset + len(audio)] = audio
+                offset += len(audio)
+            del samples  # Release the export so the block can be closed
+
+            task_id = next(self._task_ids)
+            try:
+                worker.conn.send((task_id, shm.name, lengths))
+                texts = self._receive(worker, task_id)
+            except (WorkerCrashedError, BrokenPipeError) as e:
+                self.failures += 1
+                self._restart(worker)
+                raise WorkerCrashedError(str(e))
+            except RuntimeError:
+                self.failures += 1
+                raise
+            self.completed += 1
+            return texts
+        finally:
+            shm.close()
+            shm.unlink()
+            with self._lock:
+                self.busy -= 1
+            self._idle.put(worker)
+
+    def stop(self) -> None:
+        """Ask every worker to exit, killing any that do not in time."""
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+        deadline = time.monotonic() + _STOP_TIMEOUT
+        for worker in self._workers:
+            worker.process.join(timeout=max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+            worker.conn.close()
+        self._idle = queue.Queue()
+        logger.info("Transcription workers stopped")
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.num_workers,
+            "alive": sum(
+                1 for w in self._workers if w.process is not None and w.process.is_alive()
+            ),
+            "ready": sum(1 for w in self._workers if w.ready),
+            "busy": self.busy,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "load_seconds": [w.load_seconds for w in self._workers],
+        }
@@ -0,0 +1,128 @@
+from collections import deque
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+SAMPLE_RATE = 16000
+_MIN_ENERGY_DB = -55.0  # Frames quieter than this are never speech
+_FLOOR_ADAPT = 0.05  # How fast the noise floor follows rising background noise
+
+
+class SpeechSegment(NamedTuple):
+    index: int
+    start: float  # seconds from the start of the stream
+    end: float
+    audio: np.ndarray
+
+
+class VoiceActivityDetector:
+    """Energy-based voice activity detection that cuts a stream into utterances.
+
+    Audio is split into fixed frames whose energy is compared with an
+    adaptive noise floor. A segment starts at the first loud frame (plus a
+    little pre-roll so soft onsets are kept) and ends after ``silence_ms``
+    of quiet, or when it reaches ``max_segment_seconds`` so no segment
+    outgrows Whisper's 30 second window.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: int = settings.VAD_FRAME_MS,
+        threshold_db: float = settings.VAD_THRESHOLD_DB,
+        silence_ms: int = settings.VAD_SILENCE_MS,
+        min_speech_ms: int = settings.VAD_MIN_SPEECH_MS,
+        pre_roll_ms: int = 200,
+        max_segment_seconds: float = settings.STREAM_MAX_SEGMENT_SECONDS
+    ):
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.threshold_db = threshold_db
+        self.silence_frames = max(1, silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_segment_frames = int(max_segment_seconds * 1000) // frame_ms
+        self.noise_floor: Optional[float] = None
+
+        self._remainder = np.empty(0, dtype=np.float32)
+        self._pre_roll = deque(maxlen=max(1, pre_roll_ms // frame_ms))
+        self._frames: List[np.ndarray] = []
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._segment_start = 0
+        self._frames_seen = 0
+        self._segments = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return bool(self._frames)
+
+    def current_audio(self) -> np.ndarray:
+        """Audio of the segment still in progress (empty outside speech)."""
+        if not self._frames:
+            return np.empty(0, dtype=np.float32)
+        return np.concatenate(self._frames)
+
+    def _is_speech(self, frame: np.ndarray) -> bool:
+        energy = 10 * np.log10(float(np.mean(frame * frame)) + 1e-10)
+        if self.noise_floor is None or energy < self.noise_floor:
+            self.noise_floor = energy
+        speech = energy > max(self.noise_floor + self.threshold_db, _MIN_ENERGY_DB)
+        if not speech:
+            self.noise_floor += _FLOOR_ADAPT * (energy - self.noise_floor)
+        return speech
+
+    def push(self, samples: np.ndarray) -> List[SpeechSegment]:
+        """Feed mono float32 samples; returns segments completed by them."""
+        audio = np.concatenate((self._remainder, samples.astype(np.float32, copy=False)))
+        usable = len(audio) - len(audio) % self.frame_size
+        self._remainder = audio[usable:]
+
+        completed = []
+        for frame in audio[:usable].reshape(-1, self.frame_size):
+            self._frames_seen += 1
+            speech = self._is_speech(frame)
+            if not self._frames:
+                if speech:
+                    self._segment_start = self._frames_seen - 1 - len(self._pre_roll)
+                    self._frames = list(self._pre_roll) + [frame]
+                    self._speech_frames = 1
+                    self._silence_run = 0
+                    self._pre_roll.clear()
+                else:
+                    self._pre_roll.append(frame)
+                continue
+
+            self._frames.append(frame)
+            if speech:
+                self._speech_frames += 1
+                self._silence_run = 0
+            else:
+                self._silence_run += 1
+            if self._silence_run >= self.silence_frames or len(self._frames) >= self.max_segment_frames:
+                segment = self._close()
+                if segment is not None:
+                    completed.append(segment)
+        return completed
+
+    def flush(self) -> Optional[SpeechSegment]:
+        """End of stream: close the segment in progress, if any."""
+        return self._close() if self._frames else None
+
+    def _close(self) -> Optional[SpeechSegment]:
+        frames, speech_frames = self._frames, self._speech_frames
+        self._frames, self._speech_frames, self._silence_run = [], 0, 0
+        if speech_frames < self.min_speech_frames:
+            return None  # A click or a cough, not an utterance
+        start = self._segment_start * self.frame_size / self.sample_rate
+        segment = SpeechSegment(
+            index=self._segments,
+            start=start,
+            end=start + len(frames) * self.frame_size / self.sample_rate,
+            audio=np.concatenate(frames)
+        )
+        self._segments += 1
+        return segment
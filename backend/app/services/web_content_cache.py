@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from app.clients.web_search import WebSearchError, web_search
+from app.services.generation_cache import normalize_topic
+from app.services.single_flight import SingleFlight
+from app.core.config import get_settings
+from app.core.logger import logger
+
+settings = get_settings()
+
+
+def make_query_key(query: str) -> str:
+    return hashlib.sha256(normalize_topic(query).encode("utf-8")).hexdigest()
+
+
+def format_context(results: List[dict]) -> str:
+    """Search results as reference material for the question prompt."""
+    sections = []
+    for i, result in enumerate(results, start=1):
+        body = result.get("text") or result.get("snippet") or ""
+        if body:
+            sections.append(f"[{i}] {result.get('title') or result['url']}\n{body}")
+    if not sections:
+        return ""
+    return (
+        "Use the following reference material from the web. Base the questions "
+        "on it where relevant and do not contradict it.\n\n" + "\n\n".join(sections)
+    )
+
+
+class WebContentCache:
+    """Local store of web search results and page extracts for ``use_web_search``.
+
+    Results are keyed by normalized query and kept zlib-compressed in a
+    SQLite file, so repeat topics skip the network. Entries older than
+    ``ttl`` are refetched; if the search service cannot be reached and
+    ``serve_stale`` is set, the stale copy is used instead, which keeps
+    web-augmented quizzes working offline. Entries are dropped ``max_stale``
+    seconds after they expire, and the least recently used ones go once the
+    compressed total exceeds ``max_bytes``. Concurrent misses for the same
+    query share one fetch, and SQLite work runs in a worker thread. Without
+    a ``search`` function only what is already cached is served.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        search: Optional[Callable[[str], Awaitable[List[dict]]]],
+        max_bytes: int,
+        ttl: float,
+        max_stale: float,
+        serve_stale: bool = True
+    ):
+        self.path = Path(path)
+        self.search = search
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.serve_stale = serve_stale
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.stale_served = 0
+        self.fetch_failures = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS web_content ("
+                " key TEXT PRIMARY KEY,"
+                " query TEXT NOT NULL,"
+                " payload BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_web_content_accessed_at"
+                " ON web_content (accessed_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_web_content_fetched_at"
+                " ON web_content (fetched_at)"
+            )
+            conn.commit()
+            self._bytes = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM web_content"
+            ).fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def load(self, query: str) -> Optional[Tuple[List[dict], float]]:
+        """Cached results for ``query`` and when they were fetched, fresh or not."""
+        key = make_query_key(query)
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT payload, fetched_at FROM web_content WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE web_content SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            conn.commit()
+        return json.loads(zlib.decompress(row[0])), row[1]
+
+    def store(self, query: str, results: List[dict]) -> None:
+        """Save fetched results, then apply the expiry and size limits."""
+        payload = zlib.compress(json.dumps(results).encode("utf-8"), 6)
+        key = make_query_key(query)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            replaced = conn.execute(
+                "SELECT size FROM web_content WHERE key = ?", (key,)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO web_content"
+                " (key, query, payload, size, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, query, payload, len(payload), now, now)
+            )
+            self._bytes += len(payload) - (replaced[0] if replaced else 0)
+            expired = conn.execute(
+                "DELETE FROM web_content WHERE fetched_at < ? RETURNING size",
+                (now - self.ttl - self.max_stale,)
+            ).fetchall()
+            self._bytes -= sum(size for size, in expired)
+            self.evictions += len(expired)
+            if self._bytes > self.max_bytes:
+                self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used rows until the byte budget is met."""
+        victims = []
+        excess = self._bytes - self.max_bytes
+        cursor = conn.execute("SELECT key, size FROM web_content ORDER BY accessed_at, rowid")
+        for key, size in cursor:
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+            self._bytes -= size
+        cursor.close()
+        conn.executemany("DELETE FROM web_content WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    async def get(self, query: str) -> Optional[List[dict]]:
+        """Search results for ``query``, from the cache when fresh.
+
+        Returns None when there is nothing to use: the search failed and no
+        cached copy (or no stale one, without ``serve_stale``) exists.
+        """
+        cached = await asyncio.to_thread(self.load, query)
+        if cached is not None and time.time() - cached[1] <= self.ttl:
+            self.hits += 1
+            return cached[0]
+        if cached is None:
+            self.misses += 1
+        else:
+            self.refreshes += 1
+        if self.search is None:
+            return cached[0] if cached is not None and self.serve_stale else None
+        try:
+            results = await self._flight.do(make_query_key(query), lambda: self.search(query))
+        except WebSearchError as e:
+            self.fetch_failures += 1
+            if cached is not None and self.serve_stale:
+                self.stale_served += 1
+                logger.warning(
+                    "Web search unavailable, using results from %.1f days ago: %s",
+                    (time.time() - cached[1]) / 86400, str(e)
+                )
+                return cached[0]
+            logger.warning("Web search unavailable and nothing cached for %r: %s", query, str(e))
+            return None
+        await asyncio.to_thread(self.store, query, results)
+        return results
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM web_content")
+            conn.commit()
+            self._bytes = 0
+        logger.info("Web content cache cleared")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM web_content"
+            ).fetchone()
+            lookups = self.hits + self.misses + self.refreshes
+            return {
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stale_served": self.stale_served,
+                "fetch_failures": self.fetch_failures,
+                "evictions": self.evictions,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+web_content_cache = WebContentCache(
+    path=Path(settings.DATA_DIR) / "web_cache.db",
+    search=web_search.search if settings.WEB_SEARCH_URL else None,
+    max_bytes=settings.WEB_CACHE_MAX_BYTES,
+    ttl=settings.WEB_CACHE_TTL,
+    max_stale=settings.WEB_CACHE_MAX_STALE,
+    serve_stale=settings.WEB_CACHE_SERVE_STALE
+)
@@ -0,0 +1,89 @@
+"""Compare the in-process audio decoder with the old pydub pipeline.
+
+Reports median decode time and peak Python/NumPy memory (tracemalloc)
+per request for a few formats and clip lengths.
+
+    python -m benchmarks.audio_decode --seconds 10 30 --repeats 5
+"""
+import argparse
+import io
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import soundfile as sf
+
+from app.services.audio_decode import decode_audio
+
+
+def _upload(audio_format, seconds, rate=48000):
+    t = np.arange(int(rate * seconds)) / rate
+    left = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * np.random.default_rng(0).standard_normal(len(t))
+    stereo = np.stack([left, left[::-1]], axis=1).astype(np.float32)
+    buffer = io.BytesIO()
+    sf.write(buffer, stereo, rate, format=audio_format)
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(buffer.getvalue())
+    return spooled
+
+
+def _legacy(file, audio_format):
+    """The previous transcribe_audio path: bytes -> ffmpeg -> pydub -> numpy."""
+    from pydub import AudioSegment
+
+    audio_bytes = file.read()
+    audio = AudioSegment.from_file(io.BytesIO(audio_bytes), format=audio_format.lower())
+    audio = audio.set_channels(1)
+    audio = audio.set_frame_rate(16000)
+    samples = np.array(audio.get_array_of_samples())
+    return samples.astype(np.float32) / 32768.0
+
+
+def _measure(fn, file, repeats):
+    timings, peaks = [], []
+    for _ in range(repeats):
+        file.seek(0)
+        tracemalloc.start()
+        started = time.perf_counter()
+        fn(file)
+        timings.append(time.perf_counter() - started)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(timings), max(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--formats", nargs="+", default=["WAV", "FLAC", "OGG"])
+    parser.add_argument("--seconds", nargs="+", type=float, default=[10.0, 30.0])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        import pydub  # noqa: F401
+        legacy_available = True
+    except ImportError:
+        legacy_available = False
+        print("pydub not installed; only the new decoder is measured\n")
+
+    header = f"{'format':<6} {'secs':>5} {'pipeline':<9} {'ms':>8} {'peak MB':>8}"
+    print(header)
+    print("-" * len(header))
+    for audio_format in args.formats:
+        for seconds in args.seconds:
+            upload = _upload(audio_format, seconds)
+            pipelines = [("in-proc", lambda f: decode_audio(f, max_duration=seconds + 1))]
+            if legacy_available:
+                pipelines.append(("pydub", lambda f: _legacy(f, audio_format)))
+            for name, fn in pipelines:
+                elapsed, peak = _measure(fn, upload, args.repeats)
+                print(
+                    f"{audio_format:<6} {seconds:>5g} {name:<9} "
+                    f"{elapsed * 1000:>8.1f} {peak / 1024 / 1024:>8.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Local stand-in for Ollama used by the load tests.
+
+Serves the two endpoints the backend talks to:
+
+* ``POST /v1/chat/completions`` (also ``/chat/completions``), the
+  OpenAI-compatible API educhain's ChatOpenAI client calls. The reply is a
+  canned question list in the JSON shape educhain's parser expects for the
+  question type named in the prompt.
+* ``POST /api/generate``, used by the model registry to warm and unload
+  models.
+
+Latency is ``latency`` seconds plus the completion's tokens at
+``token_rate`` tokens per second, and at most ``parallel`` requests are
+served at once (like ``OLLAMA_NUM_PARALLEL``); the rest queue.
+
+    python -m benchmarks.fake_ollama --port 11434 --latency 0.2 --token-rate 80
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_PROMPT = re.compile(
+    r"Generate (\d+) (Multiple Choice|Short Answer|True/False|Fill in the Blank) question"
+)
+_TOPIC = re.compile(r"Topic:\s*(.+)")
+_WORDS = (
+    "energy cell river planet market theorem poem empire protein circuit "
+    "glacier fraction verb treaty orbit enzyme sonnet volcano ledger prism"
+).split()
+
+
+def _question(question_type: str, topic: str, rng: random.Random, serial: int) -> dict:
+    # Vary the wording so near-duplicate detection treats questions as new
+    detail = " ".join(rng.sample(_WORDS, 4))
+    text = f"Question {serial} on {topic}: how does {detail} relate?"
+    question = {"question": text, "explanation": f"Because of {rng.choice(_WORDS)}."}
+    if question_type == "Multiple Choice":
+        options = rng.sample(_WORDS, 4)
+        question.update(options=options, answer=options[0])
+    elif question_type == "True/False":
+        question.update(question=f"True or false: {text}", answer=rng.random() < 0.5)
+    elif question_type == "Fill in the Blank":
+        word = rng.choice(_WORDS)
+        question.update(question=f"{text} The key idea is _____.", answer=word, blank_word=word)
+    else:
+        question.update(answer=f"It depends on {detail}.", keywords=detail.split()[:2])
+    return question
+
+
+def canned_response(prompt: str, rng: random.Random, serial: int = 0) -> str:
+    """JSON question list for the question type and count the prompt asks for."""
+    match = _PROMPT.search(prompt)
+    count, question_type = (int(match.group(1)), match.group(2)) if match else (1, "Short Answer")
+    topic_match = _TOPIC.search(prompt)
+    topic = topic_match.group(1).strip() if topic_match else "general knowledge"
+    questions = [_question(question_type, topic, rng, serial + i) for i in range(count)]
+    return json.dumps({"questions": questions})
+
+
+class FakeOllama:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.2,
+        token_rate: float = 80.0,
+        parallel: int = 2,
+        seed: int = 0
+    ):
+        self.latency = latency
+        self.token_rate = token_rate
+        self._slots = threading.Semaphore(parallel)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._serial = itertools.count(1)
+        self.requests = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send(200, {"models": []})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                fake.requests += 1
+                if self.path.endswith("/chat/completions"):
+                    self._send(200, fake.chat(request))
+                elif self.path == "/api/generate":
+                    self._send(200, fake.generate(request))
+                else:
+                    self._send(404, {"error": "not found"})
+
+        return Handler
+
+    def _simulate(self, completion_tokens: int):
+        with self._slots:
+            time.sleep(self.latency + completion_tokens / self.token_rate)
+
+    def chat(self, request: dict) -> dict:
+        prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        with self._rng_lock:
+            rng = random.Random(self._rng.random())
+        content = canned_response(prompt, rng, serial=next(self._serial) * 100)
+        completion_tokens = max(1, len(content) // 4)
+        self._simulate(completion_tokens)
+        prompt_tokens = len(prompt) // 4
+        return {
+            "id": f"chatcmpl-{next(self._serial)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    def generate(self, request: dict) -> dict:
+        # Warm-up and unload calls: one token, no model load to speak of
+        self._simulate(1 if request.get("keep_alive") != 0 else 0)
+        return {"model": request.get("model", "fake"), "response": "", "done": True}
+
+    def start(self) -> "FakeOllama":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per request")
+    parser.add_argument("--token-rate", type=float, default=80.0, help="tokens per second")
+    parser.add_argument("--parallel", type=int, default=2, help="requests served at once")
+    args = parser.parse_args()
+
+    fake = FakeOllama(args.host, args.port, args.latency, args.token_rate, args.parallel)
+    print(f"Fake Ollama listening on {fake.url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
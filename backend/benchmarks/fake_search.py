@@ -0,0 +1,119 @@
+"""Local stand-in for a SearxNG search API, for tests and offline development.
+
+Serves the two things the web content cache fetches:
+
+* ``GET /search?q=...&format=json``: ``results`` entries pointing at pages
+  on this server, with a title and snippet built from the query.
+* ``GET /pages/<slug>/<n>``: an HTML article about the query, wrapped in
+  navigation, scripts and a footer the text extractor should drop.
+
+Point the backend at it with ``WEB_SEARCH_URL``:
+
+    python -m benchmarks.fake_search --port 8888
+"""
+import argparse
+import html
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+PAGE = """<!doctype html>
+<html><head><title>{title}</title><script>var tracking = "ignore me";</script>
+<style>body {{ font-family: serif; }}</style></head>
+<body><nav>Home | About | Contact</nav>
+<article><h1>{title}</h1>
+<p>{topic} is explained here in plain language (source {n}).</p>
+<p>Key facts about {topic}: it has causes, effects and a history worth knowing.</p>
+</article><footer>Copyright fake search</footer></body></html>"""
+
+
+class FakeSearch:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, results: int = 5):
+        self.results = results
+        self.searches = 0
+        self.page_views = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def search(self, query: str) -> dict:
+        slug = quote(query, safe="")
+        return {
+            "query": query,
+            "results": [
+                {
+                    "url": f"{self.url}/pages/{slug}/{n}",
+                    "title": f"{query.title()} - source {n}",
+                    "content": f"A short summary of {query} from source {n}.",
+                }
+                for n in range(1, self.results + 1)
+            ],
+        }
+
+    def page(self, slug: str, n: str) -> str:
+        topic = html.escape(unquote(slug))
+        return PAGE.format(title=f"{topic.title()} - source {n}", topic=topic, n=n)
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body: str, content_type: str):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                parts = url.path.strip("/").split("/")
+                if url.path == "/search":
+                    fake.searches += 1
+                    query = parse_qs(url.query).get("q", [""])[0]
+                    self._send(200, json.dumps(fake.search(query)), "application/json")
+                elif len(parts) == 3 and parts[0] == "pages":
+                    fake.page_views += 1
+                    self._send(200, fake.page(parts[1], parts[2]), "text/html; charset=utf-8")
+                else:
+                    self._send(404, json.dumps({"error": "not found"}), "application/json")
+
+        return Handler
+
+    def start(self) -> "FakeSearch":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--results", type=int, default=5, help="results per search")
+    args = parser.parse_args()
+
+    fake = FakeSearch(args.host, args.port, args.results)
+    print(f"Fake search listening on {fake.url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Synthetic inputs for the benchmarks."""
+import io
+
+import numpy as np
+import soundfile as sf
+
+QUESTION_TYPES = ["Multiple Choice", "Short Answer", "True/False", "Fill in the Blank"]
+TOPICS = [
+    "photosynthesis", "the french revolution", "prime numbers", "plate tectonics",
+    "the water cycle", "shakespeare's sonnets", "newton's laws", "the roman empire",
+    "cell division", "supply and demand", "electric circuits", "the solar system",
+]
+
+
+def speech_like(seconds: float, sample_rate: int = 16000, seed: int = 0) -> np.ndarray:
+    """Mono float32 audio with syllable-rate bursts of voiced tones over quiet noise."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sample_rate)
+    t = np.arange(n) / sample_rate
+    pitch = 120 + 40 * np.sin(2 * np.pi * 0.5 * t)
+    voiced = sum(np.sin(2 * np.pi * k * np.cumsum(pitch) / sample_rate) / k for k in (1, 2, 3))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)  # ~4 syllables a second
+    audio = 0.3 * voiced * envelope + 0.01 * rng.standard_normal(n)
+    return audio.astype(np.float32)
+
+
+def wav_bytes(seconds: float, sample_rate: int = 16000, seed: int = 0) -> bytes:
+    """A 16-bit PCM WAV upload of ``speech_like`` audio."""
+    buffer = io.BytesIO()
+    sf.write(buffer, speech_like(seconds, sample_rate, seed), sample_rate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
@@ -0,0 +1,277 @@
+"""End-to-end load test of the API against a local fake Ollama.
+
+Starts ``benchmarks.fake_ollama`` and a ``uvicorn`` server for the backend
+in a scratch directory, then drives each scenario at ``--concurrency``
+for ``--requests`` requests and reports latency percentiles and
+throughput:
+
+* ``quiz``        POST /api/quiz, cycling topics and question types
+* ``history``     GET /api/quiz/history
+* ``quiz_detail`` GET /api/quiz/{id} for quizzes created by ``quiz``
+* ``transcribe``  POST /api/speech/transcribe with synthetic WAV clips
+
+Results can be saved as a JSON baseline and later runs compared against it:
+
+    python -m benchmarks.load_test --concurrency 8 --output baseline.json
+    python -m benchmarks.load_test --concurrency 8 --compare baseline.json
+
+Pass ``--url`` to load an already running server (and its real Ollama)
+instead of starting both.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fake_ollama import FakeOllama
+from benchmarks.fixtures import QUESTION_TYPES, TOPICS, wav_bytes
+from benchmarks.startup import BACKEND, _free_port
+
+SCENARIOS = ["quiz", "history", "quiz_detail", "transcribe"]
+REGRESSION_TOLERANCE = 0.10  # Slower p95 or lower rps than this fraction is flagged
+
+
+def percentile(values, q: float) -> float:
+    """Linearly interpolated percentile, ``q`` in [0, 100]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(latencies, errors: int, elapsed: float, status_codes: dict) -> dict:
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "status_codes": status_codes,
+        "elapsed_seconds": elapsed,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "mean": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+            "max": max(latencies) * 1000 if latencies else 0.0,
+        },
+    }
+
+
+class Scenarios:
+    """Request factories for each scenario; each returns an ``httpx`` request coroutine."""
+
+    def __init__(self, client: httpx.AsyncClient, args):
+        self.client = client
+        self.args = args
+        self.quiz_ids = []
+        self._counter = itertools.count()
+        self._clips = [wav_bytes(args.clip_seconds, seed=seed) for seed in range(args.distinct_clips)]
+
+    def quiz(self):
+        i = next(self._counter)
+        topic = TOPICS[i % len(TOPICS)]
+        if not self.args.repeat_topics:
+            topic = f"{topic} {i}"  # Distinct topics measure generation, not the cache
+        return self.client.post("/api/quiz", json={
+            "topic": topic,
+            "question_type": QUESTION_TYPES[i % len(QUESTION_TYPES)],
+            "num_questions": self.args.num_questions,
+            "difficulty": "Medium",
+            "use_cache": self.args.repeat_topics,
+        })
+
+    def history(self):
+        return self.client.get("/api/quiz/history", params={"limit": 10})
+
+    def quiz_detail(self):
+        i = next(self._counter)
+        quiz_id = self.quiz_ids[i % len(self.quiz_ids)] if self.quiz_ids else 1
+        return self.client.get(f"/api/quiz/{quiz_id}")
+
+    def transcribe(self):
+        clip = self._clips[next(self._counter) % len(self._clips)]
+        return self.client.post(
+            "/api/speech/transcribe", files={"audio": ("clip.wav", clip, "audio/wav")}
+        )
+
+    async def collect_quiz_ids(self):
+        response = await self.client.get("/api/quiz/history", params={"limit": 100})
+        if response.status_code == 200:
+            self.quiz_ids = [item["id"] for item in response.json()]
+
+
+async def run_scenario(make_request, total: int, concurrency: int) -> dict:
+    latencies, status_codes = [], {}
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await make_request()
+                code = str(response.status_code)
+            except httpx.HTTPError as e:
+                code = type(e).__name__
+            status_codes[code] = status_codes.get(code, 0) + 1
+            if code.startswith("2"):
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started, status_codes)
+
+
+async def drive(base_url: str, args) -> dict:
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        scenarios = Scenarios(client, args)
+        results = {}
+        for name in args.scenarios:
+            if name == "quiz_detail":
+                await scenarios.collect_quiz_ids()
+            make_request = getattr(scenarios, name)
+            if args.warmup:
+                await run_scenario(make_request, args.warmup, min(args.warmup, args.concurrency))
+            results[name] = await run_scenario(make_request, args.requests, args.concurrency)
+            _print_result(name, results[name])
+        return results
+
+
+def _server_env(ollama_url: str, args) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(BACKEND) + os.pathsep + env.get("PYTHONPATH", "")
+    env["OLLAMA_HOST"] = ollama_url
+    env.setdefault("POOL_ENABLED", "false")  # Background pre-generation would skew latencies
+    env.setdefault("MODEL_WARM_ON_STARTUP", "true")
+    env.setdefault("LLM_MAX_CONCURRENCY", str(args.ollama_parallel))
+    env.setdefault("WHISPER_MODEL", args.whisper_model)
+    return env
+
+
+def _wait_healthy(server: subprocess.Popen, url: str, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited: {server.stderr.read().decode()[-2000:]}")
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            time.sleep(0.05)
+    raise TimeoutError("No /health response")
+
+
+def run_local(args) -> dict:
+    fake = FakeOllama(
+        latency=args.ollama_latency, token_rate=args.ollama_token_rate, parallel=args.ollama_parallel
+    ).start()
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as workdir:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=workdir, env=_server_env(fake.url, args),
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        try:
+            _wait_healthy(server, url)
+            results = asyncio.run(drive(url, args))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+            fake.stop()
+    results["fake_ollama_requests"] = fake.requests
+    return results
+
+
+def _print_result(name: str, result: dict):
+    latency = result["latency_ms"]
+    print(
+        f"{name:<12} {result['rps']:8.1f} req/s  p50 {latency['p50']:8.1f}ms  "
+        f"p95 {latency['p95']:8.1f}ms  p99 {latency['p99']:8.1f}ms  "
+        f"errors {result['errors']}/{result['requests']}"
+    )
+
+
+def compare(results: dict, baseline: dict) -> bool:
+    """Print the change against a saved baseline; False if any scenario regressed."""
+    ok = True
+    print(f"\nAgainst baseline from {baseline.get('created', 'unknown')}:")
+    for name in SCENARIOS:
+        new, old = results["scenarios"].get(name), baseline["scenarios"].get(name)
+        if not new or not old:
+            continue
+        p95_change = (new["latency_ms"]["p95"] / old["latency_ms"]["p95"] - 1) if old["latency_ms"]["p95"] else 0.0
+        rps_change = (new["rps"] / old["rps"] - 1) if old["rps"] else 0.0
+        regressed = (
+            p95_change > REGRESSION_TOLERANCE
+            or rps_change < -REGRESSION_TOLERANCE
+            or new["errors"] > old["errors"]
+        )
+        ok = ok and not regressed
+        print(
+            f"{name:<12} p95 {p95_change:+7.1%}  rps {rps_change:+7.1%}  "
+            f"errors {old['errors']} -> {new['errors']}{'  REGRESSED' if regressed else ''}"
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=50, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured requests per scenario")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds per request")
+    parser.add_argument("--num-questions", type=int, default=5)
+    parser.add_argument("--repeat-topics", action="store_true",
+                        help="reuse topics with use_cache on, measuring cache hits")
+    parser.add_argument("--clip-seconds", type=float, default=5.0)
+    parser.add_argument("--distinct-clips", type=int, default=4,
+                        help="clips cycled by transcribe; fewer than --requests exercises the cache")
+    parser.add_argument("--ollama-latency", type=float, default=0.2)
+    parser.add_argument("--ollama-token-rate", type=float, default=80.0)
+    parser.add_argument("--ollama-parallel", type=int, default=2)
+    parser.add_argument("--whisper-model", default="tiny")
+    parser.add_argument("--url", help="load this running server instead of starting one")
+    parser.add_argument("--output", help="write results as a JSON baseline to this file")
+    parser.add_argument("--compare", help="compare against a baseline written by --output")
+    args = parser.parse_args()
+
+    scenario_results = asyncio.run(drive(args.url, args)) if args.url else run_local(args)
+    fake_requests = scenario_results.pop("fake_ollama_requests", None)
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {
+            key: value for key, value in vars(args).items() if key not in ("output", "compare")
+        },
+        "fake_ollama_requests": fake_requests,
+        "scenarios": scenario_results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.compare:
+        if not compare(results, json.loads(Path(args.compare).read_text())):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
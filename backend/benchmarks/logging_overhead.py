@@ -0,0 +1,132 @@
+"""Measure what logging costs the request path.
+
+Compares the old setup (``FileHandler`` and ``StreamHandler`` writing on
+the caller's thread) with the queue pipeline from ``app.core.logger``,
+where the caller only formats the message and enqueues it. Console
+output goes to /dev/null so the terminal speed does not dominate.
+
+Two workloads are timed in the calling thread:
+
+* ``record``: one INFO line.
+* ``request``: the lines one transcription request used to log, with
+  f-strings and the full transcript, against the lazy, structured lines
+  it logs now (the transcript only at DEBUG, which is off).
+
+    python -m benchmarks.logging_overhead --records 5000 --output logging.json
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.core.logger import TEXT_FORMAT, RequestIdFilter, build_pipeline
+
+TRANSCRIPT = "the quick brown fox jumps over the lazy dog " * 8
+
+
+class _Audio:
+    shape = (80000,)
+    dtype = "float32"
+
+
+def old_request(logger: logging.Logger, audio=_Audio()):
+    logger.info(f"Received audio file: {'clip.webm'}, content_type: {'audio/webm'}")
+    logger.info("Decoding audio file...")
+    logger.info(f"Audio processed: shape={audio.shape}, dtype={audio.dtype}")
+    logger.info("Starting transcription...")
+    logger.info(f"Transcription complete. Text: '{TRANSCRIPT}'")
+    logger.info(f"Transcription result: {TRANSCRIPT}")
+
+
+def new_request(logger: logging.Logger, audio=_Audio()):
+    logger.info("Received audio file: %s", "clip.webm", extra={"content_type": "audio/webm"})
+    logger.debug("Decoded %d samples", audio.shape[0])
+    logger.info("Transcription complete", extra={"audio_seconds": 5.0, "chars": len(TRANSCRIPT)})
+    logger.debug("Transcription result: %s", TRANSCRIPT)
+
+
+def _sync_logger(log_path: Path, devnull) -> logging.Logger:
+    logger = logging.getLogger("bench.sync")
+    formatter = logging.Formatter(TEXT_FORMAT)
+    for handler in (logging.FileHandler(log_path), logging.StreamHandler(devnull)):
+        handler.setFormatter(formatter)
+        handler.addFilter(RequestIdFilter())
+        logger.addHandler(handler)
+    return logger
+
+
+def _queue_logger(log_path: Path, devnull):
+    logger = logging.getLogger("bench.queue")
+    handler, listener = build_pipeline(log_path, stream=devnull)
+    logger.addHandler(handler)
+    listener.start()
+    return logger, listener
+
+
+def _drain(logger: logging.Logger):
+    for handler in logger.handlers:
+        queue = getattr(handler, "queue", None)
+        while queue is not None and not queue.empty():
+            time.sleep(0.01)
+
+
+def _time_per_call(fn, logger, count: int, repeats: int) -> float:
+    """Median microseconds per call across ``repeats`` runs."""
+    runs = []
+    for _ in range(repeats):
+        _drain(logger)  # Start each run with the writer caught up
+        started = time.perf_counter()
+        for _ in range(count):
+            fn(logger)
+        runs.append((time.perf_counter() - started) / count * 1e6)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=5000,
+                        help="calls per run; keep below LOG_QUEUE_SIZE so nothing is dropped")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, "w") as devnull:
+        sync = _sync_logger(Path(workdir) / "sync.log", devnull)
+        queued, listener = _queue_logger(Path(workdir) / "queue.log", devnull)
+        for logger in (sync, queued):
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+
+        def one_record(logger):
+            logger.info("Generated %d questions", 5)
+
+        try:
+            results["record_us"] = {
+                "sync": _time_per_call(one_record, sync, args.records, args.repeats),
+                "queue": _time_per_call(one_record, queued, args.records, args.repeats),
+            }
+            requests = max(1, args.records // 6)
+            results["request_us"] = {
+                "sync_old_lines": _time_per_call(old_request, sync, requests, args.repeats),
+                "queue_old_lines": _time_per_call(old_request, queued, requests, args.repeats),
+                "queue_new_lines": _time_per_call(new_request, queued, requests, args.repeats),
+            }
+            results["dropped"] = queued.handlers[0].dropped
+        finally:
+            listener.stop()
+
+    for workload in ("record_us", "request_us"):
+        for name, micros in results[workload].items():
+            print(f"{workload:<11} {name:<16} {micros:8.1f} us")
+    print(f"dropped records: {results['dropped']}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Measure backend cold start: import time and time to first /health response.
+
+Each server run starts a fresh ``uvicorn`` process in a scratch directory
+(so ``data/`` and ``logs/`` are isolated). The first run creates the
+database; later runs show the steady-state startup the desktop shell sees.
+
+    python -m benchmarks.startup --runs 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _env(workdir: str) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(BACKEND) + os.pathsep + env.get("PYTHONPATH", "")
+    # Keep the run self-contained: no Ollama calls or pre-generation
+    env.setdefault("MODEL_WARM_ON_STARTUP", "false")
+    env.setdefault("POOL_ENABLED", "false")
+    return env
+
+
+def measure_import(workdir: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=workdir, env=_env(workdir), capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure_first_response(workdir: str, timeout: float = 60.0) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=_env(workdir), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited: {server.stderr.read().decode()[-2000:]}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("No /health response")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def _summary(values):
+    return {
+        "min": min(values),
+        "median": statistics.median(values),
+        "max": max(values),
+        "runs": values,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        imports = [measure_import(workdir) for _ in range(args.runs)]
+        first_boot = measure_first_response(workdir)  # Creates the schema
+        warm_boots = [measure_first_response(workdir) for _ in range(args.runs)]
+
+    results = {
+        "import_seconds": _summary(imports),
+        "first_boot_health_seconds": first_boot,
+        "health_seconds": _summary(warm_boots),
+    }
+    print(f"import app.main        median {results['import_seconds']['median']:.3f}s")
+    print(f"/health (new database) {first_boot:.3f}s")
+    print(f"/health (existing db)  median {results['health_seconds']['median']:.3f}s")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Compare Whisper load time, real-time factor and memory on CPU.
+
+Each (model, quantization) combination runs in a fresh process so load
+time and peak memory are not skewed by earlier runs.
+
+    python -m benchmarks.whisper_cpu --models tiny base small medium \\
+        --audio sample.wav --threads 4
+"""
+import argparse
+import multiprocessing as mp
+import resource
+import time
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def _load_audio(path, seconds):
+    if path is None:
+        # Speech-shaped noise: the decoder still runs, but the text is junk
+        rng = np.random.default_rng(0)
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+        return (0.1 * envelope * rng.standard_normal(len(t))).astype(np.float32)
+
+    import soundfile as sf
+    audio, rate = sf.read(path, dtype="float32", always_2d=True)
+    audio = audio.mean(axis=1)
+    if rate != SAMPLE_RATE:
+        positions = np.arange(0, len(audio), rate / SAMPLE_RATE)
+        audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+
+def _run(model_name, quantize, threads, audio, repeats, results):
+    import torch
+    from app.services.speech_service import load_whisper_model
+
+    if threads:
+        torch.set_num_threads(threads)
+    started = time.perf_counter()
+    model = load_whisper_model(model_name, "cpu", quantize)
+    load_seconds = time.perf_counter() - started
+    rss_after_load = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    # First call includes one-time kernel setup; report it separately
+    timings = []
+    for _ in range(repeats + 1):
+        started = time.perf_counter()
+        model.transcribe(audio, language="en", fp16=False, temperature=0.0)
+        timings.append(time.perf_counter() - started)
+
+    audio_seconds = len(audio) / SAMPLE_RATE
+    results.put({
+        "model": model_name,
+        "quantized": quantize,
+        "threads": torch.get_num_threads(),
+        "load_s": load_seconds,
+        "first_rtf": timings[0] / audio_seconds,
+        "rtf": float(np.median(timings[1:])) / audio_seconds,
+        "load_rss_mb": rss_after_load,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", nargs="+", default=["tiny", "base", "small"])
+    parser.add_argument("--audio", help="Audio file to transcribe (default: 10s of noise)")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    audio = _load_audio(args.audio, args.seconds)
+    ctx = mp.get_context("spawn")
+    rows = []
+    for model_name in args.models:
+        for quantize in (False, True):
+            results = ctx.Queue()
+            proc = ctx.Process(
+                target=_run,
+                args=(model_name, quantize, args.threads, audio, args.repeats, results)
+            )
+            proc.start()
+            proc.join()
+            if proc.exitcode != 0:
+                print(f"{model_name} quantized={quantize}: failed ({proc.exitcode})")
+                continue
+            rows.append(results.get())
+
+    header = f"{'model':<8} {'int8':<5} {'thr':>3} {'load s':>7} {'1st RTF':>8} {'RTF':>6} {'load MB':>8} {'peak MB':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['model']:<8} {str(row['quantized']):<5} {row['threads']:>3} "
+            f"{row['load_s']:>7.2f} {row['first_rtf']:>8.3f} {row['rtf']:>6.3f} "
+            f"{row['load_rss_mb']:>8.0f} {row['peak_rss_mb']:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import asyncio
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# quiz.db, the cache databases and logs/app.log are opened at import time,
+# which happens while tests are collected. Point them at a scratch
+# directory first so a test run never writes into the checkout.
+_scratch = tempfile.mkdtemp(prefix="cusa-tests-")
+os.environ["DATA_DIR"] = os.path.join(_scratch, "data")
+os.environ["LOG_DIR"] = os.path.join(_scratch, "logs")
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.database.database import _set_sqlite_pragmas  # noqa: E402
+from app.models import QuizQuestion  # noqa: E402
+
+
+def pytest_unconfigure(config):
+    from app.core.logger import stop_logging
+
+    stop_logging()
+    shutil.rmtree(_scratch, ignore_errors=True)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A fresh quiz database file with every table created."""
+    path = tmp_path / "quiz.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def session_factory(db_path):
+    """Async sessions on ``db_path``, with the app's connection pragmas.
+
+    Connections are not pooled, so the factory works from any event loop:
+    each ``asyncio.run`` and every ``TestClient`` request has its own.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def fake_generate_questions():
+    """Stands in for ``educhain_client.generate_questions``.
+
+    Every question it returns has a new text (``Q0``, ``Q1``, ...) and ids
+    from ``start_id``; ``calls`` records the count of each call.
+    """
+    made = []
+
+    async def generate_questions(**kwargs):
+        generate_questions.calls.append(kwargs["num_questions"])
+        first = len(made)
+        questions = [
+            QuizQuestion(
+                id=kwargs["start_id"] + i,
+                question=f"Q{first + i}",
+                correctAnswer="True",
+                type=kwargs["question_type"]
+            )
+            for i in range(kwargs["num_questions"])
+        ]
+        made.extend(questions)
+        return questions
+
+    generate_questions.calls = []
+    return generate_questions
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    ClientDisconnectedError
+)
+
+
+def _controller(latency, **kwargs):
+    options = dict(max_in_flight=20, max_wait=10.0, parallelism=2)
+    options.update(kwargs)
+    return AdmissionController("test", service_time=lambda: latency[0], **options)
+
+
+def test_limit_follows_backend_latency():
+    latency = [None]
+    controller = _controller(latency)
+
+    assert controller.limit == 20  # Nothing measured yet
+    latency[0] = 1.0
+    assert controller.limit == 20
+    latency[0] = 4.0
+    assert controller.limit == 4  # Two rounds of two calls fit in 10s
+    latency[0] = 30.0
+    assert controller.limit == 2  # Never below what the backend runs at once
+
+
+def test_sheds_with_retry_after():
+    latency = [4.0]
+    controller = _controller(latency, max_in_flight=5)
+
+    with controller.admit(), controller.admit(), controller.admit(), controller.admit():
+        with pytest.raises(AdmissionRejectedError) as slow:
+            with controller.admit():
+                pass
+        latency[0] = 1.0
+        with controller.admit():
+            with pytest.raises(AdmissionRejectedError) as full:
+                with controller.admit():
+                    pass
+
+    assert (slow.value.status_code, slow.value.retry_after) == (503, 4)
+    assert (full.value.status_code, full.value.retry_after) == (429, 1)
+    stats = controller.stats()
+    assert stats["in_flight"] == 0
+    assert (stats["rejected_over_wait"], stats["rejected_over_capacity"]) == (1, 1)
+
+
+class _Request:
+    def __init__(self, disconnect_after):
+        self.checks = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.checks > self.disconnect_after
+
+
+def test_disconnect_cancels_work():
+    controller = _controller([None])
+    cancelled = False
+
+    async def work():
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    async def run():
+        with pytest.raises(ClientDisconnectedError):
+            await controller.run(_Request(disconnect_after=2), work, poll_interval=0.01)
+        return await controller.run(_Request(disconnect_after=100), lambda: asyncio.sleep(0, "ok"))
+
+    assert asyncio.run(run()) == "ok"
+    assert cancelled
+    assert controller.stats()["disconnected"] == 1
+    assert controller.in_flight == 0
+
+
+def test_quiz_endpoint_answers_429_when_full(monkeypatch):
+    from app.main import app
+    from app.services.quiz_generator import quiz_admission
+
+    monkeypatch.setattr(quiz_admission, "in_flight", quiz_admission.max_in_flight)
+    response = TestClient(app).post("/api/quiz", json={
+        "topic": "Photosynthesis",
+        "question_type": "Multiple Choice",
+        "num_questions": 2,
+        "difficulty": "Easy"
+    })
+
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
@@ -0,0 +1,98 @@
+import io
+import subprocess
+import tempfile
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+import app.services.audio_decode as audio_decode
+
+from app.services.audio_decode import (
+    AudioDecodeError,
+    AudioTooLongError,
+    StreamingResampler,
+    decode_audio,
+    sniff_format
+)
+
+
+def _encode(audio, rate, audio_format):
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, rate, format=audio_format)
+    # Uploads arrive as a SpooledTemporaryFile, exactly like UploadFile.file
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(buffer.getvalue())
+    spooled.seek(0)
+    return spooled
+
+
+def _sine(rate, seconds, channels=1):
+    t = np.arange(int(rate * seconds)) / rate
+    mono = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    return np.repeat(mono[:, None], channels, axis=1)
+
+
+@pytest.mark.parametrize("audio_format,tolerance", [("WAV", 1e-3), ("FLAC", 1e-3), ("OGG", 0.05)])
+def test_decodes_stereo_48k_to_mono_16k(audio_format, tolerance):
+    audio = decode_audio(_encode(_sine(48000, 2.0, channels=2), 48000, audio_format))
+
+    assert audio.dtype == np.float32
+    assert abs(len(audio) - 32000) <= 1
+    expected = 0.5 * np.sin(2 * np.pi * 440 * np.arange(len(audio)) / 16000)
+    assert np.abs(audio - expected).max() < tolerance
+
+
+def test_rejects_long_audio_from_header():
+    upload = _encode(np.zeros((16000 * 31, 1), dtype=np.float32), 16000, "WAV")
+    with pytest.raises(AudioTooLongError) as error:
+        decode_audio(upload, max_duration=30)
+    assert error.value.duration == pytest.approx(31.0)
+    assert "30 seconds" in str(error.value)
+
+
+def test_rejects_unknown_formats():
+    with pytest.raises(AudioDecodeError):
+        sniff_format(io.BytesIO(b"definitely not audio"))
+
+
+def test_resampler_is_seamless_across_blocks():
+    rate_in = 44100
+    signal = _sine(rate_in, 1.0)[:, 0]
+    whole = np.empty(16000, dtype=np.float32)
+    blocks = np.empty(16000, dtype=np.float32)
+
+    one = StreamingResampler(rate_in, whole)
+    one.write(signal)
+    many = StreamingResampler(rate_in, blocks)
+    for block in np.array_split(signal, 13):
+        many.write(block)
+
+    assert one.written == many.written
+    assert np.allclose(whole[:one.written], blocks[:many.written], atol=1e-6)
+
+
+@pytest.mark.parametrize("in_memory", [True, False])
+def test_ffmpeg_fallback_pipes_buffers_without_a_descriptor(in_memory, monkeypatch, tmp_path):
+    data = b"\x1aE\xdf\xa3" + b"\0" * 64  # webm magic
+    calls = []
+
+    def run(command, stdin=None, input=None, **kwargs):
+        calls.append((stdin, input))
+        return subprocess.CompletedProcess(command, 0, stdout=b"\0\0" * 160)
+
+    monkeypatch.setattr(audio_decode, "_pyav", lambda: None)
+    monkeypatch.setattr(audio_decode.subprocess, "run", run)
+    if in_memory:
+        upload = io.BytesIO(data)
+    else:
+        (tmp_path / "upload.webm").write_bytes(data)
+        upload = open(tmp_path / "upload.webm", "rb")
+
+    with upload:
+        assert len(decode_audio(upload)) == 160
+    stdin, piped = calls[0]
+    if in_memory:
+        assert (stdin, piped) == (None, data)
+    else:
+        assert (stdin, piped) == (upload, None)
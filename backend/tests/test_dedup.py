@@ -0,0 +1,132 @@
+import asyncio
+
+import numpy as np
+from sqlalchemy import func, select
+
+from app.database import QuestionSignature, QuestionLSHBucket
+from app.models import QuizConfig, QuestionTypeConfig, QuestionType, DifficultyLevel, QuizQuestion
+from app.services.dedup import MinHasher, QuestionDeduplicator
+from app.services.quiz_service import store_quiz_session_async
+
+ORIGINAL = "Which organelle is responsible for producing energy in the cell?"
+NEAR = "Which organelle is responsible for producing the energy in a cell?"
+OTHER = "What is the chemical symbol for gold on the periodic table?"
+
+
+def _question(i, text):
+    return QuizQuestion(id=i, question=text, correctAnswer="x", type=QuestionType.SHORT_ANSWER)
+
+
+def test_signature_similarity_tracks_text_similarity():
+    hasher = MinHasher(num_perm=128, bands=16)
+    signatures = hasher.signatures([ORIGINAL, NEAR, OTHER, ORIGINAL.upper()])
+
+    assert signatures.shape == (4, 128) and signatures.dtype == np.uint32
+    scores = hasher.similarity(signatures[0], signatures[1:])
+    assert scores[0] > 0.6
+    assert scores[1] < 0.2
+    assert scores[2] == 1.0  # Case and punctuation are normalized away
+
+
+def test_signatures_are_stable_across_instances():
+    first = MinHasher(num_perm=64, bands=16).signatures([ORIGINAL])
+    second = MinHasher(num_perm=64, bands=16).signatures([ORIGINAL])
+    assert np.array_equal(first, second)
+    keys = MinHasher(num_perm=64, bands=16).band_keys(first)
+    assert keys.shape == (1, 16) and keys.dtype == np.int64
+
+
+def _config():
+    return QuizConfig(
+        topic="Cells",
+        questionTypes=[QuestionTypeConfig(type=QuestionType.SHORT_ANSWER, count=2)],
+        difficultyLevel=DifficultyLevel.EASY,
+        totalQuestions=2
+    )
+
+
+async def _store(session_factory, dedup, texts):
+    async with session_factory() as db:
+        quiz = await store_quiz_session_async(
+            db, _config(), [_question(i, t) for i, t in enumerate(texts, start=1)]
+        )
+        await dedup.record(db, quiz.id)
+
+
+def test_drop_mode_filters_bank_and_batch_duplicates(session_factory):
+    dedup = QuestionDeduplicator(session_factory, mode="drop", threshold=0.6)
+
+    async def run():
+        await _store(session_factory, dedup, [ORIGINAL])
+        return await dedup.filter_new([
+            _question(3, NEAR),
+            _question(4, OTHER),
+            _question(5, OTHER + "  ")
+        ])
+
+    kept = asyncio.run(run())
+    assert [(q.id, q.question) for q in kept] == [(3, OTHER)]
+    assert dedup.stats()["dropped"] == 2
+
+
+def test_regenerate_mode_replaces_duplicates(session_factory):
+    dedup = QuestionDeduplicator(session_factory, mode="regenerate", threshold=0.6)
+    replacement = "Name the process plants use to turn sunlight into sugar."
+
+    async def regenerate(count):
+        assert count == 1
+        return [_question(1, replacement)]
+
+    async def run():
+        await _store(session_factory, dedup, [ORIGINAL])
+        return await dedup.filter_new([_question(1, NEAR), _question(2, OTHER)], regenerate)
+
+    kept = asyncio.run(run())
+    assert [q.question for q in kept] == [OTHER, replacement]
+    assert [q.id for q in kept] == [1, 2]
+    assert dedup.stats()["regenerated"] == 1
+
+
+def test_record_links_repeats_instead_of_indexing_them(session_factory):
+    dedup = QuestionDeduplicator(session_factory, mode="link", threshold=0.6)
+
+    async def run():
+        await _store(session_factory, dedup, [ORIGINAL, OTHER])
+        await _store(session_factory, dedup, [NEAR, OTHER])
+        async with session_factory() as db:
+            links = (await db.execute(
+                select(QuestionSignature.question_id, QuestionSignature.duplicate_of)
+                .order_by(QuestionSignature.question_id)
+            )).all()
+            buckets = await db.scalar(
+                select(func.count(func.distinct(QuestionLSHBucket.question_id)))
+            )
+        return links, buckets
+
+    links, buckets = asyncio.run(run())
+    assert links == [(1, None), (2, None), (3, 1), (4, 2)]
+    assert buckets == 2
+    assert dedup.stats()["linked"] == 2
+
+
+def test_regenerate_mode_keeps_the_count_when_replacements_repeat(session_factory):
+    dedup = QuestionDeduplicator(session_factory, mode="regenerate", threshold=0.6, regenerate_attempts=3)
+    fresh = "Name the process plants use to turn sunlight into sugar."
+    requested = []
+
+    async def regenerate(count):
+        requested.append(count)
+        # Same prompt, same answers: the first replacements are duplicates too
+        if len(requested) < 3:
+            return [_question(1, NEAR)] * count
+        return [_question(1, fresh)]
+
+    async def run():
+        await _store(session_factory, dedup, [ORIGINAL, OTHER])
+        return await dedup.filter_new([_question(4, NEAR), _question(5, OTHER)], regenerate)
+
+    kept = asyncio.run(run())
+    assert requested == [2, 2, 2]
+    assert [(q.id, q.question) for q in kept] == [(4, fresh), (5, NEAR)]
+    stats = dedup.stats()
+    assert (stats["regenerated"], stats["kept_duplicates"], stats["dropped"]) == (1, 1, 1)
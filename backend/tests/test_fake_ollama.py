@@ -0,0 +1,65 @@
+import json
+
+import httpx
+import pytest
+
+from benchmarks.fake_ollama import FakeOllama
+from benchmarks.load_test import percentile
+
+PROMPT = "Generate {count} {question_type} question(s) based on the given topic.\nTopic: volcanoes"
+
+
+@pytest.fixture
+def fake():
+    server = FakeOllama(latency=0.0, token_rate=1e6, parallel=4).start()
+    yield server
+    server.stop()
+
+
+def _questions(fake, question_type, count=3):
+    response = httpx.post(f"{fake.url}/v1/chat/completions", json={
+        "model": "llama3.1",
+        "messages": [{"role": "user", "content": PROMPT.format(count=count, question_type=question_type)}],
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["usage"]["completion_tokens"] > 0
+    return json.loads(body["choices"][0]["message"]["content"])["questions"]
+
+
+def test_multiple_choice_shape(fake):
+    questions = _questions(fake, "Multiple Choice")
+
+    assert len(questions) == 3
+    for question in questions:
+        assert "volcanoes" in question["question"]
+        assert question["answer"] in question["options"]
+        assert len(question["options"]) == 4
+    assert len({q["question"] for q in questions}) == 3
+
+
+@pytest.mark.parametrize("question_type, field, kind", [
+    ("Short Answer", "keywords", list),
+    ("True/False", "answer", bool),
+    ("Fill in the Blank", "blank_word", str),
+])
+def test_other_question_type_shapes(fake, question_type, field, kind):
+    questions = _questions(fake, question_type, count=2)
+
+    assert len(questions) == 2
+    assert all(isinstance(q[field], kind) for q in questions)
+
+
+def test_generate_endpoint_for_warmup(fake):
+    response = httpx.post(f"{fake.url}/api/generate", json={"model": "llama3.1", "keep_alive": "30m"})
+
+    assert response.json()["done"] is True
+    assert fake.requests == 1
+
+
+def test_percentile_interpolates():
+    values = [0.1 * i for i in range(1, 11)]
+
+    assert percentile(values, 50) == pytest.approx(0.55)
+    assert percentile(values, 100) == pytest.approx(1.0)
+    assert percentile([], 95) == 0.0
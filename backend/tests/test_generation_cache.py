@@ -0,0 +1,85 @@
+import time
+
+from app.models import QuestionType, DifficultyLevel, QuizQuestion
+from app.services.generation_cache import GenerationCache, make_cache_key
+
+
+def _key(topic="Python basics", model_name="mistral", **overrides):
+    params = dict(
+        topic=topic,
+        question_type=QuestionType.MULTIPLE_CHOICE,
+        num_questions=2,
+        difficulty=DifficultyLevel.MEDIUM,
+        learning_objective=None,
+        use_web_search=False,
+        model_name=model_name
+    )
+    params.update(overrides)
+    return make_cache_key(**params)
+
+
+def _questions(n=2):
+    return [
+        QuizQuestion(
+            id=i,
+            question=f"Question {i}?",
+            options=["A", "B", "C", "D"],
+            correctAnswer="A",
+            type=QuestionType.MULTIPLE_CHOICE
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def test_key_folds_case_and_whitespace():
+    assert _key("Python basics") == _key("  python   BASICS ")
+    assert _key(model_name="mistral") != _key(model_name="llama3")
+    assert _key() != _key(difficulty=DifficultyLevel.HARD)
+
+
+def test_hit_renumbers_and_counts(tmp_path):
+    cache = GenerationCache(tmp_path / "cache.db", max_entries=10, ttl=60)
+    key = _key()
+
+    assert cache.get(key) is None
+    cache.put(key, "mistral", _questions())
+    hit = cache.get(key, start_id=5)
+
+    assert [q.id for q in hit] == [5, 6]
+    assert hit[0].question == "Question 1?"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_survives_restart(tmp_path):
+    path = tmp_path / "cache.db"
+    cache = GenerationCache(path, max_entries=10, ttl=60)
+    cache.put(_key(), "mistral", _questions())
+    cache.close()
+
+    reopened = GenerationCache(path, max_entries=10, ttl=60)
+    assert reopened.get(_key()) is not None
+
+
+def test_expired_entries_miss(tmp_path):
+    cache = GenerationCache(tmp_path / "cache.db", max_entries=10, ttl=0.01)
+    cache.put(_key(), "mistral", _questions())
+    time.sleep(0.02)
+    assert cache.get(_key()) is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = GenerationCache(tmp_path / "cache.db", max_entries=2, ttl=60)
+    first, second, third = _key("a"), _key("b"), _key("c")
+    cache.put(first, "mistral", _questions())
+    time.sleep(0.01)
+    cache.put(second, "mistral", _questions())
+    time.sleep(0.01)
+    cache.get(first)
+    time.sleep(0.01)
+    cache.put(third, "mistral", _questions())
+
+    assert cache.get(second) is None
+    assert cache.get(first) is not None
+    assert cache.get(third) is not None
+    assert cache.stats()["evictions"] == 1
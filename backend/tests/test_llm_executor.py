@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.clients.llm_executor import (
+    LLMExecutor,
+    LLMPriority,
+    LLMQueueFullError,
+    LLMTimeoutError
+)
+
+
+def test_calls_run_in_parallel_up_to_limit():
+    """Blocking calls overlap up to max_concurrency and never beyond it."""
+    executor = LLMExecutor(max_concurrency=2, max_queue=4, timeout=5)
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+    # Each call waits for a partner, so they only finish if two run at once
+    pairs = threading.Barrier(2, timeout=5)
+
+    def paired_call(value):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        pairs.wait()
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        return value
+
+    async def run():
+        return await asyncio.gather(*(executor.run(paired_call, i) for i in range(4)))
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert results == [0, 1, 2, 3]
+    assert peak == 2
+
+
+def test_event_loop_stays_responsive():
+    """Other coroutines keep running while a call blocks a worker."""
+    executor = LLMExecutor(max_concurrency=1, max_queue=1, timeout=5)
+    released = threading.Event()
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(released.is_set())
+            await asyncio.sleep(0.01)
+        # Only a free event loop gets here to unblock the worker
+        released.set()
+
+    async def run():
+        return (await asyncio.gather(executor.run(released.wait, 5), ticker()))[0]
+
+    try:
+        unblocked = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert unblocked is True
+    assert ticks == [False] * 5
+
+
+def test_rejects_when_queue_full():
+    executor = LLMExecutor(max_concurrency=1, max_queue=1, timeout=5)
+
+    async def run():
+        first = asyncio.ensure_future(executor.run(time.sleep, 0.2))
+        second = asyncio.ensure_future(executor.run(time.sleep, 0.2))
+        await asyncio.sleep(0.01)
+        with pytest.raises(LLMQueueFullError):
+            await executor.run(time.sleep, 0.2)
+        await asyncio.gather(first, second)
+
+    try:
+        asyncio.run(run())
+        assert executor.stats()["rejected"] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_timeout_releases_waiting_slot():
+    executor = LLMExecutor(max_concurrency=1, max_queue=1, timeout=5)
+
+    async def run():
+        running = asyncio.ensure_future(executor.run(time.sleep, 0.3))
+        await asyncio.sleep(0.01)
+        with pytest.raises(LLMTimeoutError):
+            await executor.run(time.sleep, 0.3, timeout=0.05)
+        assert executor.stats()["waiting"] == 0
+        await running
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+
+def _run_queued(executor, calls):
+    """Hold the only slot, queue ``calls`` as (label, priority, group), then
+    release it and return the labels in the order they ran."""
+    order = []
+    gate = threading.Event()
+
+    async def run():
+        blocker = asyncio.ensure_future(executor.run(gate.wait))
+        await asyncio.sleep(0.01)
+        queued = []
+        for label, priority, group in calls:
+            queued.append(asyncio.ensure_future(
+                executor.run(order.append, label, priority=priority, group=group)
+            ))
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        gate.set()
+        await asyncio.gather(blocker, *queued)
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.shutdown()
+    return order
+
+
+def test_interactive_calls_go_first_but_batches_keep_moving():
+    executor = LLMExecutor(max_concurrency=1, max_queue=5, timeout=5, interactive_weight=2)
+    calls = [("bg", LLMPriority.BACKGROUND, None)]
+    calls += [(f"b{i}", LLMPriority.BATCH, "job") for i in range(3)]
+    calls += [(f"i{i}", LLMPriority.INTERACTIVE, None) for i in range(5)]
+
+    order = _run_queued(executor, calls)
+
+    # Nine calls wait although max_queue is 5: queued batch and background
+    # work does not count against interactive calls
+    assert order == ["i0", "i1", "b0", "i2", "i3", "b1", "i4", "b2", "bg"]
+    assert executor.stats()["rejected"] == 0
+
+
+def test_batch_groups_share_the_model_round_robin():
+    executor = LLMExecutor(max_concurrency=1, max_queue=8, timeout=5)
+    calls = [(f"a{i}", LLMPriority.BATCH, "a") for i in range(3)]
+    calls += [(f"b{i}", LLMPriority.BATCH, "b") for i in range(2)]
+
+    assert _run_queued(executor, calls) == ["a0", "b0", "a1", "b1", "a2"]
@@ -0,0 +1,81 @@
+import json
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.logger import (
+    JsonFormatter,
+    RateLimitFilter,
+    RequestIdMiddleware,
+    build_pipeline,
+    request_id_var
+)
+
+
+def _record(msg="hello %s", args=("world",), level=logging.INFO, lineno=10, **extra):
+    record = logging.LogRecord("app.test", level, "test.py", lineno, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_request_id_and_extra_fields():
+    entry = json.loads(JsonFormatter().format(_record(request_id="abc123", chars=42)))
+
+    assert entry["msg"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["request_id"] == "abc123"
+    assert entry["chars"] == 42
+    assert "args" not in entry
+
+
+def test_rate_limit_is_per_call_site_and_spares_warnings():
+    limiter = RateLimitFilter(rate=2)
+
+    passed = [limiter.filter(_record(lineno=1)) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert limiter.filter(_record(lineno=2))  # Another call site has its own budget
+    assert limiter.filter(_record(lineno=1, level=logging.WARNING))
+    assert limiter.suppressed == 3
+
+
+def test_pipeline_writes_json_lines_off_thread(tmp_path):
+    handler, listener = build_pipeline(tmp_path / "app.log", stream=open("/dev/null", "w"))
+    logger = logging.getLogger("test.pipeline")
+    logger.propagate = False
+    logger.addHandler(handler)
+    listener.start()
+    token = request_id_var.set("req-1")
+    try:
+        logger.info("Generated %d questions", 5, extra={"questions": 5})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Failed")
+    finally:
+        request_id_var.reset(token)
+        listener.stop()
+        logger.removeHandler(handler)
+
+    lines = [json.loads(line) for line in (tmp_path / "app.log").read_text().splitlines()]
+    assert lines[0]["msg"] == "Generated 5 questions"
+    assert lines[0]["questions"] == 5
+    assert {line["request_id"] for line in lines} == {"req-1"}
+    assert "ValueError: boom" in lines[1]["exc"]
+
+
+def test_middleware_sets_and_echoes_request_id():
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/whoami")
+    async def whoami():
+        return {"request_id": request_id_var.get()}
+
+    client = TestClient(app)
+    response = client.get("/whoami", headers={"X-Request-ID": "client-id"})
+    assert response.json() == {"request_id": "client-id"}
+    assert response.headers["x-request-id"] == "client-id"
+
+    generated = client.get("/whoami")
+    assert generated.json()["request_id"] == generated.headers["x-request-id"] != "client-id"
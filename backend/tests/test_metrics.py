@@ -0,0 +1,55 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import MetricsMiddleware, MetricsRegistry, REGISTRY
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry(namespace="test")
+    histogram = registry.histogram("stage_seconds", "Stage time", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.labels("parse").observe(value)
+
+    text = registry.render()
+
+    assert "# TYPE test_stage_seconds histogram" in text
+    assert 'test_stage_seconds_bucket{stage="parse",le="0.1"} 1' in text
+    assert 'test_stage_seconds_bucket{stage="parse",le="1"} 3' in text
+    assert 'test_stage_seconds_bucket{stage="parse",le="+Inf"} 4' in text
+    assert 'test_stage_seconds_count{stage="parse"} 4' in text
+    assert 'test_stage_seconds_sum{stage="parse"} 6.05' in text
+
+
+def test_counters_gauges_and_collectors():
+    registry = MetricsRegistry()
+    errors = registry.counter("errors", "Errors", ["stage"])
+    errors.labels("llm").inc()
+    errors.labels("llm").inc(2)
+    depth = registry.gauge("queue_depth", "Depth")
+    depth.set_function(lambda: 7)
+    registry.register_collector(lambda: [("hits", "counter", "Hits", [({"cache": 'a"b'}, 3)])])
+
+    text = registry.render()
+
+    assert 'errors_total{stage="llm"} 3' in text
+    assert "queue_depth 7" in text
+    assert 'hits_total{cache="a\\"b"} 3' in text
+
+
+def test_middleware_labels_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    for item_id in (1, 2, 3):
+        assert client.get(f"/items/{item_id}").status_code == 200
+    client.get("/missing")
+
+    text = REGISTRY.render()
+    assert 'cusa_http_requests_total{method="GET",route="/items/{item_id}",status="200"} 3' in text
+    assert 'route="unmatched",status="404"' in text
+    assert "cusa_http_requests_in_flight 0" in text
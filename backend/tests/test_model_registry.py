@@ -0,0 +1,93 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.clients.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = ModelRegistry(
+        default_model="small",
+        base_url="http://127.0.0.1:9",
+        max_models=1,
+        keep_alive="5m",
+        warmup_timeout=1
+    )
+    registry.built = []
+    registry.unloaded = []
+    registry.release_build = threading.Event()
+    registry.release_build.set()
+
+    def build(model_name):
+        registry.release_build.wait(5)
+        registry.built.append(model_name)
+        return f"client-{model_name}"
+
+    async def warm(model_name):
+        return 0.0
+
+    async def unload(model_name):
+        registry.unloaded.append(model_name)
+
+    monkeypatch.setattr(registry, "_build", build)
+    monkeypatch.setattr(registry, "warm", warm)
+    monkeypatch.setattr(registry, "_unload", unload)
+    return registry
+
+
+def test_concurrent_requests_share_one_build_off_the_loop(registry):
+    registry.release_build.clear()
+
+    async def request():
+        async with registry.use() as (model_name, client):
+            return model_name, client
+
+    async def run():
+        requests = [asyncio.ensure_future(request()) for _ in range(3)]
+        # The build blocks its worker thread; the loop keeps serving
+        await asyncio.sleep(0)
+        loop_free = all(not task.done() for task in requests)
+        registry.release_build.set()
+        return loop_free, await asyncio.gather(*requests)
+
+    loop_free, results = asyncio.run(run())
+
+    assert loop_free
+    assert results == [("small", "client-small")] * 3
+    assert registry.built == ["small"]
+    assert registry.stats()["in_use"] == {}
+
+
+def test_models_in_use_are_unloaded_only_after_release(registry):
+    async def run():
+        async with registry.use() as (old, _):
+            await registry.switch("large")
+            # Over max_models, but a request still holds the old model
+            during = (registry.stats()["loaded"], list(registry.unloaded))
+        await asyncio.sleep(0)  # Let the deferred unload run
+        return old, during
+
+    old, (loaded_during, unloaded_during) = asyncio.run(run())
+
+    assert old == "small"
+    assert loaded_during == ["small", "large"] and unloaded_during == []
+    stats = registry.stats()
+    assert stats["current"] == "large"
+    assert stats["loaded"] == ["large"]
+    assert stats["evictions"] == 1
+    assert registry.unloaded == ["small"]
+
+
+def test_idle_models_are_evicted_on_switch(registry):
+    async def run():
+        async with registry.use():
+            pass
+        await registry.switch("large")
+        async with registry.use() as (model_name, client):
+            return model_name, client
+
+    assert asyncio.run(run()) == ("large", "client-large")
+    assert registry.unloaded == ["small"]
+    assert registry.stats()["loaded"] == ["large"]
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.models import QuestionType, DifficultyLevel
+from app.services import question_pool as question_pool_module
+from app.services.question_pool import QuestionPool
+
+TF = QuestionType.TRUE_FALSE
+EASY = DifficultyLevel.EASY
+
+
+@pytest.fixture
+def pool(session_factory, fake_generate_questions, monkeypatch):
+    monkeypatch.setattr(question_pool_module, "generate_questions", fake_generate_questions)
+    monkeypatch.setattr(question_pool_module, "current_model_name", lambda: "test-model")
+    return QuestionPool(session_factory=session_factory, target_size=8, batch_size=4)
+
+
+def test_top_up_refills_to_target(pool):
+    async def fill():
+        pool.request_top_up("Volcanoes", TF, EASY)
+        filled = [await pool.fill_once() for _ in range(3)]
+        return filled, await pool.stats()
+
+    filled, stats = asyncio.run(fill())
+
+    # Two batches of four reach the target; the third pass has nothing to do
+    assert filled == [True, True, False]
+    assert stats["pooled_questions"] == 8
+    assert stats["generated"] == 8
+
+
+def test_draw_serves_oldest_questions_once(pool):
+    async def draw():
+        pool.request_top_up("Volcanoes", TF, EASY)
+        await pool.fill_once()
+        first = await pool.draw(" volcanoes", TF, EASY, count=3, start_id=5)
+        second = await pool.draw("Volcanoes", TF, EASY, count=3, start_id=1)
+        other = await pool.draw("Volcanoes", TF, DifficultyLevel.HARD, count=3, start_id=1)
+        return first, second, other, await pool.stats()
+
+    first, second, other, stats = asyncio.run(draw())
+
+    assert [(q.id, q.question) for q in first] == [(5, "Q0"), (6, "Q1"), (7, "Q2")]
+    assert [q.question for q in second] == ["Q3"]
+    assert other == []
+    assert stats["pooled_questions"] == 0
+    assert stats["served"] == 4
+
+
+def test_concurrent_draws_never_share_questions(pool):
+    async def draw():
+        pool.request_top_up("Volcanoes", TF, EASY)
+        await pool.fill_once()
+        await pool.fill_once()
+        return await asyncio.gather(*(
+            pool.draw("Volcanoes", TF, EASY, count=3, start_id=1) for _ in range(4)
+        ))
+
+    draws = asyncio.run(draw())
+
+    served = [q.question for questions in draws for q in questions]
+    assert len(served) == 8
+    assert len(set(served)) == 8
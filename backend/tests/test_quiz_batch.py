@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from app.models import QuizConfig, QuestionTypeConfig, QuestionType, DifficultyLevel, QuizQuestion
+from app.services import quiz_batch
+from app.services.quiz_batch import BatchJob, QuizBatchRunner, plan_batch
+from app.core.logger import request_id_var
+from app.services.quiz_service import get_quiz_session_async
+
+
+def _config(topic, *types):
+    return QuizConfig(
+        topic=topic,
+        questionTypes=[QuestionTypeConfig(type=t, count=c) for t, c in types],
+        difficultyLevel=DifficultyLevel.EASY,
+        totalQuestions=sum(c for _, c in types)
+    )
+
+
+def _questions(topic, qt):
+    return [
+        QuizQuestion(
+            id=i,
+            question=f"{topic} {qt.type.value} question {i}?",
+            correctAnswer="True",
+            type=qt.type
+        )
+        for i in range(1, qt.count + 1)
+    ]
+
+
+def test_plan_merges_shared_question_types():
+    configs = [
+        _config("Photosynthesis", (QuestionType.MULTIPLE_CHOICE, 2), (QuestionType.TRUE_FALSE, 1)),
+        _config("  photosynthesis ", (QuestionType.MULTIPLE_CHOICE, 4)),
+        _config("Mitosis", (QuestionType.MULTIPLE_CHOICE, 2)),
+    ]
+
+    units, assignments = plan_batch(configs)
+
+    assert [(u.config.topic, u.qt.type, u.qt.count) for u in units] == [
+        ("Photosynthesis", QuestionType.MULTIPLE_CHOICE, 4),
+        ("Photosynthesis", QuestionType.TRUE_FALSE, 1),
+        ("Mitosis", QuestionType.MULTIPLE_CHOICE, 2),
+    ]
+    assert assignments == [[(0, 2), (1, 1)], [(0, 4)], [(2, 2)]]
+
+
+def test_assemble_takes_each_quiz_share_and_renumbers():
+    job = BatchJob([
+        _config("Photosynthesis", (QuestionType.MULTIPLE_CHOICE, 2), (QuestionType.TRUE_FALSE, 1)),
+        _config("Photosynthesis", (QuestionType.MULTIPLE_CHOICE, 3)),
+    ])
+    for unit in job.units:
+        unit.questions = _questions(unit.config.topic, unit.qt)
+
+    first = job.assemble(0)
+    assert [q.id for q in first] == [1, 2, 3]
+    assert [q.type for q in first] == [
+        QuestionType.MULTIPLE_CHOICE, QuestionType.MULTIPLE_CHOICE, QuestionType.TRUE_FALSE
+    ]
+    assert len(job.assemble(1)) == 3
+
+
+def test_runner_stores_ready_quizzes_together(session_factory, monkeypatch):
+    calls = []
+
+    async def fake_generate(config, qt, start_id, priority, group):
+        calls.append((config.topic, qt.type, qt.count, priority))
+        if config.topic == "Broken":
+            raise RuntimeError("model unavailable")
+        return _questions(config.topic, qt)
+
+    monkeypatch.setattr(quiz_batch, "generate_question_set", fake_generate)
+    monkeypatch.setattr(quiz_batch.settings, "DEDUP_ENABLED", False)
+
+    async def run():
+        runner = QuizBatchRunner(session_factory=session_factory, concurrency=2, max_jobs=10)
+        job = runner.submit([
+            _config("Photosynthesis", (QuestionType.MULTIPLE_CHOICE, 2)),
+            _config("Photosynthesis", (QuestionType.MULTIPLE_CHOICE, 3)),
+            _config("Broken", (QuestionType.TRUE_FALSE, 1)),
+        ])
+        await job.task
+        async with session_factory() as db:
+            stored = [await get_quiz_session_async(db, i) for i in job.quiz_ids if i]
+        return job, runner.stats(), stored
+
+    job, stats, stored = asyncio.run(run())
+
+    assert len(calls) == 2
+    assert all(priority == quiz_batch.LLMPriority.BATCH for *_, priority in calls)
+    state = job.to_dict()
+    assert state["status"] == "completed"
+    assert state["progress"] == 1.0
+    assert [q["status"] for q in state["quizzes"]] == ["stored", "stored", "failed"]
+    assert state["quizzes"][2]["error"] == "model unavailable"
+    assert [len(quiz.questions) for quiz in stored] == [2, 3]
+    assert stats["calls_saved"] == 1
+
+
+def test_job_runs_outside_the_submitting_request_context(monkeypatch):
+    seen = []
+
+    async def fake_generate(config, qt, start_id, priority, group):
+        seen.append(request_id_var.get())
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(quiz_batch, "generate_question_set", fake_generate)
+
+    async def run():
+        request_id_var.set("post-request")
+        runner = QuizBatchRunner(concurrency=1, max_jobs=10)
+        job = runner.submit([_config("Broken", (QuestionType.TRUE_FALSE, 1))])
+        await job.task
+        return job
+
+    job = asyncio.run(run())
+    assert seen == [f"batch-{job.id}"]
+
+
+
+
+def test_queue_full_retries_give_up_after_the_wait_limit(monkeypatch):
+    attempts = []
+
+    async def overloaded(config, qt, start_id, priority, group):
+        attempts.append(qt.type)
+        raise quiz_batch.LLMQueueFullError("LLM queue is full")
+
+    monkeypatch.setattr(quiz_batch, "generate_question_set", overloaded)
+    monkeypatch.setattr(quiz_batch, "_QUEUE_FULL_RETRY_SECONDS", 0.01)
+
+    async def run():
+        runner = QuizBatchRunner(concurrency=1, max_jobs=10, queue_wait_max=0.025)
+        job = runner.submit([_config("Busy", (QuestionType.TRUE_FALSE, 1))])
+        await asyncio.wait_for(job.task, 5)
+        return job
+
+    job = asyncio.run(run())
+    assert len(attempts) == 3
+    state = job.to_dict()
+    assert (state["status"], state["failed_calls"]) == ("failed", 1)
+    assert state["quizzes"][0]["error"] == "LLM queue is full"
+def test_quiz_needs_a_question_type():
+    with pytest.raises(ValidationError):
+        _config("Empty")
+    empty = BatchJob([QuizConfig.model_construct(topic="Empty", questionTypes=[])])
+    assert empty.to_dict()["progress"] == 1.0
@@ -0,0 +1,191 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database.database import _set_sqlite_pragmas
+from app.models import QuizConfig, QuestionTypeConfig, QuestionType, DifficultyLevel, QuizQuestion
+from app.services.quiz_service import (
+    store_quiz_session,
+    store_quiz_session_async,
+    get_quiz_session,
+    get_quiz_session_async,
+    get_quiz_document_async,
+    get_quiz_history_async
+)
+
+
+def _config(topic="Photosynthesis"):
+    return QuizConfig(
+        topic=topic,
+        questionTypes=[QuestionTypeConfig(type=QuestionType.MULTIPLE_CHOICE, count=2)],
+        difficultyLevel=DifficultyLevel.EASY,
+        totalQuestions=2
+    )
+
+
+def _questions():
+    return [
+        QuizQuestion(
+            id=1,
+            question="What gas do plants absorb?",
+            options=["CO2", "O2", "N2", "H2"],
+            correctAnswer="CO2",
+            type=QuestionType.MULTIPLE_CHOICE
+        ),
+        QuizQuestion(
+            id=2,
+            question="Where does photosynthesis happen?",
+            options=["Chloroplast", "Nucleus", "Ribosome", "Vacuole"],
+            correctAnswer="Chloroplast",
+            type=QuestionType.MULTIPLE_CHOICE
+        )
+    ]
+
+
+def test_sync_store_bulk_inserts_questions(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    db = sessionmaker(bind=engine)()
+    try:
+        quiz = store_quiz_session(db, _config(), _questions())
+        loaded = get_quiz_session(db, quiz.id)
+        assert [q.question_text for q in loaded.questions] == [
+            "What gas do plants absorb?",
+            "Where does photosynthesis happen?"
+        ]
+        assert db.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def test_async_store_and_read(session_factory):
+    async def run():
+        async with session_factory() as db:
+            first = await store_quiz_session_async(db, _config("First"), _questions())
+            second = await store_quiz_session_async(db, _config("Second"), _questions())
+        async with session_factory() as db:
+            loaded = await get_quiz_session_async(db, first.id)
+            history, _ = await get_quiz_history_async(db, limit=10)
+            synchronous = (await db.execute(text("PRAGMA synchronous"))).scalar()
+        return first, second, loaded, history, synchronous
+
+    first, second, loaded, history, synchronous = asyncio.run(run())
+    assert len(loaded.questions) == 2
+    assert loaded.questions[0].options == '["CO2", "O2", "N2", "H2"]'
+    assert [quiz["id"] for quiz in history] == [second.id, first.id]
+    assert synchronous == 1  # NORMAL
+
+
+def test_history_keyset_pages_cover_every_session_once(session_factory):
+    async def run():
+        async with session_factory() as db:
+            for i in range(7):
+                await store_quiz_session_async(db, _config(f"Topic {i % 2}"), _questions())
+            # Give several rows the same timestamp to exercise the id tie-break
+            await db.execute(text("UPDATE quiz_sessions SET created_at = '2024-01-01 00:00:00.000000' WHERE id <= 4"))
+            await db.commit()
+
+        seen, cursor = [], None
+        async with session_factory() as db:
+            while True:
+                items, cursor = await get_quiz_history_async(db, limit=3, cursor=cursor)
+                seen.extend(item["id"] for item in items)
+                if cursor is None:
+                    break
+            filtered, _ = await get_quiz_history_async(
+                db, topic="topic 1", include_counts=True, include_questions=True
+            )
+        return seen, filtered
+
+    seen, filtered = asyncio.run(run())
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+    assert [item["id"] for item in filtered] == [6, 4, 2]
+    assert all(item["question_count"] == 2 for item in filtered)
+    assert filtered[0]["questions"][0]["question_text"] == "What gas do plants absorb?"
+
+
+def test_history_queries_use_indexes(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    try:
+        with engine.connect() as conn:
+            plan = " ".join(row[-1] for row in conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT id, topic, difficulty_level, learning_objective,"
+                " total_questions, created_at FROM quiz_sessions"
+                " WHERE (created_at, id) < ('2024-01-01', 10)"
+                " ORDER BY created_at DESC, id DESC LIMIT 11"
+            )))
+            assert "COVERING INDEX ix_quiz_sessions_history" in plan
+            assert "TEMP B-TREE" not in plan
+
+            plan = " ".join(row[-1] for row in conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT id FROM quiz_sessions WHERE lower(topic) = 'x'"
+                " ORDER BY created_at DESC, id DESC LIMIT 11"
+            )))
+            assert "ix_quiz_sessions_topic_history" in plan
+            assert "TEMP B-TREE" not in plan
+    finally:
+        engine.dispose()
+
+
+def test_invalid_cursor_is_rejected():
+    from app.services.quiz_service import decode_history_cursor, encode_history_cursor
+    from datetime import datetime
+
+    when = datetime(2024, 5, 1, 12, 30)
+    assert decode_history_cursor(encode_history_cursor(when, 42)) == (when, 42)
+    with pytest.raises(ValueError):
+        decode_history_cursor("not-a-cursor")
+
+
+def test_quiz_document_matches_orm_response(session_factory):
+    from fastapi.encoders import jsonable_encoder
+
+    async def run():
+        async with session_factory() as db:
+            stored = await store_quiz_session_async(db, _config(), _questions())
+            legacy = await store_quiz_session_async(db, _config("Legacy"), _questions())
+            # As if stored before documents existed
+            await db.execute(text("DELETE FROM quiz_documents WHERE quiz_session_id = :id"),
+                             {"id": legacy.id})
+            await db.commit()
+        async with session_factory() as db:
+            orm = jsonable_encoder(await get_quiz_session_async(db, stored.id))
+            document = await get_quiz_document_async(db, stored.id)
+            backfilled = await get_quiz_document_async(db, legacy.id)
+            missing = await get_quiz_document_async(db, 999)
+            saved = (await db.execute(text("SELECT COUNT(*) FROM quiz_documents"))).scalar()
+        return orm, document, backfilled, missing, saved
+
+    orm, (body, etag), backfilled, missing, saved = asyncio.run(run())
+    assert json.loads(body) == orm
+    assert json.loads(body)["questions"][0]["options"] == '["CO2", "O2", "N2", "H2"]'
+    assert etag.startswith('"') and etag.endswith('"')
+    assert json.loads(backfilled[0])["topic"] == "Legacy"
+    assert missing is None
+    assert saved == 2
+
+
+def test_read_quiz_revalidates_with_etag(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services.quiz_document_cache import QuizDocumentCache
+    import app.main as main
+
+    cache = QuizDocumentCache(max_bytes=1024)
+    cache.put(7, (b'{"id":7}', '"abc"'))
+    monkeypatch.setattr(main, "quiz_document_cache", cache)
+    client = TestClient(app)
+
+    response = client.get("/api/quiz/7")
+    assert response.json() == {"id": 7}
+    assert response.headers["etag"] == '"abc"'
+    assert "immutable" in response.headers["cache-control"]
+
+    revalidated = client.get("/api/quiz/7", headers={"If-None-Match": 'W/"abc", "other"'})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert cache.stats()["hits"] == 2
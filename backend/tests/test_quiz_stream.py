@@ -0,0 +1,95 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.models import QuizQuestion
+from app.services import quiz_generator
+from app.services.generation_cache import GenerationCache
+from app.services.quiz_document_cache import QuizDocumentCache
+
+REQUEST = {"topic": "Volcanoes", "question_type": "Short Answer", "num_questions": 5}
+
+
+@pytest.fixture
+def client(tmp_path, session_factory, fake_generate_questions, monkeypatch):
+    monkeypatch.setattr(quiz_generator, "generate_questions", fake_generate_questions)
+    monkeypatch.setattr(quiz_generator, "generation_cache", GenerationCache(
+        tmp_path / "generation_cache.db", max_entries=100, ttl=3600
+    ))
+    monkeypatch.setattr(quiz_generator.settings, "POOL_ENABLED", False)
+    monkeypatch.setattr(quiz_generator.settings, "DEDUP_ENABLED", False)
+    monkeypatch.setattr(quiz_generator.settings, "QUIZ_STREAM_CHUNK_SIZE", 2)
+
+    monkeypatch.setattr(main, "AsyncSessionLocal", session_factory)
+    # Quiz ids restart in every test database
+    monkeypatch.setattr(main, "quiz_document_cache", QuizDocumentCache(max_bytes=1024 * 1024))
+    test_client = TestClient(main.app)
+    test_client.calls = fake_generate_questions.calls
+    yield test_client
+    quiz_generator.generation_cache.close()
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_stream_generates_chunks_and_stores_the_quiz(client):
+    response = client.post("/api/quiz/stream", json=REQUEST)
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = _ndjson(response)
+    assert sorted(client.calls) == [1, 2, 2]
+    questions = [e["question"] for e in events if e["event"] == "question"]
+    assert sorted(q["id"] for q in questions) == [1, 2, 3, 4, 5]
+    assert events[-1]["event"] == "done" and events[-1]["total"] == 5
+
+    stored = client.get(f"/api/quiz/{events[-1]['quiz_id']}").json()
+    assert [q["id"] for q in stored["questions"]] == [1, 2, 3, 4, 5]
+
+
+def test_cached_stream_keeps_every_chunk(client):
+    first = _ndjson(client.post("/api/quiz/stream", json=REQUEST))
+    second = _ndjson(client.post("/api/quiz/stream", json=REQUEST))
+
+    def texts(events):
+        return sorted(e["question"]["question"] for e in events if e["event"] == "question")
+
+    # Chunks of the same size must not share a cache entry
+    assert len(client.calls) == 3
+    assert len(set(texts(second))) == 5
+    assert texts(second) == texts(first)
+
+
+def test_stream_speaks_sse_when_asked(client):
+    response = client.post(
+        "/api/quiz/stream", json=REQUEST, headers={"Accept": "text/event-stream"}
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [frame for frame in response.text.split("\n\n") if frame]
+    assert len(frames) == 6
+    assert frames[0].startswith("event: question\ndata: ")
+    assert frames[-1].startswith("event: done\ndata: ")
+    assert json.loads(frames[-1].split("data: ", 1)[1])["total"] == 5
+
+
+def test_short_chunks_leave_no_id_gaps(client, monkeypatch):
+    async def short_set(config, qt, start_id, offset=0, **kwargs):
+        # As in dedup drop mode: the first chunk of each type loses a question
+        count = qt.count - 1 if offset == 0 else qt.count
+        return [
+            QuizQuestion(id=start_id + i, question=f"{qt.type.value} {offset + i}",
+                         correctAnswer="A", type=qt.type)
+            for i in range(count)
+        ]
+
+    monkeypatch.setattr(quiz_generator, "generate_question_set", short_set)
+
+    events = _ndjson(client.post("/api/quiz/stream", json=REQUEST))
+    ids = [e["question"]["id"] for e in events if e["event"] == "question"]
+    assert ids == [1, 2, 3, 4]
+    stored = client.get(f"/api/quiz/{events[-1]['quiz_id']}").json()
+    assert stored["total_questions"] == 4
+    assert [q["id"] for q in stored["questions"]] == [1, 2, 3, 4]
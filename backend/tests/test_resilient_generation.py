@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from app.clients.educhain_client import validate_question
+from app.clients.llm_executor import LLMQueueFullError
+from app.models import QuestionType, QuizQuestion
+from app.services.resilient_generation import GenerationShortfallError, ResilientGenerator
+
+
+def _generator(**kwargs):
+    options = dict(attempts=3, backoff=0.001, backoff_max=0.01, hedge_after=0, has_capacity=lambda: True)
+    options.update(kwargs)
+    return ResilientGenerator(**options)
+
+
+def _questions(count, label="q"):
+    return [
+        QuizQuestion(id=1, question=f"{label} {i}?", correctAnswer="True", type=QuestionType.TRUE_FALSE)
+        for i in range(count)
+    ]
+
+
+def test_retries_only_the_missing_questions():
+    requested = []
+
+    async def call(count):
+        requested.append(count)
+        if len(requested) == 1:
+            raise RuntimeError("unparseable response")
+        if len(requested) == 2:
+            return _questions(count - 2, "first")  # Two failed validation
+        return _questions(count, "second")
+
+    generator = _generator()
+    questions = asyncio.run(generator.generate(call, 5, start_id=4))
+
+    assert requested == [5, 5, 2]
+    assert [q.id for q in questions] == [4, 5, 6, 7, 8]
+    assert [q.question for q in questions[-2:]] == ["second 0?", "second 1?"]
+    assert generator.stats()["retries"] == 2
+
+
+def test_gives_up_after_attempts_and_does_not_retry_overload():
+    async def short(count):
+        return _questions(count - 1)
+
+    generator = _generator()
+    with pytest.raises(GenerationShortfallError, match="Generated 2 of 3"):
+        asyncio.run(generator.generate(short, 3, start_id=1))
+    assert generator.failures == 1
+
+    calls = []
+
+    async def overloaded(count):
+        calls.append(count)
+        raise LLMQueueFullError("queue full")
+
+    with pytest.raises(LLMQueueFullError):
+        asyncio.run(generator.generate(overloaded, 3, start_id=1))
+    assert calls == [3]
+
+
+def test_hedged_call_takes_the_faster_duplicate():
+    delays = [1.0, 0.01]
+    cancelled = []
+
+    async def call(count):
+        delay = delays.pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return _questions(count, f"after {delay}")
+
+    generator = _generator(hedge_after=0.02)
+    questions = asyncio.run(generator.generate(call, 2, start_id=1, hedge=True))
+
+    assert questions[0].question == "after 0.01 0?"
+    assert cancelled == [1.0]
+    assert (generator.hedges, generator.hedge_wins) == (1, 1)
+
+    # No duplicate when the executor has no idle worker for it
+    delays[:] = [0.05, 0.01]
+    busy = _generator(hedge_after=0.01, has_capacity=lambda: False)
+    questions = asyncio.run(busy.generate(call, 2, start_id=1, hedge=True))
+    assert questions[0].question == "after 0.05 0?"
+    assert busy.hedges == 0
+
+
+def test_validate_question_fixes_or_rejects():
+    def mc(options, answer):
+        return QuizQuestion(
+            id=1, question=" Which? ", options=options, correctAnswer=answer,
+            type=QuestionType.MULTIPLE_CHOICE
+        )
+
+    fixed = validate_question(mc(["Red", "Blue", "Green"], "b"))
+    assert (fixed.question, fixed.correctAnswer) == ("Which?", "Blue")
+    assert validate_question(mc(["Red", "Blue"], "Purple")) is None
+    assert validate_question(mc(["Red", "Red"], "Red")) is None
+    assert validate_question(mc(["Red"], "Red")) is None
+
+    tf = QuizQuestion(id=1, question="Sky is blue?", correctAnswer="true", type=QuestionType.TRUE_FALSE)
+    assert validate_question(tf).correctAnswer == "True"
+    assert validate_question(tf.model_copy(update={"correctAnswer": "maybe"})) is None
+
+
+def test_cancelling_the_caller_cancels_hedged_calls():
+    started = []
+    cancelled = []
+
+    async def call(count):
+        started.append(count)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(count)
+            raise
+        return _questions(count)
+
+    async def run(delay):
+        generator = _generator(hedge_after=0.05)
+        caller = asyncio.ensure_future(generator.generate(call, 2, start_id=1, hedge=True))
+        await asyncio.sleep(delay)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+        # Checked before asyncio.run tears down whatever is left on the loop
+        return len(started), len(cancelled)
+
+    # Client gone before the hedge threshold, then after the duplicate started
+    assert asyncio.run(run(0.01)) == (1, 1)
+    started.clear(), cancelled.clear()
+    assert asyncio.run(run(0.1)) == (2, 2)
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import QuizConfig, QuestionTypeConfig, QuestionType, DifficultyLevel, QuizQuestion
+from app.services.quiz_service import store_quiz_session
+from app.services.search_service import build_match_query, search_questions
+
+
+def _store(db, topic, difficulty, questions):
+    config = QuizConfig(
+        topic=topic,
+        questionTypes=[QuestionTypeConfig(type=questions[0][2], count=len(questions))],
+        difficultyLevel=difficulty,
+        totalQuestions=len(questions)
+    )
+    store_quiz_session(db, config, [
+        QuizQuestion(id=i, question=text, correctAnswer=answer, type=qtype)
+        for i, (text, answer, qtype) in enumerate(questions, start=1)
+    ])
+
+
+@pytest.fixture
+def search_db(db_path, session_factory):
+    engine = create_engine(f"sqlite:///{db_path}")
+    db = sessionmaker(bind=engine)()
+    _store(db, "Photosynthesis", DifficultyLevel.EASY, [
+        ("Which pigment absorbs light in plants?", "Chlorophyll", QuestionType.SHORT_ANSWER),
+        ("Plants release oxygen during photosynthesis.", "True", QuestionType.TRUE_FALSE),
+    ])
+    _store(db, "Cell biology", DifficultyLevel.HARD, [
+        ("Which organelle holds chlorophyll?", "Chloroplast", QuestionType.SHORT_ANSWER),
+    ])
+    db.close()
+    engine.dispose()
+    return session_factory
+
+
+def _search(session_factory, query, **filters):
+    async def run():
+        async with session_factory() as db:
+            return await search_questions(db, query, **filters)
+    return asyncio.run(run())
+
+
+def test_match_query_quotes_tokens_and_prefixes_last():
+    assert build_match_query('chloro* OR "x') == '"chloro" "OR" "x"*'
+    assert build_match_query("  ?! ") is None
+
+
+def test_ranked_search_over_text_answer_and_topic(search_db):
+    # A hit in the question text outranks a hit in the answer
+    items, next_offset = _search(search_db, "chlorophyll")
+    assert [item["correct_answer"] for item in items] == ["Chloroplast", "Chlorophyll"]
+    assert next_offset is None
+
+    items, _ = _search(search_db, "photosynth")
+    assert {item["topic"] for item in items} == {"Photosynthesis"}
+    assert len(items) == 2
+
+
+def test_filters_and_pagination(search_db):
+    items, _ = _search(search_db, "chlorophyll", difficulty=DifficultyLevel.HARD)
+    assert [item["topic"] for item in items] == ["Cell biology"]
+
+    items, _ = _search(search_db, "photosynthesis", question_type=QuestionType.TRUE_FALSE)
+    assert [item["question_type"] for item in items] == [QuestionType.TRUE_FALSE]
+
+    items, next_offset = _search(search_db, "chlorophyll", limit=1)
+    assert len(items) == 1 and next_offset == 1
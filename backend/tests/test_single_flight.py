@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = 0
+
+    async def work():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.05)
+        return ["q1", "q2"]
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert executions == 1
+    assert all(result == ["q1", "q2"] for result in results)
+    stats = flight.stats()
+    assert stats["executions"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["max_fan_in"] == 5
+    assert stats["in_flight"] == 0
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+
+    async def work(value):
+        await asyncio.sleep(0.01)
+        return value
+
+    async def run():
+        return await asyncio.gather(
+            flight.do("a", lambda: work("a")),
+            flight.do("b", lambda: work("b"))
+        )
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert flight.stats()["executions"] == 2
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("bad output")
+
+    async def run():
+        return await asyncio.gather(
+            flight.do("key", failing),
+            flight.do("key", failing),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("key", work))
+        follower = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_work_is_cancelled_once_every_caller_is_gone():
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def run():
+        callers = [asyncio.ensure_future(flight.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        callers[0].cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled.is_set()  # The other caller still wants it
+        callers[1].cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.gather(*callers, return_exceptions=True)
+
+    asyncio.run(run())
+    assert flight.stats()["abandoned"] == 1
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.routers import speech as speech_router
+from app.services.speech_service import SpeechService, quantize_for_cpu
+
+
+def test_quantized_linear_layers_stay_close_to_fp32():
+    torch = pytest.importorskip("torch")
+
+    class CastingLinear(torch.nn.Linear):
+        # Like Whisper's Linear: a subclass dynamic quantization would skip
+        def forward(self, x):
+            return torch.nn.functional.linear(x, self.weight.to(x.dtype), self.bias)
+
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(CastingLinear(64, 128), torch.nn.GELU(), torch.nn.Linear(128, 32))
+    inputs = torch.randn(16, 64)
+    with torch.no_grad():
+        expected = model(inputs)
+        quantized = quantize_for_cpu(model)
+        actual = quantized(inputs)
+
+    assert all(
+        "quantized" in type(module).__module__
+        for module in quantized.modules() if "Linear" in type(module).__name__
+    )
+    error = (actual - expected).norm() / expected.norm()
+    assert error < 0.05
+
+
+@pytest.fixture
+def slow_service(monkeypatch):
+    service = SpeechService(workers=0)
+    service.loads = 0
+    service.release_load = threading.Event()
+    service.loading = threading.Event()
+
+    def load_model():
+        service.loading.set()
+        service.release_load.wait(5)
+        service.loads += 1
+        return object()
+
+    monkeypatch.setattr(service, "_load_model", load_model)
+    monkeypatch.setattr(speech_router, "_speech_service", service)
+    yield service
+    service.release_load.set()
+
+
+def test_preload_does_not_block_startup_and_loads_once(slow_service, monkeypatch):
+    monkeypatch.setenv("WHISPER_PRELOAD", "true")
+    monkeypatch.setenv("MODEL_WARM_ON_STARTUP", "false")
+    monkeypatch.setenv("POOL_ENABLED", "false")
+
+    with TestClient(main.app) as client:
+        # Startup finished while the model is still loading
+        assert slow_service.loading.wait(5)
+        assert client.get("/api/stats").json()["speech"]["loaded"] is False
+
+        # A request needing the model meanwhile waits for the same load
+        first_use = threading.Thread(target=slow_service._ensure_model_loaded)
+        first_use.start()
+        slow_service.release_load.set()
+        first_use.join(5)
+        slow_service.preload()
+
+    assert slow_service.loads == 1
+    assert slow_service.model is not None
@@ -0,0 +1,25 @@
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def test_importing_the_app_skips_heavy_dependencies(tmp_path):
+    # Run in a scratch directory so data/ and logs/ are not touched
+    script = (
+        "import sys; import app.main; "
+        "print(' '.join(m for m in ('torch', 'whisper', 'educhain', 'langchain', 'av') "
+        "if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=tmp_path,
+        env={"PYTHONPATH": str(BACKEND), "PATH": ""},
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+    # Schema work happens in the lifespan, not at import
+    assert not (tmp_path / "data" / "quiz.db").exists()
@@ -0,0 +1,105 @@
+import asyncio
+
+import numpy as np
+
+from app.services.vad import SAMPLE_RATE, VoiceActivityDetector
+from app.services.stream_transcriber import PcmDecoder, StreamingTranscriber
+
+
+def _tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _silence(seconds):
+    rng = np.random.default_rng(0)
+    return (0.001 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def _vad(**kwargs):
+    options = dict(frame_ms=30, threshold_db=10.0, silence_ms=300, min_speech_ms=90,
+                   max_segment_seconds=20.0)
+    options.update(kwargs)
+    return VoiceActivityDetector(**options)
+
+
+def test_vad_splits_utterances_on_silence():
+    vad = _vad()
+    audio = np.concatenate([_silence(0.5), _tone(1.0), _silence(0.6), _tone(0.5), _silence(0.2)])
+
+    # Feed in uneven chunks like a real client would
+    segments = []
+    for chunk in np.array_split(audio, 37):
+        segments += vad.push(chunk)
+    assert len(segments) == 1
+    assert vad.in_speech
+    last = vad.flush()
+
+    assert [s.index for s in segments + [last]] == [0, 1]
+    assert abs(segments[0].start - 0.3) < 0.1  # Speech at 0.5s minus pre-roll
+    assert abs(last.start - 1.9) < 0.1
+    assert vad.flush() is None
+
+
+def test_vad_drops_clicks_and_caps_segment_length():
+    vad = _vad(min_speech_ms=150, max_segment_seconds=1.0)
+    click = np.concatenate([_silence(0.5), _tone(0.06), _silence(0.5)])
+    assert vad.push(click) == [] and not vad.in_speech
+
+    segments = vad.push(_tone(2.5))
+    assert len(segments) == 2
+    assert all(len(s.audio) <= SAMPLE_RATE * 1.0 for s in segments)
+
+
+def test_pcm_decoder_keeps_split_samples():
+    samples = (np.array([0, 16384, -16384, 32767], dtype="<i2")).tobytes()
+    decoder = PcmDecoder("pcm16")
+    out = np.concatenate([decoder.decode(samples[:3]), decoder.decode(samples[3:])])
+    assert np.allclose(out, [0, 0.5, -0.5, 32767 / 32768])
+
+
+
+
+def test_pcm_decoder_resamples_seamlessly_across_chunks():
+    t = np.arange(44100) / 44100
+    data = (np.sin(2 * np.pi * 440 * t) * 16000).astype("<i2").tobytes()
+
+    whole = PcmDecoder("pcm16", 44100).decode(data)
+    decoder = PcmDecoder("pcm16", 44100)
+    chunks = [decoder.decode(data[i:i + 1001]) for i in range(0, len(data), 1001)]
+    chunked = np.concatenate(chunks)
+
+    assert len(chunked) == len(whole) == 16000
+    assert np.allclose(chunked, whole, atol=1e-6)
+def test_streaming_transcriber_sends_partials_and_finals():
+    sent = []
+    calls = []
+
+    async def transcribe(audio):
+        calls.append(len(audio))
+        await asyncio.sleep(0)
+        return f"{len(audio) / SAMPLE_RATE:.1f}s"
+
+    async def send(event):
+        sent.append(event)
+
+    async def run():
+        stream = StreamingTranscriber(transcribe, send, vad=_vad(), partial_interval=0.5)
+        stream.start()
+        audio = np.concatenate([_silence(0.3), _tone(2.0), _silence(0.5), _tone(0.6)])
+        for chunk in np.array_split(audio, 34):  # ~100ms chunks
+            await stream.push(chunk)
+            await asyncio.sleep(0)
+        await stream.finish()
+        return stream
+
+    stream = asyncio.run(run())
+    finals = [e for e in sent if e["type"] == "final"]
+    partials = [e for e in sent if e["type"] == "partial"]
+
+    assert [e["segment"] for e in finals] == [0, 1]
+    assert stream.segments == 2
+    assert partials and partials[0]["segment"] == 0
+    # Every partial for a segment arrives before that segment's final
+    first_final = sent.index(finals[0])
+    assert all(sent.index(p) < first_final for p in partials if p["segment"] == 0)
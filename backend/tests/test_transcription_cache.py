@@ -0,0 +1,85 @@
+import numpy as np
+
+from app.services.transcription_cache import TranscriptionCache, make_transcription_key
+
+PARAMS = {"language": "en", "temperature": 0.0, "quantized": True}
+
+
+def _audio(seed=0, seconds=1.0):
+    return np.random.default_rng(seed).standard_normal(int(16000 * seconds)).astype(np.float32)
+
+
+def test_key_depends_on_samples_model_and_params():
+    audio = _audio()
+    key = make_transcription_key(audio, "medium", PARAMS)
+
+    assert key == make_transcription_key(audio.copy(), "medium", dict(PARAMS))
+    assert key != make_transcription_key(_audio(seed=1), "medium", PARAMS)
+    assert key != make_transcription_key(audio, "small", PARAMS)
+    assert key != make_transcription_key(audio, "medium", {**PARAMS, "quantized": False})
+
+
+def test_memory_tier_evicts_by_size():
+    cache = TranscriptionCache(max_bytes=3 * (64 + 100 + 128))
+    for i in range(5):
+        cache.put(f"{i:064d}", "x" * 100)
+    cache.get(f"{2:064d}")  # Touch so it outlives 3
+
+    cache.put(f"{5:064d}", "x" * 100)
+    stats = cache.stats()
+    assert stats["memory_entries"] == 3
+    assert stats["memory_bytes"] <= cache.max_bytes
+    assert cache.get(f"{2:064d}") is not None
+    assert cache.get(f"{3:064d}") is None
+
+
+def test_disk_tier_survives_restart_and_counts_hits(tmp_path):
+    path = tmp_path / "transcriptions.db"
+    cache = TranscriptionCache(max_bytes=1024 * 1024, disk_path=path, disk_max_bytes=1024 * 1024)
+    key = make_transcription_key(_audio(), "medium", PARAMS)
+    assert cache.get(key) is None
+    cache.put(key, "hello world")
+    assert cache.get(key) == "hello world"
+    cache.close()
+
+    reopened = TranscriptionCache(max_bytes=1024 * 1024, disk_path=path, disk_max_bytes=1024 * 1024)
+    assert reopened.get(key) == "hello world"
+    assert reopened.get(key) == "hello world"
+    stats = reopened.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+    assert stats["hit_rate"] == 1.0
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    entry = 64 + 10 + 128
+    cache = TranscriptionCache(
+        max_bytes=0, disk_path=tmp_path / "t.db", disk_max_bytes=2 * entry
+    )
+    for i in range(3):
+        cache.put(f"{i:064d}", "0123456789")
+
+    stats = cache.stats()
+    assert stats["disk_entries"] == 2 and stats["disk_bytes"] <= 2 * entry
+    assert stats["disk_evictions"] == 1
+    assert cache.get(f"{0:064d}") is None
+    assert cache.get(f"{2:064d}") == "0123456789"
+
+
+def test_disk_budget_is_tracked_across_restarts(tmp_path):
+    path = tmp_path / "t.db"
+    entry = 64 + 10 + 128
+    cache = TranscriptionCache(max_bytes=0, disk_path=path, disk_max_bytes=3 * entry)
+    cache.put(f"{0:064d}", "0123456789")
+    cache.put(f"{0:064d}", "9876543210")  # Replacing an entry does not grow the total
+    cache.put(f"{1:064d}", "0123456789")
+    assert cache.stats()["disk_evictions"] == 0
+    cache.close()
+
+    reopened = TranscriptionCache(max_bytes=0, disk_path=path, disk_max_bytes=3 * entry)
+    for i in range(2, 4):
+        reopened.put(f"{i:064d}", "0123456789")
+
+    stats = reopened.stats()
+    assert (stats["disk_entries"], stats["disk_bytes"]) == (3, 3 * entry)
+    assert stats["disk_evictions"] == 1
+    assert reopened.get(f"{0:064d}") is None
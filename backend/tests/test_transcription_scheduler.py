@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.services.transcription_scheduler import TranscriptionScheduler
+
+
+def _clip(value, seconds=0.5):
+    return np.full(int(16000 * seconds), value, dtype=np.float32)
+
+
+def test_concurrent_requests_share_batches():
+    batches = []
+
+    def run_batch(audios):
+        batches.append(len(audios))
+        time.sleep(0.02)
+        return [f"clip {int(audio[0])}" for audio in audios]
+
+    async def run():
+        scheduler = TranscriptionScheduler(run_batch, max_batch_size=4, max_wait=0.05)
+        texts = await asyncio.gather(*(scheduler.submit(_clip(i)) for i in range(10)))
+        stats = scheduler.stats()
+        await scheduler.stop()
+        return texts, stats
+
+    texts, stats = asyncio.run(run())
+    assert texts == [f"clip {i}" for i in range(10)]
+    assert max(batches) == 4 and sum(batches) == 10
+    assert stats["batches"] == len(batches) <= 4
+    assert stats["transcribed"] == 10 and stats["max_batch_seen"] == 4
+
+
+def test_lone_request_only_waits_max_wait():
+    async def run():
+        scheduler = TranscriptionScheduler(lambda audios: ["ok"] * len(audios), max_wait=0.01)
+        started = time.perf_counter()
+        text = await scheduler.submit(_clip(1))
+        elapsed = time.perf_counter() - started
+        await scheduler.stop()
+        return text, elapsed
+
+    text, elapsed = asyncio.run(run())
+    assert text == "ok"
+    assert elapsed < 0.5
+
+
+def test_batch_failure_reaches_every_caller_and_worker_survives():
+    calls = []
+
+    def run_batch(audios):
+        calls.append(len(audios))
+        if len(calls) == 1:
+            raise RuntimeError("decoder crashed")
+        return ["fine"] * len(audios)
+
+    async def run():
+        scheduler = TranscriptionScheduler(run_batch, max_batch_size=8, max_wait=0.05)
+        failed = await asyncio.gather(
+            scheduler.submit(_clip(1)), scheduler.submit(_clip(2)), return_exceptions=True
+        )
+        recovered = await scheduler.submit(_clip(3))
+        await scheduler.stop()
+        return failed, recovered, scheduler.stats()
+
+    failed, recovered, stats = asyncio.run(run())
+    assert all(isinstance(e, RuntimeError) for e in failed)
+    assert recovered == "fine"
+    assert stats["failures"] == 1
+
+
+def test_stop_fails_waiting_requests():
+    release = threading.Event()
+
+    def run_batch(audios):
+        release.wait(1)
+        return ["done"] * len(audios)
+
+    async def run():
+        scheduler = TranscriptionScheduler(run_batch, max_batch_size=1, max_wait=0)
+        first = asyncio.create_task(scheduler.submit(_clip(1)))
+        second = asyncio.create_task(scheduler.submit(_clip(2)))
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+        release.set()
+        for task in (first, second):
+            with pytest.raises(RuntimeError):
+                await task
+
+    asyncio.run(run())
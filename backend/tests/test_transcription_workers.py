@@ -0,0 +1,72 @@
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from app.services.transcription_scheduler import TranscriptionScheduler
+from app.services.transcription_workers import TranscriptionWorkerPool, WorkerCrashedError
+
+
+def _fake_engine(prefix):
+    """Stands in for Whisper inside the worker process."""
+    def transcribe_batch(audios):
+        texts = []
+        for audio in audios:
+            if len(audio) and audio[0] == -1.0:
+                os._exit(3)  # Simulate a segfault in the native decoder
+            if len(audio) and audio[0] == -2.0:
+                raise ValueError("bad clip")
+            texts.append(f"{prefix}:{len(audio)}:{float(audio.sum()):.1f}:{os.getpid()}")
+        return texts
+    return transcribe_batch
+
+
+@pytest.fixture
+def pool():
+    workers = TranscriptionWorkerPool(2, engine_factory=_fake_engine, engine_args=("fake",))
+    yield workers
+    workers.stop()
+
+
+def test_batches_cross_process_through_shared_memory(pool):
+    assert pool.wait_ready(timeout=60)
+    audios = [np.full(16000, 0.5, dtype=np.float32), np.ones(8000, dtype=np.float32)]
+
+    texts = pool.run_batch(audios)
+
+    assert [t.rsplit(":", 1)[0] for t in texts] == ["fake:16000:8000.0", "fake:8000:8000.0"]
+    assert int(texts[0].rsplit(":", 1)[1]) != os.getpid()
+    stats = pool.stats()
+    assert stats["ready"] == 2 and stats["completed"] == 1 and stats["busy"] == 0
+
+
+def test_engine_errors_fail_the_batch_but_keep_the_worker(pool):
+    with pytest.raises(RuntimeError, match="bad clip"):
+        pool.run_batch([np.full(10, -2.0, dtype=np.float32)])
+    assert pool.stats()["restarts"] == 0
+    assert pool.run_batch([np.zeros(10, dtype=np.float32)])[0].startswith("fake:10:")
+
+
+def test_crashed_worker_is_restarted(pool):
+    with pytest.raises(WorkerCrashedError):
+        pool.run_batch([np.full(10, -1.0, dtype=np.float32)])
+    assert pool.stats()["restarts"] == 1
+
+    # Both workers (including the replacement) keep serving
+    results = [pool.run_batch([np.zeros(5, dtype=np.float32)]) for _ in range(4)]
+    assert all(r[0].startswith("fake:5:") for r in results)
+    assert pool.stats()["alive"] == 2
+
+
+def test_scheduler_runs_one_batch_per_worker(pool):
+    async def run():
+        scheduler = TranscriptionScheduler(pool.run_batch, max_batch_size=2, max_wait=0.01, concurrency=2)
+        texts = await asyncio.gather(*(
+            scheduler.submit(np.full(100, i, dtype=np.float32)) for i in range(6)
+        ))
+        await scheduler.stop()
+        return texts
+
+    texts = asyncio.run(run())
+    assert [t.split(":")[2] for t in texts] == [f"{100.0 * i:.1f}" for i in range(6)]
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import QuestionType, DifficultyLevel
+from app.clients.web_search import WebSearchClient, extract_text
+from app.services.web_content_cache import WebContentCache, format_context
+from benchmarks.fake_search import FakeSearch
+
+
+@pytest.fixture
+def fake():
+    server = FakeSearch().start()
+    yield server
+    server.stop()
+
+
+def _cache(tmp_path, url, **kwargs):
+    client = WebSearchClient(url, max_results=3, timeout=2, page_max_bytes=65536, page_max_chars=500)
+    options = dict(max_bytes=1024 * 1024, ttl=3600, max_stale=86400)
+    options.update(kwargs)
+    return WebContentCache(tmp_path / "web_cache.db", search=client.search, **options)
+
+
+def test_extract_text_drops_page_furniture():
+    text = extract_text(
+        "<html><head><script>var x = 1;</script></head><body><nav>Menu</nav>"
+        "<p>Plants make  sugar.</p><footer>(c)</footer></body></html>",
+        max_chars=100
+    )
+    assert text == "Plants make sugar."
+
+
+def test_repeat_queries_skip_the_network(tmp_path, fake):
+    cache = _cache(tmp_path, fake.url)
+
+    async def run():
+        first = await cache.get("Photosynthesis")
+        second = await cache.get("  photosynthesis ")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second
+    assert len(first) == 3
+    assert (fake.searches, fake.page_views) == (1, 3)
+    assert "explained here in plain language" in first[0]["text"]
+    assert "tracking" not in first[0]["text"] and "Menu" not in first[0]["text"]
+    assert "[1] Photosynthesis - source 1" in format_context(first)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert 0 < stats["bytes"] < len(str(first))  # Stored compressed
+
+
+def test_serves_stale_results_when_offline(tmp_path, fake):
+    cache = _cache(tmp_path, fake.url, ttl=0.05)
+    asyncio.run(cache.get("Volcanoes"))
+    fake.stop()
+    time.sleep(0.1)
+
+    offline = _cache(tmp_path, fake.url, ttl=0.05)
+    results = asyncio.run(offline.get("Volcanoes"))
+    assert results is not None and len(results) == 3
+    assert offline.stats()["stale_served"] == 1
+
+    strict = _cache(tmp_path, fake.url, ttl=0.05, serve_stale=False)
+    assert asyncio.run(strict.get("Volcanoes")) is None
+    assert asyncio.run(strict.get("Glaciers")) is None
+    assert strict.stats()["fetch_failures"] == 2
+
+
+def test_size_budget_evicts_least_recently_used(tmp_path):
+    cache = _cache(tmp_path, "http://127.0.0.1:9", max_bytes=700)
+
+    def page():
+        # Random hex barely compresses: about 300 bytes stored, so two fit
+        return [{"url": "http://example", "title": "t", "snippet": "", "text": os.urandom(200).hex()}]
+
+    cache.store("one", page())
+    cache.store("two", page())
+    cache.load("one")
+    cache.store("three", page())
+
+    assert cache.load("one") is not None
+    assert cache.load("two") is None
+    assert cache.stats()["bytes"] <= 700
+    assert cache.stats()["evictions"] == 1
+
+
+def test_budget_survives_restart_and_expired_rows_are_dropped(tmp_path):
+    cache = _cache(tmp_path, "http://127.0.0.1:9", max_bytes=700, ttl=0, max_stale=0.05)
+    page = [{"url": "http://example", "title": "t", "snippet": "", "text": os.urandom(200).hex()}]
+    cache.store("one", page)
+    cache.close()
+
+    reopened = _cache(tmp_path, "http://127.0.0.1:9", max_bytes=700, ttl=0, max_stale=0.05)
+    reopened.store("two", page)
+    assert reopened.stats()["evictions"] == 0
+    time.sleep(0.1)
+    reopened.store("three", page)
+
+    stats = reopened.stats()
+    assert stats["entries"] == 1 and stats["evictions"] == 2
+    assert stats["bytes"] == reopened._bytes
+
+
+def test_falls_back_to_educhain_search_when_nothing_is_cached(tmp_path, monkeypatch):
+    from app.clients import educhain_client
+
+    calls = []
+
+    async def fake_run(fn, **kwargs):
+        calls.append(kwargs)
+        raise RuntimeError("stop after the call is built")
+
+    monkeypatch.setattr(educhain_client, "web_content_cache", _cache(tmp_path, "http://127.0.0.1:9"))
+    client = SimpleNamespace(qna_engine=SimpleNamespace(generate_questions=None))
+    monkeypatch.setattr(educhain_client.model_registry, "_build", lambda name: client)
+    monkeypatch.setattr(educhain_client.model_registry, "_clients", OrderedDict())
+    monkeypatch.setattr(educhain_client.llm_executor, "run", fake_run)
+
+    def generate():
+        with pytest.raises(Exception, match="stop after"):
+            asyncio.run(educhain_client.generate_questions(
+                topic="Volcanoes", question_type=QuestionType.SHORT_ANSWER, num_questions=1,
+                difficulty=DifficultyLevel.EASY, learning_objective=None, start_id=1,
+                use_web_search=True
+            ))
+
+    generate()
+    monkeypatch.setattr(educhain_client.settings, "WEB_SEARCH_FALLBACK", False)
+    generate()
+
+    assert [call["web_search"] for call in calls] == [True, False]
+    assert all(call["max_web_results"] == educhain_client.settings.WEB_SEARCH_MAX_RESULTS for call in calls)
+    assert all(call["custom_instructions"] is None for call in calls)
+
+
+def test_without_a_search_api_only_the_cache_is_used(tmp_path):
+    cache = _cache(tmp_path, "http://127.0.0.1:9", ttl=0)
+    cache.store("Volcanoes", [{"url": "http://example", "title": "t", "snippet": "s", "text": ""}])
+    offline = WebContentCache(tmp_path / "web_cache.db", search=None, max_bytes=1024 * 1024, ttl=0, max_stale=3600)
+
+    assert asyncio.run(offline.get("Volcanoes"))[0]["snippet"] == "s"
+    assert asyncio.run(offline.get("Glaciers")) is None
+    assert offline.stats()["fetch_failures"] == 0